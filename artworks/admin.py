@@ -1,28 +1,44 @@
 # artworks/admin.py
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.contrib.admin.models import CHANGE, LogEntry
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Case, F, Value, When
 # Ensure all new models are imported
 from .models import (Artwork, Comment, Transaction, GallerySetting, UserProfile, 
-                     AuctionRegistration, Bid) # Added AuctionRegistration, Bid
+                     AuctionRegistration, Bid, ProxyBid) # Added AuctionRegistration, Bid
+from .facets import invalidate_facet_counts
+from .fragment_cache import invalidate_artwork_fragments
+from .admin_filters import AutocompleteFilter, AutocompleteFilterMixin, indexed_prefix_q
+from .search import filter_artworks
 from django.utils.html import format_html
 from django.utils import timezone
 from django.contrib import messages
 
 
-class ArtworkAdmin(admin.ModelAdmin):
+class ArtworkAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = (
         'title', 'slug', 'current_owner', 
         'is_for_sale_direct', 'direct_sale_price', 
         'is_for_auction', 'auction_status', 'auction_start_time', 
         'created_at'
     )
-    list_filter = ('is_for_sale_direct', 'is_for_auction', 'auction_status', 'current_owner')
+    list_filter = ('is_for_sale_direct', 'is_for_auction', 'auction_status', ('current_owner', AutocompleteFilter))
+    list_select_related = ('current_owner',)
+    autocomplete_fields = ('current_owner',)
     search_fields = ('title', 'description', 'slug')
     prepopulated_fields = {'slug': ('title',)}
+
+    def get_search_results(self, request, queryset, search_term):
+        # Title/description go through the full-text index instead of icontains scans; an exact
+        # slug still finds its artwork.
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        return filter_artworks(queryset, search_term) | queryset.filter(slug=search_term.strip()), False
     
     fieldsets = (
-        (None, {'fields': ('title', 'slug', 'description', 'image_placeholder_url', 'current_owner')}),
+        (None, {'fields': ('title', 'slug', 'description', 'image', 'image_placeholder_url', 'current_owner')}),
         ('Direct Sale', {'fields': ('is_for_sale_direct', 'direct_sale_price'), 'classes': ('collapse',)}),
         ('Auction Settings', {'fields': (
             'is_for_auction', 'auction_status',
@@ -44,9 +60,11 @@ class ArtworkAdmin(admin.ModelAdmin):
     )
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ('artwork', 'get_commenter_name', 'text_content_preview', 'created_at')
-    list_filter = ('created_at', 'artwork')
+    list_filter = ('created_at', ('artwork', AutocompleteFilter))
+    list_select_related = ('artwork', 'user')
+    autocomplete_fields = ('artwork', 'user')
     search_fields = ('text_content', 'guest_name', 'user__username')
 
     def get_commenter_name(self, obj):
@@ -59,9 +77,28 @@ class CommentAdmin(admin.ModelAdmin):
         return (obj.text_content[:75] + '...') if len(obj.text_content) > 75 else obj.text_content
     text_content_preview.short_description = 'Comment Preview'
 
+# What Artwork.save() resets when an artwork stops being for auction; the set-based approval
+# writes the same values, since queryset.update() bypasses save().
+AUCTION_RESET_VALUES = {
+    'is_for_auction': False,
+    'auction_status': 'not_configured',
+    'auction_start_time': None,
+    'auction_scheduled_end_time': None,
+    'auction_minimum_bid': None,
+    'auction_signup_deadline': None,
+    'auction_current_highest_bid': None,
+    'auction_current_highest_bidder': None,
+    'last_bid_time': None,
+    'auction_effective_end_time': None,
+    'auction_bid_ladder': [],
+}
+
+
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ('artwork_title', 'buyer_username', 'seller_username', 'final_price', 'sale_type', 'status', 'initiated_at', 'dekont_preview') # Added sale_type
     list_filter = ('status', 'sale_type', 'initiated_at')
+    list_select_related = ('artwork', 'buyer', 'seller') # For the title/username columns
+    autocomplete_fields = ('artwork', 'buyer')
     search_fields = ('artwork__title', 'buyer__username', 'seller__username')
     readonly_fields = ('initiated_at', 'dekont_uploaded_at', 'admin_action_at', 'dekont_image_display', 'seller')
     
@@ -79,25 +116,25 @@ class TransactionAdmin(admin.ModelAdmin):
         return obj.seller.username if obj.seller else "N/A"
     seller_username.short_description = 'Seller'
     
+    # Both show the small preview built by dekont_thumbnails.py, never the (often multi-MB PDF) upload itself.
     def dekont_preview(self, obj):
+        if obj.dekont_thumbnail:
+            return format_html('<a href="{}"><img src="{}" height="80" loading="lazy" alt="Dekont"></a>', obj.dekont_image.url, obj.dekont_thumbnail.url)
         if obj.dekont_image:
             return format_html('<a href="{}">View Dekont</a>', obj.dekont_image.url)
         return "No Dekont"
     dekont_preview.short_description = 'Dekont'
 
     def dekont_image_display(self, obj):
+        if obj.dekont_thumbnail:
+            return format_html('<a href="{}"><img src="{}" width="300" alt="Dekont preview" /></a> <br/> <a href="{}">Full file</a>', obj.dekont_image.url, obj.dekont_thumbnail.url, obj.dekont_image.url)
         if obj.dekont_image:
-            return format_html('<img src="{}" width="150" height="auto" /> <br/> <a href="{}">Full Image</a>', obj.dekont_image.url, obj.dekont_image.url)
+            return format_html('Preview is being generated. <a href="{}">Full file</a>', obj.dekont_image.url)
         return "No dekont uploaded."
     dekont_image_display.short_description = 'Dekont Preview'
 
     def save_model(self, request, obj, form, change):
-        original_status = None
-        if obj.pk:
-            try:
-                original_status = Transaction.objects.get(pk=obj.pk).status
-            except Transaction.DoesNotExist:
-                pass
+        original_status = obj.original_value('status') # As loaded, before the form changed it
 
         super().save_model(request, obj, form, change)
 
@@ -110,8 +147,7 @@ class TransactionAdmin(admin.ModelAdmin):
                 artwork.direct_sale_price = None
                 
                 if obj.sale_type == 'auction_win':
-                    artwork.is_for_auction = False 
-                    artwork.auction_status = 'completed' # Mark auction as completed
+                    artwork.is_for_auction = False # save() resets the auction fields to 'not_configured'
                     # auction_winner and auction_winning_price should have been set on the Artwork
                     # when the auction ended and transaction was created.
                     # No need to set them here again directly from transaction.
@@ -123,54 +159,103 @@ class TransactionAdmin(admin.ModelAdmin):
                 obj.save(update_fields=['admin_action_at'])
 
 
+    # Both actions are set-based: the selected rows and their artworks are locked, then one UPDATE
+    # per table applies the change, all in one transaction so a failure never leaves it half-done.
+    # queryset.update() sends no post_save, so caches are invalidated and history entries written here.
+
+    def _lock_artworks(self, artwork_ids):
+        """Locks the artworks (in pk order, to avoid deadlocks) and returns {pk: current_owner_id}."""
+        return dict(Artwork.objects.select_for_update().filter(pk__in=artwork_ids).order_by('pk')
+                    .values_list('pk', 'current_owner_id'))
+
+    def _selected_for_update(self, queryset):
+        # of=('self',): PostgreSQL cannot lock the nullable side of the buyer join.
+        return list(queryset.select_for_update(of=('self',)).select_related('artwork', 'buyer').order_by('pk'))
+
+    def _log_changes(self, request, objects, fields):
+        if objects:
+            LogEntry.objects.log_actions(request.user.pk, objects, CHANGE, [{'changed': {'fields': fields}}])
+
+    def _auction_reset_cases(self, artwork_ids):
+        """UPDATE expressions applying AUCTION_RESET_VALUES to `artwork_ids` and leaving other rows as they are."""
+        cases = {}
+        for name, value in AUCTION_RESET_VALUES.items():
+            field = Artwork._meta.get_field(name)
+            cases[name] = Case(When(pk__in=artwork_ids, then=Value(value, output_field=field)),
+                               default=F(name), output_field=field)
+        return cases
+
     def approve_transactions(self, request, queryset):
-        approved_count = 0
-        for transaction in queryset:
-            if transaction.status == 'pending_approval' and transaction.buyer: # Ensure buyer is set
-                artwork = transaction.artwork
-                if artwork.current_owner != transaction.buyer:
-                    artwork.current_owner = transaction.buyer
-                    artwork.is_for_sale_direct = False
-                    artwork.direct_sale_price = None
-
-                    if transaction.sale_type == 'auction_win':
-                        artwork.is_for_auction = False
-                        artwork.auction_status = 'completed'
-                    
-                    artwork.save()
-
-                transaction.status = 'approved'
-                transaction.admin_action_at = timezone.now()
-                transaction.save()
-                approved_count += 1
-        if approved_count > 0:
-            self.message_user(request, f"{approved_count} transactions approved and ownerships transferred.")
+        now = timezone.now()
+        with transaction.atomic():
+            approvable = self._selected_for_update(queryset.filter(status='pending_approval', buyer__isnull=False))
+            if approvable:
+                pks = [txn.pk for txn in approvable]
+                # If several selected transactions are for one artwork, the latest one's buyer gets it.
+                latest = {}
+                for txn in sorted(approvable, key=lambda txn: (txn.initiated_at, txn.pk)):
+                    latest[txn.artwork_id] = txn
+                owners = self._lock_artworks(latest)
+                transfers = [artwork_id for artwork_id, txn in latest.items() if owners.get(artwork_id) != txn.buyer_id]
+                auction_wins = [artwork_id for artwork_id in transfers if latest[artwork_id].sale_type == 'auction_win']
+
+                if transfers:
+                    # One WHEN per buyer (each an IN list) keeps the CASE short however many artworks move.
+                    by_buyer = {}
+                    for artwork_id in transfers:
+                        by_buyer.setdefault(latest[artwork_id].buyer_id, []).append(artwork_id)
+                    Artwork.objects.filter(pk__in=transfers).update(
+                        current_owner_id=Case(*[When(pk__in=artwork_ids, then=Value(buyer_id))
+                                                for buyer_id, artwork_ids in by_buyer.items()]),
+                        is_for_sale_direct=False,
+                        direct_sale_price=None,
+                        updated_at=now,
+                        **self._auction_reset_cases(auction_wins),
+                    )
+                    for artwork_id in transfers:
+                        invalidate_artwork_fragments(artwork_id)
+                    invalidate_facet_counts()
+                Transaction.objects.filter(pk__in=pks).update(status='approved', admin_action_at=now)
+
+                for txn in approvable:
+                    txn.status, txn.admin_action_at = 'approved', now
+                self._log_changes(request, approvable, ['status', 'admin_action_at'])
+                self._log_changes(request, [latest[artwork_id].artwork for artwork_id in transfers if artwork_id not in auction_wins],
+                                  ['current_owner', 'is_for_sale_direct', 'direct_sale_price'])
+                self._log_changes(request, [latest[artwork_id].artwork for artwork_id in auction_wins],
+                                  ['current_owner', 'is_for_sale_direct', 'direct_sale_price', *AUCTION_RESET_VALUES])
+        if approvable:
+            self.message_user(request, f"{len(approvable)} transactions approved and ownerships transferred.")
         else:
             self.message_user(request, "No transactions were in 'pending_approval' state or had a buyer to approve.", level=messages.WARNING)
     approve_transactions.short_description = "Approve selected transactions"
 
     def reject_transactions(self, request, queryset):
-        updated_count = 0
-        for transaction in queryset:
-            if transaction.status not in ['approved', 'rejected']:
-                transaction.status = 'rejected'
-                transaction.admin_action_at = timezone.now()
-                transaction.save()
-
-                # If an auction payment is rejected
-                if transaction.sale_type == 'auction_win':
-                    artwork = transaction.artwork
-                    artwork.auction_status = 'failed_payment'
-                    # Potentially reset auction_winner if you want the slot open for a second chance offer later
-                    # artwork.auction_winner = None 
-                    # artwork.auction_winning_price = None
-                    artwork.save(update_fields=['auction_status']) # Only update auction_status
-
-                updated_count +=1
-        if updated_count > 0:
-            self.message_user(request, f"{updated_count} transactions rejected.")
+        now = timezone.now()
+        with transaction.atomic():
+            rejectable = self._selected_for_update(queryset.exclude(status__in=['approved', 'rejected']))
+            if rejectable:
+                # A rejected auction payment leaves the finalized artwork with no auction, as save() would;
+                # one its owner has put up for auction again is left alone.
+                failed_auctions = {txn.artwork_id: txn.artwork for txn in rejectable if txn.sale_type == 'auction_win'}
+                if failed_auctions:
+                    self._lock_artworks(failed_auctions)
+                    Artwork.objects.filter(pk__in=failed_auctions, is_for_auction=False).update(**AUCTION_RESET_VALUES)
+                    for artwork_id in failed_auctions:
+                        invalidate_artwork_fragments(artwork_id)
+                    invalidate_facet_counts()
+                Transaction.objects.filter(pk__in=[txn.pk for txn in rejectable]).update(status='rejected', admin_action_at=now)
+
+                for txn in rejectable:
+                    txn.status, txn.admin_action_at = 'rejected', now
+                self._log_changes(request, rejectable, ['status', 'admin_action_at'])
+                self._log_changes(request, [artwork for artwork in failed_auctions.values() if not artwork.is_for_auction],
+                                  ['auction_status'])
+        if rejectable:
+            self.message_user(request, f"{len(rejectable)} transactions rejected.")
         else:
              self.message_user(request, "No transactions were in a state to be rejected.", level=messages.WARNING)
+    reject_transactions.short_description = "Reject selected transactions"
     
     actions = [approve_transactions, reject_transactions]
 
@@ -184,11 +269,26 @@ class UserProfileInline(admin.StackedInline):
 class UserAdmin(BaseUserAdmin):
     inlines = (UserProfileInline,)
 
+    def get_search_results(self, request, queryset, search_term):
+        # The autocomplete boxes (FK fields and filters) match a username prefix through the unique
+        # index; the changelist search keeps the default icontains over name and email.
+        if request.resolver_match and request.resolver_match.url_name == 'autocomplete' and search_term.strip():
+            return queryset.filter(indexed_prefix_q('username', search_term.strip())), False
+        return super().get_search_results(request, queryset, search_term)
+
+class UserProfileAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'bank_account_holder_name')
+    list_select_related = ('user',) # __str__ shows the username
+    raw_id_fields = ('user',)
+    search_fields = ('user__username', 'bank_account_holder_name')
+
 # --- ADMIN REGISTRATIONS FOR NEW MODELS ---
 @admin.register(AuctionRegistration)
-class AuctionRegistrationAdmin(admin.ModelAdmin):
+class AuctionRegistrationAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ('artwork', 'user', 'status', 'registered_at', 'owner_reviewed_at')
-    list_filter = ('status', 'artwork__title', 'user__username', 'artwork__auction_status')
+    list_filter = ('status', ('artwork', AutocompleteFilter), ('user', AutocompleteFilter), 'artwork__auction_status')
+    list_select_related = ('artwork', 'user')
+    autocomplete_fields = ('artwork', 'user')
     search_fields = ('artwork__title', 'user__username')
     readonly_fields = ('registered_at', 'owner_reviewed_at') # owner_reviewed_at set by actions
     # Allow admin to change status via list_editable or actions
@@ -207,11 +307,24 @@ class AuctionRegistrationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Bid)
-class BidAdmin(admin.ModelAdmin):
+class BidAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ('artwork', 'bidder', 'amount', 'timestamp')
-    list_filter = ('artwork__title', 'bidder__username', 'timestamp')
+    list_filter = (('artwork', AutocompleteFilter), ('bidder', AutocompleteFilter), 'timestamp')
+    list_select_related = ('artwork', 'bidder')
+    raw_id_fields = ('artwork', 'bidder') # Bids are written by the bidding code; the form is rarely used
     search_fields = ('artwork__title', 'bidder__username')
     readonly_fields = ('timestamp',)
+    ordering = ('-timestamp',) # Bid has no default ordering; newest first is what the changelist needs
+
+
+@admin.register(ProxyBid)
+class ProxyBidAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
+    list_display = ('artwork', 'bidder', 'max_amount', 'created_at', 'updated_at')
+    list_filter = (('artwork', AutocompleteFilter), ('bidder', AutocompleteFilter))
+    list_select_related = ('artwork', 'bidder')
+    raw_id_fields = ('artwork', 'bidder')
+    search_fields = ('artwork__title', 'bidder__username')
+    readonly_fields = ('created_at', 'updated_at')
 
 
 admin.site.unregister(User)
@@ -221,5 +334,5 @@ admin.site.register(Artwork, ArtworkAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Transaction, TransactionAdmin)
 admin.site.register(GallerySetting)
-admin.site.register(UserProfile)
-# AuctionRegistration and Bid are registered using @admin.register decorator above
\ No newline at end of file
+admin.site.register(UserProfile, UserProfileAdmin)
+# AuctionRegistration, Bid and ProxyBid are registered using @admin.register decorator above
\ No newline at end of file
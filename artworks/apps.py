@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ArtworksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'artworks'
+
+    def ready(self):
+        # Signal receivers that keep caches, image variants, dekont previews and the search index in
+        # step with the models. Imported here so management commands and workers, which never load
+        # the views, register them too.
+        from . import dekont_thumbnails, facets, fragment_cache, images, registration_cache, search # noqa: F401
@@ -0,0 +1,190 @@
+# artworks/auction_lifecycle.py
+import heapq
+import time
+from datetime import timedelta
+
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Artwork
+
+# Statuses that still have a time-based transition ahead of them.
+SCHEDULED_AUCTION_STATUSES = ['configured', 'signup_open', 'awaiting_start', 'live']
+
+# How long past its end a live auction may wait for the sweeper before a page view finalizes it
+# inline (only happens when neither worker is running, e.g. a bare runserver).
+INLINE_FINALIZE_GRACE = timedelta(seconds=30)
+
+
+def next_transition_time(artwork, now):
+    """Instant at which this artwork's auction next needs attention, or None if it never does."""
+    if not artwork.is_for_auction or artwork.auction_status not in SCHEDULED_AUCTION_STATUSES:
+        return None
+    if artwork.auction_status == 'configured':
+        return now # Moves on to signup_open/awaiting_start/live straight away
+    if artwork.auction_status == 'signup_open':
+        return artwork.auction_signup_deadline or now # Missing times -> let the status check revert it to draft
+    if artwork.auction_status == 'awaiting_start':
+        return artwork.auction_start_time or now
+    return artwork.get_effective_end_time() # 'live': finalize once the (soft-close extended) end passes
+
+
+def finalize_if_due(artwork, now):
+    """
+    Finalizes an auction whose effective end has passed. The caller must hold the row lock.
+    Auctions still in a pending status (no worker promoted them) are finalized too; they cannot
+    have bids, so finalize_auction() simply closes them.
+    Returns the finalize_auction() outcome, or None if the auction is not due (e.g. a late bid
+    extended it, in which case the persisted effective end time is corrected).
+    """
+    if not artwork.is_for_auction or artwork.auction_status not in SCHEDULED_AUCTION_STATUSES:
+        return None
+    effective_end_time = artwork.get_effective_end_time()
+    if not effective_end_time or now < effective_end_time:
+        if artwork.auction_effective_end_time != effective_end_time:
+            Artwork.objects.filter(pk=artwork.pk).update(auction_effective_end_time=effective_end_time)
+        return None
+    outcome = artwork.finalize_auction()
+    print(f"[finalize] '{artwork.title}': {outcome.get('outcome')}, "
+          f"{(timezone.now() - effective_end_time).total_seconds():.1f}s after its end.")
+    return outcome
+
+
+def sweep_due_auctions(now=None, batch_size=100, max_batches=None):
+    """
+    Finalizes every open auction whose persisted effective end time has passed.
+    Due auctions are found with one indexed query per batch (auction_status, auction_effective_end_time)
+    and walked oldest-first with a keyset cursor, so each auction is visited at most once per sweep.
+    Each one is finalized in its own short transaction; rows another worker has locked are skipped,
+    and already-finalized ones no longer match, so concurrent or repeated sweeps are harmless.
+
+    Returns stats: finalized/skipped counts and the finalization lag (seconds past effective end).
+    """
+    now = now or timezone.now()
+    stats = {'finalized': 0, 'skipped': 0, 'batches': 0, 'max_lag_seconds': 0.0, 'total_lag_seconds': 0.0}
+    due_auctions = Artwork.objects.filter(
+        auction_status__in=SCHEDULED_AUCTION_STATUSES, auction_effective_end_time__lte=now,
+    ).order_by('auction_effective_end_time', 'pk')
+
+    cursor = None
+    while max_batches is None or stats['batches'] < max_batches:
+        batch_qs = due_auctions
+        if cursor:
+            batch_qs = batch_qs.filter(
+                Q(auction_effective_end_time__gt=cursor[0]) | Q(auction_effective_end_time=cursor[0], pk__gt=cursor[1])
+            )
+        batch = list(batch_qs.values_list('auction_effective_end_time', 'pk')[:batch_size])
+        if not batch:
+            break
+        stats['batches'] += 1
+        cursor = batch[-1]
+
+        for _, artwork_pk in batch:
+            with db_transaction.atomic():
+                artwork = Artwork.objects.select_for_update(skip_locked=True).filter(pk=artwork_pk).first()
+                if artwork is None: # Locked by another worker, or deleted
+                    stats['skipped'] += 1
+                    continue
+                effective_end_time = artwork.get_effective_end_time() # finalize_auction() clears the auction fields
+                outcome = finalize_if_due(artwork, now)
+            if outcome is None:
+                stats['skipped'] += 1
+                continue
+            lag = max(0.0, (timezone.now() - effective_end_time).total_seconds())
+            stats['finalized'] += 1
+            stats['total_lag_seconds'] += lag
+            stats['max_lag_seconds'] = max(stats['max_lag_seconds'], lag)
+    return stats
+
+
+def apply_due_transition(artwork_pk):
+    """
+    Applies whatever transition is due for one artwork under a row lock.
+    Returns the refreshed artwork (so the caller can schedule its next instant), or None if it is gone.
+    """
+    with db_transaction.atomic():
+        try:
+            artwork = Artwork.objects.select_for_update().get(pk=artwork_pk)
+        except Artwork.DoesNotExist:
+            return None
+
+        if artwork.is_for_auction and artwork.auction_status == 'live':
+            finalize_if_due(artwork, timezone.now())
+            return artwork
+
+        artwork.get_effective_auction_status_and_save()
+        return artwork
+
+
+class AuctionScheduler:
+    """
+    Keeps a min-heap of (instant, artwork pk) for every upcoming signup deadline, start time and
+    effective end time, and applies each transition when its instant comes due.
+
+    The heap is rebuilt from the database every `rescan_interval` seconds so newly configured
+    auctions and soft-close extensions are picked up. Entries whose instant no longer matches the
+    latest one scheduled for that artwork are stale and are skipped when popped.
+    """
+
+    def __init__(self, rescan_interval=30, max_sleep=5):
+        self.rescan_interval = rescan_interval
+        self.max_sleep = max_sleep
+        self._heap = []
+        self._scheduled = {} # artwork pk -> instant of its live heap entry
+
+    def schedule(self, artwork, now):
+        instant = next_transition_time(artwork, now)
+        if instant is None:
+            self._scheduled.pop(artwork.pk, None)
+            return
+        if self._scheduled.get(artwork.pk) == instant:
+            return
+        self._scheduled[artwork.pk] = instant
+        heapq.heappush(self._heap, (instant, artwork.pk))
+
+    def rescan(self, now=None):
+        now = now or timezone.now()
+        candidates = Artwork.objects.filter(
+            is_for_auction=True, auction_status__in=SCHEDULED_AUCTION_STATUSES
+        ).only(
+            'is_for_auction', 'auction_status', 'auction_signup_deadline', 'auction_start_time',
+            'auction_scheduled_end_time', 'last_bid_time',
+        )
+        for artwork in candidates.iterator():
+            self.schedule(artwork, now)
+
+    def run_due(self, now=None):
+        """Pops and applies every entry due at `now`. Returns how many transitions were applied."""
+        now = now or timezone.now()
+        applied = 0
+        while self._heap and self._heap[0][0] <= now:
+            instant, artwork_pk = heapq.heappop(self._heap)
+            if self._scheduled.get(artwork_pk) != instant:
+                continue # Superseded by a newer instant for the same artwork
+            del self._scheduled[artwork_pk]
+            artwork = apply_due_transition(artwork_pk)
+            applied += 1
+            if artwork is not None:
+                self.schedule(artwork, timezone.now())
+        return applied
+
+    def seconds_until_next(self, now=None):
+        if not self._heap:
+            return None
+        now = now or timezone.now()
+        return max(0.0, (self._heap[0][0] - now).total_seconds())
+
+    def run_forever(self):
+        next_rescan_at = 0.0
+        while True:
+            if time.monotonic() >= next_rescan_at:
+                self.rescan()
+                next_rescan_at = time.monotonic() + self.rescan_interval
+            self.run_due()
+
+            sleep_for = min(self.max_sleep, max(0.0, next_rescan_at - time.monotonic()))
+            until_next = self.seconds_until_next()
+            if until_next is not None:
+                sleep_for = min(sleep_for, until_next)
+            time.sleep(sleep_for)
@@ -0,0 +1,331 @@
+# artworks/bidding.py
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction as db_transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+from .facets import invalidate_facet_counts
+from .fragment_cache import invalidate_artwork_fragments
+from .live_updates import publish_auction_event
+from .models import AUCTION_BID_LADDER_SIZE, AUCTION_SOFT_CLOSE_EXTENSION, Artwork, Bid, ProxyBid
+
+BID_INCREMENT = Decimal('1.00')
+# How many times proxy resolution re-reads and retries when a concurrent bid changed the auction
+# between its read and its conditional UPDATE.
+MAX_RESOLVE_ATTEMPTS = 5
+
+
+def _promote_to_live(artwork, now):
+    # The scheduler may not have persisted 'live' yet; do it with a conditional UPDATE
+    # (same rule as the effective-status annotation) rather than a locked read-modify-write.
+    promoted = Artwork.objects.filter(
+        pk=artwork.pk, is_for_auction=True,
+        auction_status__in=['configured', 'signup_open', 'awaiting_start'],
+        auction_start_time__lte=now,
+    ).update(auction_status='live')
+    if promoted:
+        invalidate_facet_counts()
+
+
+def _new_high_bid_update(amount, bidder_id, now):
+    # Column updates for a new highest bid, shared by manual and proxy bids.
+    # Both end-time columns get the same value: after a soft-close extension the scheduled end is
+    # never earlier than last_bid_time + extension, so it is also the effective end.
+    new_end_time = now + AUCTION_SOFT_CLOSE_EXTENSION
+    extended_end_time = Case(
+        When(auction_scheduled_end_time__lt=new_end_time, then=Value(new_end_time)),
+        default=F('auction_scheduled_end_time'),
+    )
+    return {
+        'auction_current_highest_bid': amount,
+        'auction_current_highest_bidder_id': bidder_id,
+        'last_bid_time': now,
+        'auction_state_version': F('auction_state_version') + 1,
+        'auction_scheduled_end_time': extended_end_time,
+        'auction_effective_end_time': extended_end_time,
+    }
+
+
+def _push_bids_to_ladder(artwork_pk, bids, now):
+    """
+    Adds freshly written bids ([(username, amount), ...]) to the artwork's denormalized top-N ladder.
+    Must run inside the bid's transaction, after its conditional UPDATE: that UPDATE holds the
+    artwork row lock until commit, so this read-modify-write cannot interleave with another bid.
+    """
+    ladder = Artwork.objects.filter(pk=artwork_pk).values_list('auction_bid_ladder', flat=True).get()
+    entries = [
+        {'bidder': username, 'amount': f'{amount:.2f}', 'timestamp': now.isoformat()}
+        for username, amount in sorted(bids, key=lambda bid: bid[1], reverse=True)
+    ]
+    # New entries go first, so on equal amounts the newest bid is listed first (stable sort).
+    ladder = sorted(entries + list(ladder or []), key=lambda entry: Decimal(entry['amount']), reverse=True)
+    Artwork.objects.filter(pk=artwork_pk).update(auction_bid_ladder=ladder[:AUCTION_BID_LADDER_SIZE])
+
+
+def place_bid(artwork, bidder, amount, now=None):
+    """
+    Accepts a bid with one compare-and-swap UPDATE on the artwork row instead of locking it first:
+    the row is only changed if the auction is live, not yet ended, and `amount` beats the current
+    highest bid (or meets the minimum for the first bid). The Bid row is inserted in the same
+    short transaction.
+
+    Returns a dict like finalize_auction() does, with 'outcome' one of:
+      'accepted' - the bid is now the highest; 'extended' tells whether soft close pushed the end out.
+      'outbid'   - another bid got there first (or the amount is below the minimum);
+                   'current_highest_bid' / 'minimum_bid' describe what has to be beaten.
+      'closed'   - the auction is not live or has already ended.
+    After an accepted bid, competing proxy bids respond straight away (see resolve_proxy_bids);
+    'outbid_by_proxy' is True if one of them took the lead back.
+    """
+    now = now or timezone.now()
+    new_end_time = now + AUCTION_SOFT_CLOSE_EXTENSION
+
+    if artwork.auction_status != 'live':
+        _promote_to_live(artwork, now)
+
+    beats_current_bid = (
+        Q(auction_current_highest_bid__isnull=True, auction_minimum_bid__lte=amount) |
+        Q(auction_current_highest_bid__lt=amount)
+    )
+    with db_transaction.atomic():
+        updated = Artwork.objects.filter(
+            beats_current_bid, pk=artwork.pk, is_for_auction=True,
+            auction_status='live', auction_scheduled_end_time__gt=now,
+        ).update(**_new_high_bid_update(amount, bidder.pk, now))
+        if updated:
+            Bid.objects.create(artwork_id=artwork.pk, bidder=bidder, amount=amount, timestamp=now)
+            _push_bids_to_ladder(artwork.pk, [(bidder.username, amount)], now)
+
+    if updated:
+        extended = not artwork.auction_scheduled_end_time or artwork.auction_scheduled_end_time < new_end_time
+        state, _ = get_auction_state(pk=artwork.pk)
+        publish_auction_event(artwork.pk, 'bid', dict(state, extended=extended))
+        resolution = resolve_proxy_bids(artwork.pk, now=now)
+        outbid_by_proxy = resolution['outcome'] == 'resolved' and resolution['leader_id'] != bidder.pk
+        message = f'Your bid of ${amount:.2f} has been placed successfully!'
+        if outbid_by_proxy:
+            message += f" However, another bidder's maximum bid is higher; the current bid is now ${resolution['amount']:.2f}."
+        return {
+            'outcome': 'accepted', 'amount': amount, 'extended': extended, 'outbid_by_proxy': outbid_by_proxy,
+            'auction_end_time': max(new_end_time, artwork.auction_scheduled_end_time or new_end_time),
+            'message': message,
+        }
+
+    # Rejected: one cheap read to tell the bidder why.
+    state = Artwork.objects.filter(pk=artwork.pk).values(
+        'is_for_auction', 'auction_status', 'auction_scheduled_end_time',
+        'auction_current_highest_bid', 'auction_minimum_bid',
+    ).first()
+    if not state or not state['is_for_auction'] or state['auction_status'] != 'live' or \
+       not state['auction_scheduled_end_time'] or state['auction_scheduled_end_time'] <= now:
+        return {'outcome': 'closed', 'message': 'This auction is not currently live or has just ended.'}
+
+    current_highest_bid = state['auction_current_highest_bid']
+    if current_highest_bid is None:
+        message = f"Your first bid must be at least the minimum bid of ${state['auction_minimum_bid'] or 0:.2f}."
+    else:
+        message = f"Your bid of ${amount:.2f} must be higher than the current bid of ${current_highest_bid:.2f}."
+    return {
+        'outcome': 'outbid', 'message': message,
+        'current_highest_bid': current_highest_bid, 'minimum_bid': state['auction_minimum_bid'],
+    }
+
+
+def _auction_is_open(auction, now):
+    return bool(
+        auction and auction['is_for_auction'] and auction['auction_status'] == 'live' and
+        auction['auction_scheduled_end_time'] and auction['auction_scheduled_end_time'] > now
+    )
+
+
+def _plan_proxy_resolution(auction, proxies):
+    """
+    Works out what the competing ceilings produce, without touching the database.
+    `proxies` is [(bidder_id, max_amount), ...], highest ceiling first and earliest first on ties;
+    it must include the current leader's own proxy (if any) and the two best challengers.
+    Returns (leader_id, price, bids) where bids is the list of (bidder_id, amount) Bid rows to
+    write, at most two, or None if nobody can beat the current highest bid.
+    """
+    current_bid = auction['auction_current_highest_bid']
+    holder_id = auction['auction_current_highest_bidder_id']
+    if current_bid is not None:
+        required = current_bid + BID_INCREMENT
+    else:
+        required = auction['auction_minimum_bid'] or BID_INCREMENT
+
+    holder_ceiling = current_bid
+    challengers = []
+    for bidder_id, max_amount in proxies:
+        if bidder_id == holder_id:
+            holder_ceiling = max(holder_ceiling, max_amount)
+        elif max_amount >= required:
+            challengers.append((bidder_id, max_amount))
+    if not challengers:
+        return None
+
+    top_id, top_max = challengers[0]
+    if holder_id is not None and holder_ceiling >= top_max:
+        # The leader's ceiling holds (ties go to whoever got there first): record the challenger's
+        # best and answer it by one increment, capped at the leader's ceiling.
+        price = min(holder_ceiling, top_max + BID_INCREMENT)
+        bids = [(top_id, top_max)] if top_max < price else []
+        return holder_id, price, bids + [(holder_id, price)]
+
+    # The best challenger takes the lead, one increment above the runner-up's ceiling.
+    runner_up = (holder_id, holder_ceiling) if holder_id is not None else None
+    if len(challengers) > 1 and (runner_up is None or challengers[1][1] > runner_up[1]):
+        runner_up = challengers[1]
+    if runner_up is None:
+        return top_id, required, [(top_id, required)]
+    price = max(required, min(top_max, runner_up[1] + BID_INCREMENT))
+    bids = []
+    if (current_bid is None or runner_up[1] > current_bid) and runner_up[1] < price:
+        bids.append(runner_up)
+    return top_id, price, bids + [(top_id, price)]
+
+
+def resolve_proxy_bids(artwork_pk, now=None):
+    """
+    Lets every stored ceiling compete in one pass: reads the auction and the relevant proxy bids,
+    plans the outcome in memory, then applies it with a single conditional UPDATE keyed on
+    auction_state_version plus at most two Bid rows. If a concurrent bid changed the auction in
+    between, the UPDATE matches nothing and the resolution is re-planned from fresh state.
+
+    Returns a dict with 'outcome' one of:
+      'resolved'  - 'leader_id' now leads at 'amount'; 'bids' Bid rows were written.
+      'unchanged' - no ceiling beats the current highest bid.
+      'closed'    - the auction is not live or has already ended.
+      'conflict'  - gave up after MAX_RESOLVE_ATTEMPTS concurrent changes; the next bid retries it.
+    """
+    now = now or timezone.now()
+    for _ in range(MAX_RESOLVE_ATTEMPTS):
+        auction = Artwork.objects.filter(pk=artwork_pk).values(
+            'is_for_auction', 'auction_status', 'auction_scheduled_end_time', 'auction_minimum_bid',
+            'auction_current_highest_bid', 'auction_current_highest_bidder_id', 'auction_state_version',
+        ).first()
+        if not _auction_is_open(auction, now):
+            return {'outcome': 'closed'}
+
+        current_bid = auction['auction_current_highest_bid']
+        required = current_bid + BID_INCREMENT if current_bid is not None else auction['auction_minimum_bid'] or BID_INCREMENT
+        # Top three by ceiling among possible challengers and the current leader is all the plan needs.
+        proxies = list(ProxyBid.objects.filter(
+            Q(max_amount__gte=required) | Q(bidder_id=auction['auction_current_highest_bidder_id']),
+            artwork_id=artwork_pk,
+        ).order_by('-max_amount', 'created_at').values_list('bidder_id', 'max_amount')[:3])
+
+        plan = _plan_proxy_resolution(auction, proxies)
+        if plan is None:
+            return {'outcome': 'unchanged'}
+        leader_id, price, bids = plan
+        usernames = dict(User.objects.filter(pk__in=[bidder_id for bidder_id, _ in bids]).values_list('pk', 'username'))
+
+        with db_transaction.atomic():
+            updated = Artwork.objects.filter(
+                pk=artwork_pk, auction_state_version=auction['auction_state_version'],
+                auction_status='live', auction_scheduled_end_time__gt=now,
+            ).update(**_new_high_bid_update(price, leader_id, now))
+            if updated:
+                Bid.objects.bulk_create([
+                    Bid(artwork_id=artwork_pk, bidder_id=bidder_id, amount=amount, timestamp=now)
+                    for bidder_id, amount in bids
+                ])
+                _push_bids_to_ladder(artwork_pk, [(usernames.get(bidder_id), amount) for bidder_id, amount in bids], now)
+                invalidate_artwork_fragments(artwork_pk) # bulk_create() sends no post_save
+
+        if updated:
+            extended = auction['auction_scheduled_end_time'] < now + AUCTION_SOFT_CLOSE_EXTENSION
+            state, _ = get_auction_state(pk=artwork_pk)
+            publish_auction_event(artwork_pk, 'bid', dict(state, extended=extended))
+            print(f"[proxy] Artwork {artwork_pk}: user {leader_id} leads at {price} ({len(bids)} bid row(s)).")
+            return {'outcome': 'resolved', 'leader_id': leader_id, 'amount': price, 'bids': len(bids)}
+    return {'outcome': 'conflict'}
+
+
+def set_proxy_bid(artwork, bidder, max_amount, now=None):
+    """
+    Stores (or changes) the bidder's ceiling for this auction and resolves it against the others.
+    The current leader may lower their ceiling down to their standing bid; anyone else has to
+    offer at least the next minimum bid.
+
+    Returns a dict with 'outcome' one of 'accepted' ('leading' tells whether the bidder now leads),
+    'too_low' ('minimum_bid' is the lowest acceptable ceiling) or 'closed'.
+    """
+    now = now or timezone.now()
+    if artwork.auction_status != 'live':
+        _promote_to_live(artwork, now)
+
+    auction = Artwork.objects.filter(pk=artwork.pk).values(
+        'is_for_auction', 'auction_status', 'auction_scheduled_end_time', 'auction_minimum_bid',
+        'auction_current_highest_bid', 'auction_current_highest_bidder_id',
+    ).first()
+    if not _auction_is_open(auction, now):
+        return {'outcome': 'closed', 'message': 'This auction is not currently live or has just ended.'}
+
+    current_bid = auction['auction_current_highest_bid']
+    is_leading = auction['auction_current_highest_bidder_id'] == bidder.pk
+    if is_leading:
+        floor = current_bid
+        floor_message = f"Your maximum bid cannot be lower than your current winning bid of ${floor:.2f}."
+    else:
+        floor = current_bid + BID_INCREMENT if current_bid is not None else auction['auction_minimum_bid'] or BID_INCREMENT
+        floor_message = f"Your maximum bid must be at least ${floor:.2f}."
+    if max_amount < floor:
+        return {'outcome': 'too_low', 'message': floor_message, 'minimum_bid': floor}
+
+    ProxyBid.objects.update_or_create(artwork_id=artwork.pk, bidder=bidder, defaults={'max_amount': max_amount})
+    resolution = resolve_proxy_bids(artwork.pk, now=now)
+
+    if resolution['outcome'] == 'resolved':
+        is_leading = resolution['leader_id'] == bidder.pk
+        current_bid = resolution['amount']
+    if resolution['outcome'] not in ('resolved', 'unchanged'):
+        message = f"Your maximum bid of ${max_amount:.2f} has been saved."
+    elif is_leading:
+        message = f"Your maximum bid of ${max_amount:.2f} has been saved. You are the highest bidder at ${current_bid:.2f}."
+    else:
+        message = (f"Your maximum bid of ${max_amount:.2f} has been saved, but another bidder's maximum is higher. "
+                   f"The current bid is ${current_bid:.2f}.")
+    return {'outcome': 'accepted', 'leading': is_leading, 'max_amount': max_amount, 'message': message}
+
+
+def get_auction_state(now=None, **lookup):
+    """
+    Compact, JSON-ready snapshot of a live auction read with a single SELECT, plus its ETag.
+    `lookup` selects the artwork (slug=... or pk=...).
+    Returns (state, etag), or (None, None) if the artwork does not exist.
+    The ETag only changes when a bid is accepted or the effective status changes, so pollers
+    that send it back as If-None-Match get a 304 until something actually happens.
+    """
+    now = now or timezone.now()
+    artwork = Artwork.objects.with_effective_status(now).select_related('auction_current_highest_bidder').only(
+        'slug', 'is_for_auction', 'auction_status', 'auction_signup_deadline', 'auction_start_time',
+        'auction_minimum_bid', 'auction_scheduled_end_time', 'last_bid_time', 'auction_current_highest_bid',
+        'auction_state_version', 'auction_bid_ladder', 'auction_current_highest_bidder__username',
+    ).filter(**lookup).first()
+    if artwork is None:
+        return None, None
+
+    highest_bid = artwork.auction_current_highest_bid
+    highest_bidder = artwork.auction_current_highest_bidder
+    if highest_bid is not None:
+        min_next_bid = highest_bid + BID_INCREMENT
+    else:
+        min_next_bid = artwork.auction_minimum_bid or BID_INCREMENT
+    effective_end_time = artwork.get_effective_end_time()
+
+    state = {
+        'status': artwork.effective_auction_status,
+        'version': artwork.auction_state_version,
+        'highest_bid': f'{highest_bid:.2f}' if highest_bid is not None else None,
+        'highest_bidder': highest_bidder.username if highest_bidder else None,
+        'min_next_bid': f'{min_next_bid:.2f}',
+        'effective_end_time': effective_end_time.isoformat() if effective_end_time else None,
+        'seconds_remaining': max(0, int((effective_end_time - now).total_seconds())) if effective_end_time else 0,
+        'soft_close_active': artwork.is_in_soft_close(),
+        'ladder': artwork.auction_bid_ladder,
+    }
+    etag = f'"{artwork.pk}-{artwork.auction_state_version}-{artwork.effective_auction_status}"'
+    return state, etag
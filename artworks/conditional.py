@@ -0,0 +1,60 @@
+# artworks/conditional.py
+import hashlib
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+# Conditional GET for rendered pages. A view decorated with @conditional_page(validators) first
+# asks `validators(request, *args, **kwargs)` for (etag_parts, last_modified) - normally one small
+# query - and answers 304 before the view runs when the browser's copy is still current.
+#
+# The ETag also covers the requesting user and their CSRF cookie, because the pages greet the user
+# and embed CSRF tokens. It is weak: masked CSRF tokens make every render differ byte for byte.
+
+
+def _has_pending_messages(request):
+    # len() does not mark the messages as read, so a full render still shows them.
+    return len(get_messages(request)) > 0
+
+
+def _page_etag(request, etag_parts):
+    user_id = request.user.pk if request.user.is_authenticated else None
+    raw = repr((etag_parts, user_id, request.META.get('CSRF_COOKIE')))
+    return f'W/"{hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+def conditional_page(validators):
+    """
+    `validators` returns (etag_parts, last_modified) for the page, or None to skip conditional
+    handling (e.g. the object does not exist and the view should raise its own 404).
+    Only GET/HEAD requests without pending flash messages are answered from validators.
+    """
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or _has_pending_messages(request):
+                return view(request, *args, **kwargs)
+            result = validators(request, *args, **kwargs)
+            if result is None:
+                return view(request, *args, **kwargs)
+
+            etag_parts, last_modified = result
+            etag = _page_etag(request, etag_parts)
+            last_modified = int(last_modified.timestamp()) if last_modified else None
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response.headers.setdefault('ETag', etag)
+            if last_modified:
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+            # Always revalidate; the ETag is per user, so a shared cache may only reuse a copy for
+            # the same Cookie header.
+            patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ['Cookie'])
+            return response
+        return inner
+    return decorator
@@ -0,0 +1,155 @@
+# artworks/dekont_thumbnails.py
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+from .images import flatten_to_rgb
+from .models import Transaction
+
+try:
+    import pypdfium2 # Optional: renders PDF pages in-process (pip install pypdfium2)
+except ImportError:
+    pypdfium2 = None
+
+# Small JPEG previews of uploaded dekonts (payment receipts) for the admin, so reviewers can triage
+# them without downloading each multi-megabyte PDF. A preview is built in a background thread once
+# the upload's transaction commits and saved next to the original as "<name>.preview.jpg".
+# PDFs are rasterized with pypdfium2 if installed, else with poppler's pdftoppm if it is on PATH;
+# without either the preview is a plain "PDF" card with the file name and size. Jobs still queued
+# when a worker process exits are lost; `manage.py build_dekont_thumbnails` fills in the gaps.
+DEKONT_THUMBNAIL_WIDTH = 480
+DEKONT_THUMBNAIL_WORKERS = 2
+PDFTOPPM_TIMEOUT = 30
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def thumbnail_name(dekont_name):
+    return f'{os.path.splitext(dekont_name)[0]}.preview.jpg'
+
+
+def _render_pdf_page(data):
+    if pypdfium2 is not None:
+        pdf = pypdfium2.PdfDocument(data)
+        try:
+            page = pdf[0]
+            return page.render(scale=DEKONT_THUMBNAIL_WIDTH / page.get_width()).to_pil()
+        finally:
+            pdf.close()
+    pdftoppm = shutil.which('pdftoppm')
+    if pdftoppm is not None:
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'dekont.pdf')
+            with open(source, 'wb') as f:
+                f.write(data)
+            subprocess.run(
+                [pdftoppm, '-f', '1', '-l', '1', '-singlefile', '-jpeg', '-scale-to', str(DEKONT_THUMBNAIL_WIDTH * 2),
+                 source, os.path.join(directory, 'page')],
+                check=True, capture_output=True, timeout=PDFTOPPM_TIMEOUT,
+            )
+            with Image.open(os.path.join(directory, 'page.jpg')) as page:
+                return page.copy()
+    return None
+
+
+def _pdf_card(name, size):
+    # Stand-in when no PDF renderer is available: at least type, name and size at a glance.
+    card = Image.new('RGB', (DEKONT_THUMBNAIL_WIDTH, round(DEKONT_THUMBNAIL_WIDTH * 1.414)), 'white') # A4
+    draw = ImageDraw.Draw(card)
+    draw.rectangle([0, 0, card.width - 1, card.height - 1], outline='#bbbbbb', width=4)
+    draw.text((card.width / 2, card.height * 0.4), 'PDF', fill='#c62828', anchor='mm', font=ImageFont.load_default(96))
+    font = ImageFont.load_default(22)
+    draw.text((card.width / 2, card.height * 0.58), os.path.basename(name)[:36], fill='#333333', anchor='mm', font=font)
+    draw.text((card.width / 2, card.height * 0.64), filesizeformat(size), fill='#777777', anchor='mm', font=font)
+    return card
+
+
+def _pdf_bytes(data):
+    """The PDF in `data`, or None. E-signed bank receipts (.imz) wrap it in a CMS envelope."""
+    start = data.find(b'%PDF-', 0, 1024)
+    if start == -1 and data[:1] == b'\x30': # DER SEQUENCE: a signed envelope with the PDF embedded
+        start = data.find(b'%PDF-')
+    if start == -1:
+        return None
+    end = data.rfind(b'%%EOF')
+    return data[start:end + 5] if end > start else data[start:]
+
+
+def render_dekont_preview(data, name):
+    """JPEG bytes of a preview of the dekont `data` (PDF or image) uploaded as `name`."""
+    pdf = _pdf_bytes(data)
+    if pdf is not None:
+        image = _render_pdf_page(pdf) or _pdf_card(name, len(data))
+    else:
+        with Image.open(io.BytesIO(data)) as original:
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    image = flatten_to_rgb(image)
+    image.thumbnail((DEKONT_THUMBNAIL_WIDTH, DEKONT_THUMBNAIL_WIDTH * 3), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=80, optimize=True)
+    return buffer.getvalue()
+
+
+def build_dekont_thumbnail(transaction_pk):
+    """Builds and stores the preview for the transaction's current dekont; returns its name, or None."""
+    txn = Transaction.objects.only('pk', 'dekont_image').filter(pk=transaction_pk).first()
+    if txn is None or not txn.dekont_image:
+        return None
+    source_name = txn.dekont_image.name
+    with txn.dekont_image.open('rb') as f:
+        preview = render_dekont_preview(f.read(), source_name)
+
+    name = thumbnail_name(source_name)
+    if default_storage.exists(name):
+        default_storage.delete(name) # A rebuild replaces the old preview rather than adding "_abc123" copies
+    name = default_storage.save(name, ContentFile(preview))
+    # Only attach it if the dekont was not replaced meanwhile; the newer upload has its own job queued.
+    if not Transaction.objects.filter(pk=transaction_pk, dekont_image=source_name).update(dekont_thumbnail=name):
+        default_storage.delete(name)
+        return None
+    print(f"[dekont_thumbnails] Built preview {name} ({len(preview) // 1024} KB) for transaction {transaction_pk}.")
+    return name
+
+
+def _build_in_background(transaction_pk):
+    try:
+        build_dekont_thumbnail(transaction_pk)
+    except Exception as e: # A corrupt upload must not go unnoticed in a pool thread
+        print(f"[dekont_thumbnails] Preview for transaction {transaction_pk} failed: {e!r}")
+    finally:
+        connection.close() # Pool threads get their own connection; close it rather than leak it
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None: # Created lazily so every (forked) worker process gets its own threads
+            _executor = ThreadPoolExecutor(max_workers=DEKONT_THUMBNAIL_WORKERS, thread_name_prefix='dekont-thumbnail')
+    return _executor
+
+
+def schedule_dekont_thumbnail(transaction_pk):
+    """Queues the preview build for after the current transaction commits (so the job sees the upload)."""
+    transaction.on_commit(lambda: _get_executor().submit(_build_in_background, transaction_pk))
+
+
+@receiver(post_save, sender=Transaction)
+def _schedule_thumbnail_on_upload(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'dekont_image' not in update_fields:
+        return
+    if instance.dekont_image and instance.has_changed('dekont_image'):
+        schedule_dekont_thumbnail(instance.pk)
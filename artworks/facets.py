@@ -0,0 +1,227 @@
+# artworks/facets.py
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.http import urlencode
+
+from .models import Artwork
+
+# Facet filters for the gallery list and the catalog-wide counts shown next to them.
+# The counts are computed with three GROUP BY queries, cached, and then kept current by applying
+# each saved or deleted artwork's before/after facet values as a delta, so a request only reads
+# one cache key. Writes that bypass signals (queryset.update()) call invalidate_facet_counts().
+# The read-modify-write deltas can race between workers; FACET_COUNTS_TIMEOUT bounds any drift.
+FACET_COUNTS_KEY = 'artwork-facet-counts'
+FACET_COUNTS_TIMEOUT = 60 * 15
+OWNER_FACET_SIZE = 10
+
+SALE_MODES = [('direct', 'Direct sale'), ('auction', 'Auction'), ('none', 'Not for sale')]
+# (key, label, min, max) - min inclusive, max exclusive, None for open-ended.
+PRICE_BUCKETS = [
+    ('under_100', 'Under $100', None, Decimal('100')),
+    ('100_500', '$100 - $500', Decimal('100'), Decimal('500')),
+    ('500_1000', '$500 - $1,000', Decimal('500'), Decimal('1000')),
+    ('1000_5000', '$1,000 - $5,000', Decimal('1000'), Decimal('5000')),
+    ('5000_up', '$5,000 and up', Decimal('5000'), None),
+]
+FACET_FIELDS = ('is_for_sale_direct', 'is_for_auction', 'auction_status', 'current_owner_id', 'direct_sale_price')
+
+
+# --- Filters ---
+
+def _decimal_or_none(value):
+    try:
+        return Decimal(value) if value not in (None, '') else None
+    except InvalidOperation:
+        return None
+
+
+def parse_facet_filters(params):
+    """The valid facet filters in a GET QueryDict; unknown values are dropped."""
+    filters = {}
+    if params.get('sale') in dict(SALE_MODES):
+        filters['sale'] = params['sale']
+    if params.get('status') in dict(Artwork.AUCTION_STATUS_CHOICES):
+        filters['status'] = params['status']
+    if (params.get('owner') or '').isdigit():
+        filters['owner'] = int(params['owner'])
+    for name in ('min_price', 'max_price'):
+        value = _decimal_or_none(params.get(name))
+        if value is not None:
+            filters[name] = value
+    return filters
+
+
+def apply_facet_filters(queryset, filters):
+    # Each filter matches one of the partial/composite indexes on Artwork (see Meta.indexes).
+    if filters.get('sale') == 'direct':
+        queryset = queryset.filter(is_for_sale_direct=True)
+    elif filters.get('sale') == 'auction':
+        queryset = queryset.filter(is_for_auction=True)
+    elif filters.get('sale') == 'none':
+        queryset = queryset.filter(is_for_sale_direct=False, is_for_auction=False)
+    if 'status' in filters:
+        queryset = queryset.filter(is_for_auction=True, auction_status=filters['status'])
+    if 'owner' in filters:
+        queryset = queryset.filter(current_owner_id=filters['owner'])
+    if 'min_price' in filters or 'max_price' in filters:
+        queryset = queryset.filter(is_for_sale_direct=True)
+        if 'min_price' in filters:
+            queryset = queryset.filter(direct_sale_price__gte=filters['min_price'])
+        if 'max_price' in filters:
+            queryset = queryset.filter(direct_sale_price__lt=filters['max_price'])
+    return queryset
+
+
+def facet_query_string(filters, **changes):
+    """Query string for `filters` with `changes` applied (a None value removes that filter)."""
+    params = dict(filters, **changes)
+    return urlencode({name: value for name, value in params.items() if value is not None})
+
+
+# --- Counts ---
+
+def _sale_mode(values):
+    if values['is_for_sale_direct']:
+        return 'direct'
+    return 'auction' if values['is_for_auction'] else 'none'
+
+
+def _price_bucket(price):
+    for key, _, low, high in PRICE_BUCKETS:
+        if (low is None or price >= low) and (high is None or price < high):
+            return key
+    return None
+
+
+def _compute_facet_counts():
+    counts = {'sale': {}, 'status': {}, 'owner': {}, 'price': {}}
+    for row in Artwork.objects.order_by().values('is_for_sale_direct', 'is_for_auction', 'auction_status').annotate(n=Count('pk')):
+        mode = _sale_mode(row)
+        counts['sale'][mode] = counts['sale'].get(mode, 0) + row['n']
+        if row['is_for_auction']:
+            counts['status'][row['auction_status']] = counts['status'].get(row['auction_status'], 0) + row['n']
+    for row in Artwork.objects.order_by().values('current_owner_id', 'current_owner__username').annotate(n=Count('pk')):
+        counts['owner'][row['current_owner_id']] = [row['current_owner__username'], row['n']]
+    counts['price'] = Artwork.objects.filter(is_for_sale_direct=True, direct_sale_price__isnull=False).aggregate(**{
+        key: Count('pk', filter=Q(
+            **({'direct_sale_price__gte': low} if low is not None else {}),
+            **({'direct_sale_price__lt': high} if high is not None else {}),
+        ))
+        for key, _, low, high in PRICE_BUCKETS
+    })
+    print(f"[facets] Recomputed facet counts for {sum(counts['sale'].values())} artworks.")
+    return counts
+
+
+def get_facet_counts():
+    counts = cache.get(FACET_COUNTS_KEY)
+    if counts is None:
+        counts = _compute_facet_counts()
+        cache.set(FACET_COUNTS_KEY, counts, FACET_COUNTS_TIMEOUT)
+    return counts
+
+
+def invalidate_facet_counts():
+    transaction.on_commit(lambda: cache.delete(FACET_COUNTS_KEY))
+
+
+def _facet_memberships(values):
+    memberships = {('sale', _sale_mode(values)), ('owner', values['current_owner_id'])}
+    if values['is_for_auction']:
+        memberships.add(('status', values['auction_status']))
+    if values['is_for_sale_direct'] and values['direct_sale_price'] is not None:
+        memberships.add(('price', _price_bucket(values['direct_sale_price'])))
+    return memberships
+
+
+def _apply_facet_delta(removed, added):
+    counts = cache.get(FACET_COUNTS_KEY)
+    if counts is None:
+        return # Recomputed on the next read anyway
+    counts['owner'].setdefault(None, [None, 0]) # Gallery-owned artworks need no username
+    if any(facet == 'owner' and value not in counts['owner'] for facet, value in removed | added):
+        cache.delete(FACET_COUNTS_KEY) # A new owner whose username is not cached; recompute
+        return
+    for delta, memberships in ((-1, removed), (1, added)):
+        for facet, value in memberships:
+            if facet == 'owner':
+                counts['owner'][value][1] += delta
+            else:
+                counts[facet][value] = counts[facet].get(value, 0) + delta
+    # Match what a fresh GROUP BY returns: no empty groups (price buckets always have a count).
+    for facet in ('sale', 'status'):
+        counts[facet] = {value: n for value, n in counts[facet].items() if n > 0}
+    counts['owner'] = {owner_id: entry for owner_id, entry in counts['owner'].items() if entry[1] > 0}
+    cache.set(FACET_COUNTS_KEY, counts, FACET_COUNTS_TIMEOUT)
+
+
+def _snapshot(instance):
+    # Read from __dict__ so deferred fields (.only() loads) are never fetched just for this.
+    if any(field not in instance.__dict__ for field in FACET_FIELDS):
+        return None
+    return {field: instance.__dict__[field] for field in FACET_FIELDS}
+
+
+def _loaded_snapshot(instance):
+    # The facet values the instance was loaded with (Artwork tracks them, see tracking.py).
+    if not all(instance.was_loaded(field) for field in FACET_FIELDS):
+        return None
+    return {field: instance.original_value(field) for field in FACET_FIELDS}
+
+
+@receiver(post_save, sender=Artwork)
+def _update_facet_counts_on_save(sender, instance, created, **kwargs):
+    # post_save runs before the tracker takes its new snapshot, so the loaded values are still there.
+    before, after = _loaded_snapshot(instance), _snapshot(instance)
+    if after is None or (before is None and not created):
+        invalidate_facet_counts() # Loaded with deferred facet fields; no reliable "before"
+        return
+    removed = _facet_memberships(before) if before else set()
+    added = _facet_memberships(after)
+    if removed != added:
+        transaction.on_commit(lambda: _apply_facet_delta(removed - added, added - removed))
+
+
+@receiver(post_delete, sender=Artwork)
+def _update_facet_counts_on_delete(sender, instance, **kwargs):
+    before = _loaded_snapshot(instance) or _snapshot(instance)
+    if before is None:
+        invalidate_facet_counts()
+        return
+    removed = _facet_memberships(before)
+    transaction.on_commit(lambda: _apply_facet_delta(removed, set()))
+
+
+def facet_groups(filters, counts):
+    """Facet options for the template: one group per facet, each option with its count and link."""
+    def option(label, count, active, **changes):
+        return {'label': label, 'count': count, 'active': active, 'query': facet_query_string(filters, **changes)}
+
+    sale = [option(label, counts['sale'].get(value, 0), filters.get('sale') == value,
+                   sale=None if filters.get('sale') == value else value)
+            for value, label in SALE_MODES]
+    status = [option(label, counts['status'][value], filters.get('status') == value,
+                     status=None if filters.get('status') == value else value)
+              for value, label in Artwork.AUCTION_STATUS_CHOICES if counts['status'].get(value)]
+    top_owners = sorted(counts['owner'].items(), key=lambda item: -item[1][1])[:OWNER_FACET_SIZE]
+    if 'owner' in filters and filters['owner'] not in dict(top_owners) and filters['owner'] in counts['owner']:
+        top_owners.append((filters['owner'], counts['owner'][filters['owner']]))
+    owner = [option(username or 'Gallery', n, filters.get('owner') == owner_id,
+                    owner=None if filters.get('owner') == owner_id else owner_id)
+             for owner_id, (username, n) in top_owners if owner_id is not None and n > 0]
+    price = []
+    for key, label, low, high in PRICE_BUCKETS:
+        active = filters.get('min_price') == low and filters.get('max_price') == high
+        price.append(option(label, counts['price'].get(key, 0), active,
+                            min_price=None if active else low, max_price=None if active else high))
+    return [
+        {'name': 'Sale mode', 'options': sale},
+        {'name': 'Auction status', 'options': status},
+        {'name': 'Owner', 'options': owner},
+        {'name': 'Direct sale price', 'options': price},
+    ]
@@ -168,4 +168,14 @@ class PlaceBidForm(forms.Form):
         min_value=0.01, # A very small minimum, actual minimum will be enforced by current bid + increment
         decimal_places=2,
         widget=forms.NumberInput(attrs={'step': '0.01', 'placeholder': 'e.g., 125.50'})
-    )
\ No newline at end of file
+    )
+
+
+class ProxyBidForm(forms.Form):
+    max_amount = forms.DecimalField(
+        label="Your Maximum Bid ($)",
+        min_value=0.01, # The real floor (current bid + increment) is enforced by the bidding engine
+        decimal_places=2,
+        widget=forms.NumberInput(attrs={'step': '0.01', 'placeholder': 'e.g., 300.00'}),
+        help_text="We bid for you, one increment at a time, up to this amount."
+    )
@@ -0,0 +1,97 @@
+# artworks/fragment_cache.py
+import time
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Artwork, Bid, Comment
+
+# Rendered card, description and comment fragments live in the default cache. Every key carries
+# the artwork's pk, what was read from the database about it (updated_at; for the comments, their
+# count and latest created_at), so a write made by another worker is picked up even with a
+# per-process locmem cache, and a per-artwork generation token that the signal receivers below
+# replace whenever the artwork, one of its comments or one of its bids is written. Old fragments
+# are never deleted, they just stop being looked up and expire.
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+ARTWORK_CARD_TEMPLATE = 'artworks/includes/artwork_card.html'
+
+
+def _generation_key(artwork_pk):
+    return f'artwork-fragments-gen:{artwork_pk}'
+
+
+def get_fragment_generations(artwork_pks):
+    """{pk: generation token} for the given artworks, creating tokens for the ones without."""
+    keys = {_generation_key(pk): pk for pk in artwork_pks}
+    found = cache.get_many(keys)
+    generations = {keys[key]: token for key, token in found.items()}
+    for key, pk in keys.items():
+        if pk not in generations:
+            cache.add(key, time.time_ns(), None)
+            generations[pk] = cache.get(key) # Another request may have won the add()
+    return generations
+
+
+def get_fragment_generation(artwork_pk):
+    return get_fragment_generations([artwork_pk])[artwork_pk]
+
+
+def invalidate_artwork_fragments(artwork_pk):
+    """
+    Call after writes that bypass signals (queryset.update(), bulk_create()). Deferred until the
+    transaction commits so a concurrent request cannot cache the old state under the new token.
+    """
+    transaction.on_commit(lambda: cache.set(_generation_key(artwork_pk), time.time_ns(), None))
+
+
+@receiver(post_save, sender=Artwork)
+@receiver(post_delete, sender=Artwork)
+def _invalidate_on_artwork_write(sender, instance, **kwargs):
+    invalidate_artwork_fragments(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Bid)
+@receiver(post_delete, sender=Bid)
+def _invalidate_on_related_write(sender, instance, **kwargs):
+    invalidate_artwork_fragments(instance.artwork_id)
+
+
+def _card_key(artwork, generation):
+    return make_template_fragment_key('artwork_card', [
+        artwork.pk, artwork.updated_at.isoformat(), artwork.effective_auction_status, generation,
+    ])
+
+
+def render_artwork_cards(versions):
+    """
+    HTML for the gallery cards of `versions`, a list of artworks annotated with their effective
+    status and loaded with only pk/updated_at. Cached cards come from one get_many(); the misses
+    are fetched in a single query, rendered and stored with set_many().
+    """
+    generations = get_fragment_generations([artwork.pk for artwork in versions])
+    keys = {artwork.pk: _card_key(artwork, generations[artwork.pk]) for artwork in versions}
+    cached = cache.get_many(keys.values())
+
+    missing = [pk for pk, key in keys.items() if key not in cached]
+    if missing:
+        artworks = Artwork.objects.with_effective_status().select_related('current_owner').only(
+            'title', 'slug', 'image', 'image_variants', 'image_placeholder_url', 'updated_at', 'current_owner__username',
+            'is_for_sale_direct', 'direct_sale_price', 'is_for_auction', 'auction_minimum_bid',
+        ).filter(pk__in=missing)
+        rendered = {}
+        for art in artworks:
+            rendered[_card_key(art, generations[art.pk])] = render_to_string(ARTWORK_CARD_TEMPLATE, {'art': art})
+        cache.set_many(rendered, FRAGMENT_CACHE_TIMEOUT)
+        cached.update(rendered)
+        print(f"[fragment_cache] Rendered {len(rendered)} of {len(keys)} artwork card(s).")
+
+    # An artwork deleted between the two queries simply drops out of the page.
+    return [mark_safe(cached[keys[artwork.pk]]) for artwork in versions if keys[artwork.pk] in cached]
@@ -0,0 +1,135 @@
+# artworks/images.py
+import base64
+import hashlib
+import io
+from urllib.parse import quote
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from PIL import Image, ImageFilter, ImageOps
+
+from .fragment_cache import invalidate_artwork_fragments
+from .models import Artwork
+
+# Responsive variants of uploaded artwork images. An upload is resized once to each width in
+# VARIANT_WIDTHS (never upscaled) and encoded as WebP and JPEG; the files are named after a hash of
+# the original's bytes, so re-uploading the same picture reuses them and they can be served with a
+# far-future Cache-Control. What the templates need (names per width, dimensions and a tiny blurred
+# placeholder as a data URI) is kept in Artwork.image_variants, so rendering never touches the disk.
+VARIANT_WIDTHS = (320, 640, 960, 1280, 1920)
+VARIANT_DIR = 'artworks/variants'
+# (extension, Pillow format, save options); JPEG last, it is the <img> fallback.
+VARIANT_FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+PLACEHOLDER_WIDTH = 24
+
+NO_IMAGE_DATA_URI = 'data:image/svg+xml,' + quote(
+    "<svg xmlns='http://www.w3.org/2000/svg' width='300' height='200'>"
+    "<rect width='100%' height='100%' fill='#e0e0e0'/>"
+    "<text x='50%' y='50%' dominant-baseline='middle' text-anchor='middle' fill='#888' "
+    "font-family='sans-serif' font-size='16'>No Image</text></svg>"
+)
+
+
+def _encode(image, pillow_format, options):
+    buffer = io.BytesIO()
+    image.save(buffer, pillow_format, **options)
+    return buffer.getvalue()
+
+
+def flatten_to_rgb(image):
+    # Transparent PNGs get a white background rather than JPEG's black.
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def build_image_variants(image_file):
+    """
+    Writes the variants of `image_file` (an open file or FieldFile) to the default storage and
+    returns the manifest stored in Artwork.image_variants.
+    """
+    image_file.seek(0)
+    data = image_file.read()
+    digest = hashlib.sha256(data).hexdigest()[:24]
+
+    with Image.open(io.BytesIO(data)) as original:
+        image = flatten_to_rgb(ImageOps.exif_transpose(original)) # Phone photos carry their rotation in EXIF
+    width, height = image.size
+    widths = sorted({min(w, width) for w in VARIANT_WIDTHS}, reverse=True)
+
+    variants = {extension: [] for extension, _, _ in VARIANT_FORMATS}
+    source = image
+    for variant_width in widths:
+        # Each size is scaled down from the previous one, which is much cheaper than from the original.
+        if variant_width < source.width:
+            source = source.resize((variant_width, max(1, round(height * variant_width / width))), Image.LANCZOS)
+        for extension, pillow_format, options in VARIANT_FORMATS:
+            name = f'{VARIANT_DIR}/{digest[:2]}/{digest}-{variant_width}w.{extension}'
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(_encode(source, pillow_format, options)))
+            variants[extension].append([variant_width, name])
+
+    tiny = source.resize((PLACEHOLDER_WIDTH, max(1, round(height * PLACEHOLDER_WIDTH / width))), Image.LANCZOS)
+    tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+    placeholder = 'data:image/jpeg;base64,' + base64.b64encode(_encode(tiny, 'JPEG', {'quality': 50})).decode('ascii')
+
+    return {
+        'hash': digest,
+        'width': width,
+        'height': height,
+        'placeholder': placeholder,
+        # Smallest first, the order srcset lists them in.
+        'variants': {extension: entries[::-1] for extension, entries in variants.items()},
+    }
+
+
+def refresh_image_variants(artwork):
+    """(Re)builds the variants of `artwork`'s uploaded image, or clears them if it has none."""
+    variants = build_image_variants(artwork.image) if artwork.image else {}
+    # updated_at moves too, so the detail page's ETag and the cached cards pick up the new images.
+    now = timezone.now()
+    Artwork.objects.filter(pk=artwork.pk).update(image_variants=variants, updated_at=now)
+    artwork.image_variants, artwork.updated_at = variants, now
+    invalidate_artwork_fragments(artwork.pk)
+    print(f"[images] Built {sum(len(v) for v in variants.get('variants', {}).values())} variant(s) for artwork {artwork.pk}.")
+    return variants
+
+
+@receiver(post_save, sender=Artwork)
+def _build_variants_on_upload(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    # post_save runs before the tracker's new snapshot, so has_changed() still compares with the loaded image.
+    # A new artwork without an upload has nothing to build or clear.
+    if instance.has_changed('image') and (instance.image or instance.image_variants):
+        refresh_image_variants(instance)
+
+
+def image_context(artwork):
+    """What the artwork_image tag renders: srcsets per format, the fallback src and the placeholder."""
+    manifest = artwork.image_variants or {}
+    if not artwork.image or not manifest.get('variants'):
+        return None
+    srcsets = {
+        extension: ', '.join(f'{default_storage.url(name)} {width}w' for width, name in entries)
+        for extension, entries in manifest['variants'].items()
+    }
+    jpeg = manifest['variants']['jpeg']
+    fallback = next((name for width, name in jpeg if width >= 640), jpeg[-1][1])
+    return {
+        'webp_srcset': srcsets['webp'],
+        'jpeg_srcset': srcsets['jpeg'],
+        'src': default_storage.url(fallback),
+        'width': manifest['width'],
+        'height': manifest['height'],
+        'placeholder': manifest['placeholder'],
+    }
@@ -0,0 +1,108 @@
+# artworks/live_updates.py
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.utils.module_loading import import_string
+
+DEFAULT_BROADCAST_BACKEND = 'artworks.live_updates.InMemoryBroadcastBackend'
+SSE_HEARTBEAT_SECONDS = 15
+
+
+def auction_channel(artwork_pk):
+    return f'auction:{artwork_pk}'
+
+
+class _Subscription:
+    def __init__(self, loop, max_pending):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_pending)
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop. A watcher that stops reading loses its oldest
+        # events rather than growing the queue without bound.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InMemoryBroadcastBackend:
+    """
+    In-process fan-out hub. Every SSE connection subscribes with its own queue; publish() hands
+    the same already-built event to each of them, so N watchers cost one DB read per event.
+    Only reaches watchers served by the same process: multi-process deployments should point
+    AUCTION_BROADCAST_BACKEND at a backend with the same subscribe/unsubscribe/publish interface
+    that talks to a shared broker.
+    """
+
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock() # publish() is called from sync views running in worker threads
+
+    def subscribe(self, channel):
+        subscription = _Subscription(asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, channel, subscription):
+        with self._lock:
+            self._subscribers[channel].discard(subscription)
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscriptions = list(self._subscribers.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                pass # The subscriber's loop has already shut down
+
+
+_backend = None
+
+def get_broadcast_backend():
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, 'AUCTION_BROADCAST_BACKEND', DEFAULT_BROADCAST_BACKEND)
+        _backend = import_string(backend_path)()
+    return _backend
+
+
+def publish_auction_event(artwork_pk, event_type, data):
+    """Broadcasts an event to every watcher of the artwork once the current transaction commits."""
+    event = {'type': event_type, 'data': data}
+    db_transaction.on_commit(lambda: get_broadcast_backend().publish(auction_channel(artwork_pk), event))
+
+
+def format_sse(event_type, data):
+    return f'event: {event_type}\ndata: {json.dumps(data)}\n\n'
+
+
+async def auction_event_stream(artwork_pk, initial_state):
+    """Async iterator behind the SSE endpoint: the current state first, then every published event."""
+    backend = get_broadcast_backend()
+    channel = auction_channel(artwork_pk)
+    subscription = backend.subscribe(channel)
+    try:
+        yield format_sse('state', initial_state)
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n' # Comment line; keeps proxies from closing an idle stream
+                continue
+            yield format_sse(event['type'], event['data'])
+            if event['type'] == 'result':
+                break # The auction is over; nothing else will be published
+    finally:
+        backend.unsubscribe(channel, subscription)
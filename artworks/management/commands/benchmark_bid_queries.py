@@ -0,0 +1,130 @@
+# artworks/management/commands/benchmark_bid_queries.py
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from artworks.models import AUCTION_BID_LADDER_SIZE, Artwork, Bid
+
+BENCH_PREFIX = 'bench-bids-'
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the database with synthetic bids and times the hot Bid queries: highest bid per artwork, "
+        "top-N bids, the denormalized ladder read, and the old default ordering. Synthetic rows are "
+        "removed afterwards unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bids', type=int, default=100_000, help="Number of Bid rows to generate.")
+        parser.add_argument('--artworks', type=int, default=1_000, help="Number of auctions to spread them over.")
+        parser.add_argument('--bidders', type=int, default=50, help="Number of bidder accounts.")
+        parser.add_argument('--repeat', type=int, default=200, help="Timed runs per query.")
+        parser.add_argument('--compare-without-index', action='store_true',
+                            help="Also time the per-artwork queries with the (artwork, amount, timestamp) index dropped.")
+        parser.add_argument('--keep', action='store_true', help="Leave the synthetic data in place.")
+
+    def handle(self, *args, **options):
+        random.seed(42)
+        artwork_pks = self._populate(options['bids'], options['artworks'], options['bidders'])
+        try:
+            self._run_benchmarks(artwork_pks, options['repeat'], options['compare_without_index'])
+        finally:
+            if not options['keep']:
+                self._cleanup()
+
+    def _populate(self, bid_count, artwork_count, bidder_count):
+        self._cleanup()
+        now = timezone.now()
+        owner = User.objects.create(username=f'{BENCH_PREFIX}owner')
+        bidders = User.objects.bulk_create([User(username=f'{BENCH_PREFIX}bidder-{i}') for i in range(bidder_count)])
+        bidder_pks = [bidder.pk for bidder in User.objects.filter(username__in=[b.username for b in bidders]).only('pk')]
+
+        Artwork.objects.bulk_create([
+            Artwork(
+                title=f'{BENCH_PREFIX}{i}', slug=f'{BENCH_PREFIX}{i}', description='Benchmark auction.',
+                current_owner=owner, is_for_auction=True, auction_status='live', auction_minimum_bid=Decimal('10.00'),
+                auction_start_time=now - timedelta(days=1), auction_scheduled_end_time=now + timedelta(days=1),
+            )
+            for i in range(artwork_count)
+        ], batch_size=1_000)
+        artwork_pks = list(Artwork.objects.filter(slug__startswith=BENCH_PREFIX).values_list('pk', flat=True))
+
+        self.stdout.write(f"Inserting {bid_count:,} bids over {artwork_count:,} artworks...")
+        started = time.perf_counter()
+        batch = []
+        for i in range(bid_count):
+            batch.append(Bid(
+                artwork_id=random.choice(artwork_pks), bidder_id=random.choice(bidder_pks),
+                amount=Decimal(random.randint(1_000, 1_000_000)) / 100,
+                timestamp=now - timedelta(seconds=random.randint(0, 86_400)),
+            ))
+            if len(batch) == 10_000:
+                Bid.objects.bulk_create(batch)
+                batch = []
+        Bid.objects.bulk_create(batch)
+        self.stdout.write(f"  done in {time.perf_counter() - started:.1f}s")
+
+        # Ladders are normally kept up to date by the bidding engine; build them once here.
+        for artwork_pk in artwork_pks:
+            ladder = [
+                {'bidder': username, 'amount': f'{amount:.2f}', 'timestamp': timestamp.isoformat()}
+                for username, amount, timestamp in Bid.objects.filter(artwork_id=artwork_pk).order_by(
+                    '-amount', '-timestamp').values_list('bidder__username', 'amount', 'timestamp')[:AUCTION_BID_LADDER_SIZE]
+            ]
+            Artwork.objects.filter(pk=artwork_pk).update(auction_bid_ladder=ladder)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE') # Fresh planner statistics on both SQLite and PostgreSQL
+        return artwork_pks
+
+    def _time(self, label, artwork_pks, repeat, query):
+        samples = []
+        for _ in range(repeat):
+            artwork_pk = random.choice(artwork_pks)
+            started = time.perf_counter()
+            query(artwork_pk)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+        self.stdout.write(f"  {label:<54} median {statistics.median(samples):8.3f} ms   p95 {p95:8.3f} ms")
+
+    def _run_per_artwork_queries(self, artwork_pks, repeat):
+        self._time("highest bid (finalize_auction)", artwork_pks, repeat,
+                   lambda pk: Bid.objects.filter(artwork_id=pk).order_by('-amount', '-timestamp').first())
+        self._time(f"top {AUCTION_BID_LADDER_SIZE} bids from Bid table", artwork_pks, repeat,
+                   lambda pk: list(Bid.objects.filter(artwork_id=pk).order_by('-amount', '-timestamp')[:AUCTION_BID_LADDER_SIZE]))
+
+    def _run_benchmarks(self, artwork_pks, repeat, compare_without_index):
+        self.stdout.write(f"Bid rows: {Bid.objects.count():,} ({connection.vendor})")
+        self.stdout.write("With the (artwork, -amount, -timestamp) index:")
+        self._run_per_artwork_queries(artwork_pks, repeat)
+        self._time("top bids from denormalized ladder", artwork_pks, repeat,
+                   lambda pk: Artwork.objects.filter(pk=pk).values_list('auction_bid_ladder', flat=True).get())
+
+        self.stdout.write("Unfiltered Bid listing (first 100 rows, e.g. an admin page):")
+        self._time("old default ordering (-artwork, -amount, -timestamp)", artwork_pks, max(1, repeat // 20),
+                   lambda pk: list(Bid.objects.order_by('-artwork', '-amount', '-timestamp')[:100]))
+        self._time("no default ordering", artwork_pks, max(1, repeat // 20),
+                   lambda pk: list(Bid.objects.all()[:100]))
+
+        if compare_without_index:
+            index = next(index for index in Bid._meta.indexes if index.name == 'bid_artwork_amount_ts')
+            with connection.schema_editor() as schema_editor:
+                schema_editor.remove_index(Bid, index)
+            try:
+                self.stdout.write("Without the index (only the plain artwork_id foreign key index):")
+                self._run_per_artwork_queries(artwork_pks, repeat)
+            finally:
+                with connection.schema_editor() as schema_editor:
+                    schema_editor.add_index(Bid, index)
+
+    def _cleanup(self):
+        Artwork.objects.filter(slug__startswith=BENCH_PREFIX).delete() # Cascades to their bids
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
@@ -0,0 +1,115 @@
+# artworks/management/commands/benchmark_search.py
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from artworks.models import Artwork
+from artworks.search import filter_artworks, rebuild_search_index, search_artwork_ids, update_search_index
+
+BENCH_PREFIX = 'bench-search-'
+
+# Common words appear in a large share of the rows, rare ones in a handful, so both ends of the
+# ranking cost show up.
+COMMON_WORDS = ['portrait', 'landscape', 'oil', 'canvas', 'abstract', 'light', 'blue', 'river', 'study', 'night']
+RARE_WORD_COUNT = 20_000
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the database with synthetic artworks and times full-text search (the GIN tsvector index "
+        "on PostgreSQL, the FTS5 table on SQLite) against the old icontains scan. Synthetic rows are "
+        "removed afterwards unless --keep is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--artworks', type=int, default=500_000, help="Number of artworks to generate.")
+        parser.add_argument('--repeat', type=int, default=50, help="Timed runs per query.")
+        parser.add_argument('--keep', action='store_true', help="Leave the synthetic data in place.")
+
+    def handle(self, *args, **options):
+        random.seed(42)
+        self._populate(options['artworks'])
+        try:
+            self._run_benchmarks(options['repeat'])
+        finally:
+            if not options['keep']:
+                self._cleanup()
+
+    def _words(self, count):
+        words = []
+        for _ in range(count):
+            if random.random() < 0.3:
+                words.append(random.choice(COMMON_WORDS))
+            else:
+                words.append(f'w{random.randrange(RARE_WORD_COUNT)}')
+        return ' '.join(words)
+
+    def _populate(self, artwork_count):
+        self._cleanup()
+        owner = User.objects.create(username=f'{BENCH_PREFIX}owner')
+        self.stdout.write(f"Inserting {artwork_count:,} artworks...")
+        started = time.perf_counter()
+        batch = []
+        for i in range(artwork_count):
+            batch.append(Artwork(
+                title=f'{self._words(3)}', slug=f'{BENCH_PREFIX}{i}', description=self._words(40), current_owner=owner,
+            ))
+            if len(batch) == 5_000:
+                Artwork.objects.bulk_create(batch)
+                batch = []
+        Artwork.objects.bulk_create(batch)
+        self.stdout.write(f"  done in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        rebuild_search_index() # bulk_create() sends no post_save
+        self.stdout.write(f"  search index rebuilt in {time.perf_counter() - started:.1f}s")
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _time(self, label, repeat, query):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            query()
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        p95 = samples[max(0, int(len(samples) * 0.95) - 1)]
+        self.stdout.write(f"  {label:<46} median {statistics.median(samples):9.3f} ms   p95 {p95:9.3f} ms")
+
+    def _run_benchmarks(self, repeat):
+        self.stdout.write(f"Artworks: {Artwork.objects.count():,} ({connection.vendor})")
+        rare = lambda: f'w{random.randrange(RARE_WORD_COUNT)}'
+        common = lambda: random.choice(COMMON_WORDS)
+
+        self.stdout.write("Ranked search, first page of 24 (search view):")
+        self._time("rare word", repeat, lambda: search_artwork_ids(rare()))
+        self._time("common word", repeat, lambda: search_artwork_ids(common()))
+        self._time("common + rare word", repeat, lambda: search_artwork_ids(f'{common()} {rare()}'))
+
+        self.stdout.write("Admin changelist filter (count + first page):")
+        def admin_page(term, full_text):
+            if full_text:
+                queryset = filter_artworks(Artwork.objects.all(), term)
+            else:
+                queryset = Artwork.objects.filter(Q(title__icontains=term) | Q(description__icontains=term) | Q(slug__icontains=term))
+            queryset.count()
+            list(queryset.order_by('-pk').values_list('pk', flat=True)[:100])
+        self._time("full-text index, rare word", repeat, lambda: admin_page(rare(), True))
+        self._time("icontains scan, rare word", max(1, repeat // 10), lambda: admin_page(rare(), False))
+
+        self.stdout.write("Incremental index update on save:")
+        pks = list(Artwork.objects.filter(slug__startswith=BENCH_PREFIX).values_list('pk', flat=True)[:1_000])
+        self._time("update_search_index() for one artwork", repeat, lambda: update_search_index([random.choice(pks)]))
+
+    def _cleanup(self):
+        # The synthetic rows have no comments, bids or transactions, so plain DELETEs are enough and
+        # skip half a million post_delete signals (one index DELETE each). The index is then rebuilt once.
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM artworks_artwork WHERE slug LIKE %s", [f'{BENCH_PREFIX}%'])
+        rebuild_search_index()
+        User.objects.filter(username__startswith=BENCH_PREFIX).delete()
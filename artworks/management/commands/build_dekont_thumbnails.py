@@ -0,0 +1,37 @@
+# artworks/management/commands/build_dekont_thumbnails.py
+import subprocess
+import time
+
+from django.core.management.base import BaseCommand
+
+from artworks.dekont_thumbnails import build_dekont_thumbnail
+from artworks.models import Transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds the admin preview thumbnails of uploaded dekonts in this process. By default only for "
+        "dekonts without one (e.g. uploads whose background job was lost to a restart); --all rebuilds "
+        "every preview."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Rebuild existing previews too.")
+
+    def handle(self, *args, **options):
+        transactions = Transaction.objects.exclude(dekont_image='').exclude(dekont_image__isnull=True).order_by('pk')
+        if not options['all']:
+            transactions = transactions.filter(dekont_thumbnail__isnull=True)
+
+        built = failed = 0
+        started = time.perf_counter()
+        for pk in transactions.values_list('pk', flat=True).iterator():
+            try:
+                if build_dekont_thumbnail(pk):
+                    built += 1
+            except (OSError, ValueError, RuntimeError, subprocess.SubprocessError) as e: # Missing file, unreadable file or failed PDF renderer
+                failed += 1
+                self.stderr.write(f"  transaction {pk}: {e!r}")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Built {built} dekont preview(s) in {elapsed:.1f}s; {failed} failed."))
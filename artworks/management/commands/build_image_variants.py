@@ -0,0 +1,38 @@
+# artworks/management/commands/build_image_variants.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from artworks.images import refresh_image_variants
+from artworks.models import Artwork
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds the responsive WebP/JPEG variants and blurred placeholders for uploaded artwork images. "
+        "By default only artworks whose variants are missing; --all rebuilds every one (e.g. after "
+        "changing VARIANT_WIDTHS). Files with the same content are reused, not re-encoded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Rebuild artworks that already have variants too.")
+
+    def handle(self, *args, **options):
+        artworks = Artwork.objects.exclude(image='').exclude(image__isnull=True).order_by('pk')
+        if not options['all']:
+            artworks = artworks.filter(image_variants={})
+
+        built = failed = 0
+        started = time.perf_counter()
+        for artwork in artworks.only('pk', 'image', 'image_variants').iterator(chunk_size=200):
+            try:
+                refresh_image_variants(artwork)
+                built += 1
+            except (OSError, ValueError) as e: # Missing file or not an image Pillow can read
+                failed += 1
+                self.stderr.write(f"  artwork {artwork.pk} ({artwork.image.name}): {e}")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Built variants for {built} artwork(s) in {elapsed:.1f}s; {failed} failed."
+        ))
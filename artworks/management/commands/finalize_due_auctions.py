@@ -0,0 +1,41 @@
+# artworks/management/commands/finalize_due_auctions.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from artworks.auction_lifecycle import sweep_due_auctions
+
+
+class Command(BaseCommand):
+    help = (
+        "Finalizes every live auction whose effective (soft-close extended) end time has passed, "
+        "in indexed batches. Safe to run from several workers or from cron at the same time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="How many due auctions to fetch per query.")
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help="Stop after this many batches (default: until nothing is due).")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep sweeping every --interval seconds instead of exiting.")
+        parser.add_argument('--interval', type=float, default=5,
+                            help="Seconds between sweeps with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            stats = sweep_due_auctions(batch_size=options['batch_size'], max_batches=options['max_batches'])
+            if stats['finalized'] or not options['loop']:
+                average_lag = stats['total_lag_seconds'] / stats['finalized'] if stats['finalized'] else 0.0
+                self.stdout.write(self.style.SUCCESS(
+                    f"Finalized {stats['finalized']} auction(s), skipped {stats['skipped']} "
+                    f"in {stats['batches']} batch(es). Lag after end: avg {average_lag:.1f}s, "
+                    f"max {stats['max_lag_seconds']:.1f}s."
+                ))
+            if not options['loop']:
+                return
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                self.stdout.write("Auction finalization sweeper stopped.")
+                return
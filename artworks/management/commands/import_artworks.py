@@ -0,0 +1,234 @@
+# artworks/management/commands/import_artworks.py
+import csv
+import json
+import os
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import URLValidator, validate_slug
+from django.db import IntegrityError, transaction
+
+from artworks.facets import invalidate_facet_counts
+from artworks.models import Artwork
+from artworks.search import update_search_index
+from artworks.slugs import SlugAllocator
+
+PRICE_LIMIT = Decimal('100000000') # direct_sale_price is max_digits=10, decimal_places=2
+
+
+class RowError(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports artworks from a CSV or JSON Lines file (use - for stdin). Columns/keys: title and "
+        "description (required), slug, image_placeholder_url, owner (a username) and direct_sale_price "
+        "(puts the artwork up for direct sale). Rows are streamed, validated and bulk-inserted in "
+        "batches, one transaction per batch; invalid rows are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help="Path to a .csv or .jsonl file, or - for stdin.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Input format (default: from the file extension).")
+        parser.add_argument('--batch-size', type=int, default=2_000, help="Rows per INSERT batch and transaction.")
+        parser.add_argument('--owner', help="Username to own rows that have no owner column/value.")
+        parser.add_argument('--max-errors', type=int, default=1_000,
+                            help="Abort once this many rows were rejected.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only, insert nothing.")
+
+    # --- Input ---
+
+    def _rows(self, path, input_format):
+        """Yields (line number, dict) without ever holding more than one row."""
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        try:
+            if input_format == 'csv':
+                reader = csv.DictReader(stream)
+                for row in reader:
+                    yield reader.line_num, row
+            else:
+                for line_number, line in enumerate(stream, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield line_number, RowError(f"invalid JSON: {e.msg}")
+                        continue
+                    yield line_number, row if isinstance(row, dict) else RowError("expected a JSON object")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    # --- Validation ---
+
+    def _clean(self, row, slugs, default_owner):
+        if isinstance(row, RowError):
+            raise row
+        value = lambda name: '' if row.get(name) is None else str(row[name]).strip()
+
+        title, description = value('title'), value('description')
+        if not title:
+            raise RowError("title is required")
+        if len(title) > 200:
+            raise RowError("title is longer than 200 characters")
+        if not description:
+            raise RowError("description is required")
+
+        slug = value('slug')
+        if slug:
+            try:
+                validate_slug(slug)
+            except ValidationError:
+                raise RowError(f"slug '{slug}' is not a valid slug")
+            if len(slug) > 255:
+                raise RowError("slug is longer than 255 characters")
+            if slug in slugs:
+                raise RowError(f"slug '{slug}' is already taken")
+
+        url = value('image_placeholder_url')
+        if url:
+            try:
+                self.url_validator(url)
+            except ValidationError:
+                raise RowError(f"image_placeholder_url '{url}' is not a valid URL")
+            if len(url) > 500:
+                raise RowError("image_placeholder_url is longer than 500 characters")
+
+        price = value('direct_sale_price') or None
+        if price is not None:
+            try:
+                price = Decimal(price)
+            except InvalidOperation:
+                raise RowError(f"direct_sale_price '{price}' is not a number")
+            if not price.is_finite() or price < 0 or price >= PRICE_LIMIT or price != price.quantize(Decimal('0.01')):
+                raise RowError(f"direct_sale_price '{price}' must be between 0 and 99999999.99 with at most 2 decimals")
+            price = price.quantize(Decimal('0.01'))
+
+        return {
+            'title': title, 'description': description, 'slug': slug or None, 'image_placeholder_url': url or None,
+            'owner': value('owner') or default_owner, 'direct_sale_price': price,
+        }
+
+    # --- Insert ---
+
+    def _resolve_owners(self, batch):
+        usernames = {row['owner'] for _, row in batch if row['owner'] and row['owner'] not in self.owner_ids}
+        if usernames:
+            self.owner_ids.update(User.objects.filter(username__in=usernames).values_list('username', 'pk'))
+        resolved = []
+        for line_number, row in batch:
+            if row['owner'] and row['owner'] not in self.owner_ids:
+                self._reject(line_number, f"owner '{row['owner']}' does not exist")
+            else:
+                resolved.append((line_number, row))
+        return resolved
+
+    def _build(self, row, slugs):
+        slug = row['slug']
+        if slug:
+            slugs.claim(slug)
+        else:
+            slug = slugs.allocate(row['title'])
+        return Artwork(
+            title=row['title'], slug=slug, description=row['description'],
+            image_placeholder_url=row['image_placeholder_url'], current_owner_id=self.owner_ids.get(row['owner']),
+            is_for_sale_direct=row['direct_sale_price'] is not None, direct_sale_price=row['direct_sale_price'],
+        )
+
+    def _flush(self, batch, slugs, dry_run):
+        batch = self._resolve_owners(batch)
+        if dry_run or not batch:
+            return len(batch)
+        artworks = [self._build(row, slugs) for _, row in batch]
+        try:
+            with transaction.atomic():
+                created = Artwork.objects.bulk_create(artworks)
+                update_search_index(artwork.pk for artwork in created) # bulk_create() sends no post_save
+        except IntegrityError as e:
+            # Someone created one of these slugs after our snapshot. Learn the taken ones and
+            # re-allocate the generated slugs once; file-given slugs that collide are rejected.
+            lines = f"lines {batch[0][0]}-{batch[-1][0]}"
+            taken = set(Artwork.objects.filter(slug__in=[a.slug for a in artworks]).values_list('slug', flat=True))
+            if not taken: # Not a slug race (e.g. an owner deleted meanwhile); retrying the same rows cannot help
+                raise CommandError(f"Inserting {lines} failed: {e}") from e
+            for slug in taken:
+                slugs.claim(slug)
+            retry = []
+            for (line_number, row), artwork in zip(batch, artworks):
+                if artwork.slug in taken and row['slug']:
+                    self._reject(line_number, f"slug '{row['slug']}' was taken during the import")
+                    continue
+                if artwork.slug in taken:
+                    artwork.slug = slugs.allocate(row['title'])
+                retry.append(artwork)
+            try:
+                with transaction.atomic():
+                    created = Artwork.objects.bulk_create(retry)
+                    update_search_index(artwork.pk for artwork in created)
+            except IntegrityError as e:
+                raise CommandError(f"Inserting {lines} failed again after re-allocating taken slugs: {e}") from e
+        return len(created)
+
+    def _reject(self, line_number, message):
+        self.errors += 1
+        if self.errors <= 20:
+            self.stderr.write(f"  line {line_number}: {message}")
+        if self.errors >= self.max_errors:
+            raise CommandError(f"Aborted after {self.errors} rejected rows (--max-errors).")
+
+    def handle(self, *args, **options):
+        path = options['file']
+        input_format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        if path != '-' and not os.path.exists(path):
+            raise CommandError(f"No such file: {path}")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if options['owner'] and not User.objects.filter(username=options['owner']).exists():
+            raise CommandError(f"--owner '{options['owner']}' does not exist.")
+
+        self.url_validator = URLValidator()
+        self.owner_ids = {}
+        self.errors = 0
+        self.max_errors = options['max_errors']
+
+        started = time.perf_counter()
+        slugs = SlugAllocator.from_database()
+        self.stdout.write(f"Loaded {len(slugs):,} existing slugs in {time.perf_counter() - started:.1f}s.")
+
+        read = imported = 0
+        batch = []
+        started = time.perf_counter()
+        try:
+            for line_number, row in self._rows(path, input_format):
+                read += 1
+                try:
+                    cleaned = self._clean(row, slugs, options['owner'])
+                except RowError as e:
+                    self._reject(line_number, str(e))
+                    continue
+                if cleaned['slug']:
+                    slugs.claim(cleaned['slug']) # Catches duplicates within the file too
+                batch.append((line_number, cleaned))
+                if len(batch) >= options['batch_size']:
+                    imported += self._flush(batch, slugs, options['dry_run'])
+                    batch = []
+                    if read % (options['batch_size'] * 25) < options['batch_size']:
+                        elapsed = time.perf_counter() - started
+                        self.stdout.write(f"  {read:,} rows read, {imported:,} imported ({read / elapsed:,.0f} rows/s)")
+            imported += self._flush(batch, slugs, options['dry_run'])
+        finally:
+            if imported and not options['dry_run']:
+                invalidate_facet_counts()
+
+        elapsed = time.perf_counter() - started
+        verb = "validated" if options['dry_run'] else "imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{imported:,} of {read:,} rows {verb}, {self.errors:,} rejected, in {elapsed:.1f}s "
+            f"({read / elapsed if elapsed else 0:,.0f} rows/s)."
+        ))
@@ -0,0 +1,211 @@
+# artworks/management/commands/loadtest_bidding.py
+import contextlib
+import io
+import itertools
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.models import Max
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from artworks import views
+from artworks.models import Artwork, AuctionRegistration, Bid
+
+LOADTEST_PREFIX = 'loadtest-'
+
+
+def _percentile(sorted_samples, fraction):
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples) - 1, int(len(sorted_samples) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds one live auction with N approved bidders and fires concurrent bids at place_bid_view "
+        "through the Django test client from a thread pool. Reports throughput, latency percentiles, "
+        "time spent waiting in the artwork UPDATE (lock wait) and checks the bidding invariants. "
+        "Runs against whatever DATABASES points at (SQLite or PostgreSQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bidders', type=int, default=20, help="Approved bidders to seed.")
+        parser.add_argument('--bids-per-bidder', type=int, default=10, help="Bids each bidder submits.")
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent threads.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true', help="Leave the seeded auction and users in place.")
+        parser.add_argument('--show-view-output', action='store_true',
+                            help="Do not silence the views' debug prints during the run.")
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        artwork, bidders = self._seed(options['bidders'])
+        try:
+            results = self._run(artwork, bidders, options)
+            self._report(artwork, results, options)
+        finally:
+            if not options['keep']:
+                self._cleanup()
+
+    # --- Setup ---
+
+    def _seed(self, bidder_count):
+        self._cleanup()
+        now = timezone.now()
+        owner = User.objects.create(username=f'{LOADTEST_PREFIX}owner')
+        User.objects.bulk_create([User(username=f'{LOADTEST_PREFIX}bidder-{i}') for i in range(bidder_count)])
+        bidders = list(User.objects.filter(username__startswith=f'{LOADTEST_PREFIX}bidder-'))
+
+        artwork = Artwork.objects.create(
+            title=f'{LOADTEST_PREFIX}lot', slug=f'{LOADTEST_PREFIX}lot', description='Load test auction.',
+            current_owner=owner, is_for_auction=True, auction_minimum_bid=Decimal('10.00'),
+            auction_start_time=now - timedelta(minutes=5), auction_scheduled_end_time=now + timedelta(hours=1),
+        )
+        Artwork.objects.filter(pk=artwork.pk).update(auction_status='live') # Skip the scheduler
+        AuctionRegistration.objects.bulk_create([
+            AuctionRegistration(artwork=artwork, user=bidder, status='approved', owner_reviewed_at=now)
+            for bidder in bidders
+        ])
+        return artwork, bidders
+
+    def _cleanup(self):
+        Artwork.objects.filter(slug__startswith=LOADTEST_PREFIX).delete() # Cascades to bids and registrations
+        User.objects.filter(username__startswith=LOADTEST_PREFIX).delete()
+
+    # --- Run ---
+
+    def _run(self, artwork, bidders, options):
+        url = reverse('artworks:place_bid', kwargs={'artwork_slug': artwork.slug})
+        amounts = itertools.count(1_000) # In cents; shared by all threads, so arrival order decides who wins
+        amounts_lock = threading.Lock()
+        results = {'latencies': [], 'update_waits': [], 'outcomes': [], 'errors': []}
+        results_lock = threading.Lock()
+
+        # Record the engine's verdict for every request; the view itself only answers with a redirect.
+        original_place_bid = views.place_bid
+        def recording_place_bid(*args, **kwargs):
+            result = original_place_bid(*args, **kwargs)
+            with results_lock:
+                results['outcomes'].append(result['outcome'])
+            return result
+
+        def bidder_session(bidder):
+            client = Client()
+            client.force_login(bidder)
+            update_waits = []
+
+            def time_artwork_updates(execute, sql, params, many, context):
+                # Only the bid's compare-and-swap UPDATE waits for the row (or database) lock.
+                if not (sql.startswith('UPDATE "artworks_artwork"') and '"auction_current_highest_bid" =' in sql):
+                    return execute(sql, params, many, context)
+                started = time.perf_counter()
+                try:
+                    return execute(sql, params, many, context)
+                finally:
+                    update_waits.append(time.perf_counter() - started)
+
+            latencies, errors = [], []
+            try:
+                with connection.execute_wrapper(time_artwork_updates):
+                    for _ in range(options['bids_per_bidder']):
+                        with amounts_lock:
+                            cents = next(amounts) + random.randint(0, 50)
+                        started = time.perf_counter()
+                        try:
+                            response = client.post(url, {'bid_amount': f'{Decimal(cents) / 100:.2f}'})
+                            if response.status_code != 302:
+                                errors.append(f'HTTP {response.status_code}')
+                        except Exception as e: # e.g. "database is locked" on SQLite under heavy contention
+                            errors.append(f'{type(e).__name__}: {e}')
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connections.close_all() # Each thread has its own connection
+            with results_lock:
+                results['latencies'].extend(latencies)
+                results['update_waits'].extend(update_waits)
+                results['errors'].extend(errors)
+
+        sessions = list(bidders)
+        random.shuffle(sessions)
+        views.place_bid = recording_place_bid
+        try:
+            silence = contextlib.nullcontext() if options['show_view_output'] else contextlib.redirect_stdout(io.StringIO())
+            with override_settings(ALLOWED_HOSTS=['*']), silence:
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                    list(pool.map(bidder_session, sessions))
+                results['elapsed'] = time.perf_counter() - started
+        finally:
+            views.place_bid = original_place_bid
+        return results
+
+    # --- Report ---
+
+    def _report(self, artwork, results, options):
+        latencies = sorted(results['latencies'])
+        waits = sorted(results['update_waits'])
+        outcomes = results['outcomes']
+        requests = len(latencies)
+        accepted = outcomes.count('accepted')
+
+        self.stdout.write(
+            f"{connection.vendor}: {options['bidders']} bidders x {options['bids_per_bidder']} bids, "
+            f"{options['workers']} workers"
+        )
+        self.stdout.write(f"  Requests:   {requests} in {results['elapsed']:.2f}s = {requests / results['elapsed']:.1f} req/s")
+        self.stdout.write(
+            f"  Latency:    p50 {_percentile(latencies, 0.50) * 1000:.1f} ms   p95 {_percentile(latencies, 0.95) * 1000:.1f} ms"
+            f"   p99 {_percentile(latencies, 0.99) * 1000:.1f} ms"
+        )
+        self.stdout.write(
+            f"  Lock wait:  {len(waits)} bid UPDATEs, total {sum(waits):.2f}s, "
+            f"mean {statistics.fmean(waits) * 1000 if waits else 0:.1f} ms, p95 {_percentile(waits, 0.95) * 1000:.1f} ms, "
+            f"max {waits[-1] * 1000 if waits else 0:.1f} ms"
+        )
+        self.stdout.write(
+            f"  Outcomes:   accepted {accepted}, outbid {outcomes.count('outbid')}, closed {outcomes.count('closed')}, "
+            f"errors {len(results['errors'])}"
+        )
+        for error in sorted(set(results['errors']))[:5]:
+            self.stdout.write(f"    {error}")
+
+        failures = self._check_invariants(artwork, accepted)
+        if failures:
+            for failure in failures:
+                self.stdout.write(self.style.ERROR(f"  FAILED: {failure}"))
+            raise CommandError(f"{len(failures)} bidding invariant(s) violated.")
+        self.stdout.write(self.style.SUCCESS("  Invariants hold: monotonic highest bid, no lost updates, artwork matches max Bid."))
+
+    def _check_invariants(self, artwork, accepted):
+        failures = []
+        artwork.refresh_from_db()
+        amounts = list(Bid.objects.filter(artwork=artwork).order_by('pk').values_list('amount', flat=True))
+
+        # Every accepted bid beat the one before it, so in insertion order amounts strictly increase.
+        if any(later <= earlier for earlier, later in zip(amounts, amounts[1:])):
+            failures.append("Bid amounts are not strictly increasing in insertion order.")
+        # Each accepted bid is exactly one Bid row and one version bump.
+        if len(amounts) != accepted:
+            failures.append(f"{accepted} bids were accepted but {len(amounts)} Bid rows exist.")
+        if artwork.auction_state_version != accepted:
+            failures.append(f"auction_state_version is {artwork.auction_state_version}, expected {accepted}.")
+        # The artwork's denormalized state matches the Bid table.
+        top = Bid.objects.filter(artwork=artwork).order_by('-amount', '-timestamp').first()
+        max_amount = Bid.objects.filter(artwork=artwork).aggregate(Max('amount'))['amount__max']
+        if artwork.auction_current_highest_bid != max_amount:
+            failures.append(f"auction_current_highest_bid is {artwork.auction_current_highest_bid}, max Bid is {max_amount}.")
+        if top and artwork.auction_current_highest_bidder_id != top.bidder_id:
+            failures.append("auction_current_highest_bidder is not the bidder of the highest Bid.")
+        if top and artwork.auction_bid_ladder and artwork.auction_bid_ladder[0]['amount'] != f'{top.amount:.2f}':
+            failures.append("The top of auction_bid_ladder does not match the highest Bid.")
+        return failures
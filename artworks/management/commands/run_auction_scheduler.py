@@ -0,0 +1,34 @@
+# artworks/management/commands/run_auction_scheduler.py
+from django.core.management.base import BaseCommand
+
+from artworks.auction_lifecycle import AuctionScheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the auction lifecycle worker: moves auctions through "
+        "configured -> signup_open -> awaiting_start -> live and finalizes them when they end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rescan-interval', type=float, default=30,
+                            help="Seconds between reloads of upcoming transitions from the database.")
+        parser.add_argument('--max-sleep', type=float, default=5,
+                            help="Upper bound on how long the worker sleeps between checks.")
+        parser.add_argument('--once', action='store_true',
+                            help="Apply every transition that is already due, then exit (for cron).")
+
+    def handle(self, *args, **options):
+        scheduler = AuctionScheduler(rescan_interval=options['rescan_interval'], max_sleep=options['max_sleep'])
+
+        if options['once']:
+            scheduler.rescan()
+            applied = scheduler.run_due()
+            self.stdout.write(self.style.SUCCESS(f"Applied {applied} due auction transition(s)."))
+            return
+
+        self.stdout.write("Auction scheduler started. Press Ctrl+C to stop.")
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            self.stdout.write("Auction scheduler stopped.")
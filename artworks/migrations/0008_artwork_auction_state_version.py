@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-16 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0007_remove_artwork_auction_winner_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artwork',
+            name='auction_state_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Bumped on every accepted bid; used as the auction state ETag.'),
+        ),
+    ]
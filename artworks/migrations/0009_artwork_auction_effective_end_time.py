@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:02
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_effective_end_time(apps, schema_editor):
+    Artwork = apps.get_model('artworks', 'Artwork')
+    soft_close_extension = timedelta(minutes=3)
+    for artwork in Artwork.objects.filter(is_for_auction=True, auction_scheduled_end_time__isnull=False).iterator():
+        effective_end_time = artwork.auction_scheduled_end_time
+        if artwork.last_bid_time:
+            effective_end_time = max(effective_end_time, artwork.last_bid_time + soft_close_extension)
+        Artwork.objects.filter(pk=artwork.pk).update(auction_effective_end_time=effective_end_time)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0008_artwork_auction_state_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artwork',
+            name='auction_effective_end_time',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_effective_end_time, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='artwork',
+            index=models.Index(fields=['auction_status', 'auction_effective_end_time'], name='artwork_status_effective_end'),
+        ),
+    ]
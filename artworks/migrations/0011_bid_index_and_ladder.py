@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_bid_ladder(apps, schema_editor):
+    Artwork = apps.get_model('artworks', 'Artwork')
+    Bid = apps.get_model('artworks', 'Bid')
+    for artwork in Artwork.objects.filter(is_for_auction=True, auction_current_highest_bid__isnull=False).iterator():
+        bids = Bid.objects.filter(artwork=artwork).order_by('-amount', '-timestamp')
+        if artwork.auction_start_time:
+            bids = bids.filter(timestamp__gte=artwork.auction_start_time) # Ignore bids left over from earlier auctions
+        ladder = [
+            {'bidder': username, 'amount': f'{amount:.2f}', 'timestamp': timestamp.isoformat()}
+            for username, amount, timestamp in bids.values_list('bidder__username', 'amount', 'timestamp')[:10]
+        ]
+        Artwork.objects.filter(pk=artwork.pk).update(auction_bid_ladder=ladder)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0010_proxybid'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='bid',
+            options={'verbose_name': 'Bid', 'verbose_name_plural': 'Bids'},
+        ),
+        migrations.AddField(
+            model_name='artwork',
+            name='auction_bid_ladder',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['artwork', '-amount', '-timestamp'], name='bid_artwork_amount_ts'),
+        ),
+        migrations.RunPython(backfill_bid_ladder, migrations.RunPython.noop),
+    ]
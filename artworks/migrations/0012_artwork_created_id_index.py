@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0011_bid_index_and_ladder'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='artwork',
+            index=models.Index(fields=['-created_at', '-id'], name='artwork_created_id'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:40
+
+from django.db import migrations
+
+# The full-text index is not part of the model state (see artworks/search.py), so each database
+# gets its own structure here and unsupported databases get none.
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("ALTER TABLE artworks_artwork ADD COLUMN search_vector tsvector")
+        schema_editor.execute(
+            "UPDATE artworks_artwork SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+        )
+        schema_editor.execute("CREATE INDEX artwork_search_vector_gin ON artworks_artwork USING GIN (search_vector)")
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE artworks_artwork_fts USING fts5(title, description, tokenize='porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO artworks_artwork_fts(rowid, title, description) SELECT id, title, description FROM artworks_artwork"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS artwork_search_vector_gin")
+        schema_editor.execute("ALTER TABLE artworks_artwork DROP COLUMN IF EXISTS search_vector")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS artworks_artwork_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0012_artwork_created_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
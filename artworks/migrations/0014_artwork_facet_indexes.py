@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0013_artwork_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='artwork',
+            index=models.Index(condition=models.Q(('is_for_sale_direct', True)), fields=['-created_at', '-id'], name='artwork_direct_created_id'),
+        ),
+        migrations.AddIndex(
+            model_name='artwork',
+            index=models.Index(condition=models.Q(('is_for_sale_direct', True)), fields=['direct_sale_price'], name='artwork_direct_price'),
+        ),
+        migrations.AddIndex(
+            model_name='artwork',
+            index=models.Index(condition=models.Q(('is_for_auction', True)), fields=['auction_status', '-created_at', '-id'], name='artwork_auction_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='artwork',
+            index=models.Index(fields=['current_owner', '-created_at', '-id'], name='artwork_owner_created_id'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 00:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0014_artwork_facet_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artwork',
+            name='image',
+            field=models.ImageField(blank=True, help_text='Uploaded original; resized copies for the gallery are generated from it.', null=True, upload_to='artworks/originals/%Y/%m/'),
+        ),
+        migrations.AddField(
+            model_name='artwork',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
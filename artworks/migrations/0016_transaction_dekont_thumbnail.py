@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 00:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('artworks', '0015_artwork_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='dekont_thumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='dekonts/'),
+        ),
+    ]
@@ -1,18 +1,54 @@
 # artworks/models.py
-from django.db import models
+import time
+
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import User
-from django.utils.text import slugify
 from django.utils import timezone
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from datetime import timedelta
 from decimal import Decimal 
 
-class Artwork(models.Model):
+from .slugs import allocate_slug
+from .tracking import FieldTrackerMixin
+
+# Bids placed close to the scheduled end push the end out by this much ("soft close").
+AUCTION_SOFT_CLOSE_EXTENSION = timedelta(minutes=3)
+AUCTION_BID_LADDER_SIZE = 10
+# Tries at inserting an artwork whose generated slug keeps losing a race (see Artwork.save()).
+SLUG_ALLOCATION_ATTEMPTS = 5
+
+def effective_auction_status_expression(now=None):
+    """
+    SQL (Case/When) counterpart of Artwork.compute_effective_auction_status(), so listings can
+    read the correct status straight from SELECT. Relies on the stored auction_signup_deadline,
+    which Artwork.save() keeps in sync with the start time and offset.
+    """
+    now = now or timezone.now()
+    pending_statuses = ['configured', 'signup_open', 'awaiting_start']
+    return models.Case(
+        models.When(is_for_auction=False, then=models.Value('not_configured')),
+        models.When(auction_status__in=pending_statuses, auction_start_time__isnull=True, then=models.Value('draft')),
+        models.When(auction_status__in=['configured', 'signup_open'], auction_signup_deadline__gt=now,
+                    then=models.Value('signup_open')),
+        models.When(auction_status__in=pending_statuses, auction_start_time__gt=now, then=models.Value('awaiting_start')),
+        models.When(auction_status__in=pending_statuses, then=models.Value('live')),
+        default=models.F('auction_status'),
+        output_field=models.CharField(max_length=30),
+    )
+
+class ArtworkQuerySet(models.QuerySet):
+    def with_effective_status(self, now=None):
+        return self.annotate(effective_auction_status=effective_auction_status_expression(now))
+
+class Artwork(FieldTrackerMixin, models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=255, unique=True, blank=True, help_text="Unique URL-friendly identifier. Leave blank to auto-generate from title.")
     description = models.TextField()
     image_placeholder_url = models.URLField(max_length=500, blank=True, null=True, help_text="URL to a placeholder image for now.")
+    image = models.ImageField(upload_to='artworks/originals/%Y/%m/', blank=True, null=True, help_text="Uploaded original; resized copies for the gallery are generated from it.")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False) # Built by images.refresh_image_variants()
     current_owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="owned_artworks")
     is_for_sale_direct = models.BooleanField(default=False)
     direct_sale_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
@@ -36,28 +72,37 @@ class Artwork(models.Model):
     auction_current_highest_bid = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False)
     auction_current_highest_bidder = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="active_bids_on", editable=False)
     last_bid_time = models.DateTimeField(null=True, blank=True, editable=False)
+    # Scheduled end pushed out by soft close; persisted (and indexed with auction_status) so the
+    # finalization sweeper can find every due auction in one query.
+    auction_effective_end_time = models.DateTimeField(null=True, blank=True, editable=False)
+    auction_state_version = models.PositiveIntegerField(default=0, editable=False, help_text="Bumped on every accepted bid; used as the auction state ETag.")
+    # Top AUCTION_BID_LADDER_SIZE bids, highest first, as [{'bidder', 'amount', 'timestamp'}, ...].
+    # Maintained by the bidding engine so the bidding page never has to query the Bid table.
+    auction_bid_ladder = models.JSONField(default=list, blank=True, editable=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ArtworkQuerySet.as_manager()
+    save_changed_fields_only = True # Never write back bid columns a concurrent request updated
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
-            original_slug = self.slug
-            counter = 1
-            while Artwork.objects.filter(slug=self.slug).exclude(pk=self.pk if self.pk else None).exists():
-                self.slug = f'{original_slug}-{counter}'
-                counter += 1
+        slug_generated = not self.slug
+        if slug_generated:
+            self.slug = allocate_slug(self.title, exclude_pk=self.pk)
 
         # Determine original state if updating an existing artwork
         original_is_for_auction = False
         original_auction_status = 'not_configured' # Default for new or un-auctioned items
-        if self.pk: # If this is an update to an existing object
+        if self.pk and self.was_loaded('is_for_auction') and self.was_loaded('auction_status'):
+            # The values this instance was loaded with are the original state; no query needed
+            original_is_for_auction = self.original_value('is_for_auction')
+            original_auction_status = self.original_value('auction_status')
+        elif self.pk: # Built by hand with a pk, or loaded without these fields
             try:
-                # Fetch only the fields needed to avoid recursion if other fields trigger signals/saves
                 original_data = Artwork.objects.only('is_for_auction', 'auction_status').get(pk=self.pk)
                 original_is_for_auction = original_data.is_for_auction
                 original_auction_status = original_data.auction_status
@@ -111,11 +156,41 @@ class Artwork(models.Model):
             self.auction_current_highest_bid = None
             self.auction_current_highest_bidder = None
             self.last_bid_time = None
-
-        super().save(*args, **kwargs) # Call the "real" save() method.
+            self.auction_bid_ladder = []
+
+        self.auction_effective_end_time = self.get_effective_end_time() if self.is_for_auction else None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'auction_scheduled_end_time', 'last_bid_time'} & set(update_fields):
+            kwargs['update_fields'] = list(update_fields) + ['auction_effective_end_time']
+
+        if not slug_generated:
+            super().save(*args, **kwargs) # Call the "real" save() method.
+            return
+        # Another request may take the same generated slug between allocation and INSERT. The unique
+        # index catches that; retry inside a savepoint so the caller's transaction stays usable.
+        for attempt in range(SLUG_ALLOCATION_ATTEMPTS):
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                lost_race = Artwork.objects.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                if not lost_race or attempt == SLUG_ALLOCATION_ATTEMPTS - 1:
+                    raise
+                print(f"[Artwork Save DEBUG] Slug '{self.slug}' was taken concurrently, allocating another.")
+                self.slug = allocate_slug(self.title, exclude_pk=self.pk)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['auction_status', 'auction_effective_end_time'], name='artwork_status_effective_end'),
+            models.Index(fields=['-created_at', '-id'], name='artwork_created_id'), # Keyset pagination of the gallery list
+            # Facet filters on the gallery list (see facets.py), each in gallery order
+            models.Index(fields=['-created_at', '-id'], condition=models.Q(is_for_sale_direct=True), name='artwork_direct_created_id'),
+            models.Index(fields=['direct_sale_price'], condition=models.Q(is_for_sale_direct=True), name='artwork_direct_price'),
+            models.Index(fields=['auction_status', '-created_at', '-id'], condition=models.Q(is_for_auction=True), name='artwork_auction_status_created'),
+            models.Index(fields=['current_owner', '-created_at', '-id'], name='artwork_owner_created_id'),
+        ]
 
     # ... (Keep all @property methods: is_auction_signup_open_now, is_auction_live_now, etc.) ...
     # ... (Keep get_effective_auction_status_and_save, can_user_register_for_auction, get_user_auction_registration, finalize_auction, cancel_auction_by_owner) ...
@@ -147,53 +222,80 @@ class Artwork(models.Model):
             now = timezone.now()
             if self.auction_signup_deadline > now: return self.auction_signup_deadline - now
         return None
+
+    def get_effective_end_time(self):
+        # Scheduled end, pushed out by the soft-close window after the last bid.
+        if not self.auction_scheduled_end_time: return None
+        if self.last_bid_time:
+            return max(self.auction_scheduled_end_time, self.last_bid_time + AUCTION_SOFT_CLOSE_EXTENSION)
+        return self.auction_scheduled_end_time
+
+    def is_in_soft_close(self):
+        # True once a bid has pushed the end time into the soft-close window.
+        effective_end_time = self.get_effective_end_time()
+        return bool(effective_end_time and self.last_bid_time and
+                    effective_end_time - self.last_bid_time <= AUCTION_SOFT_CLOSE_EXTENSION)
     
-    def get_effective_auction_status_and_save(self):
+    def get_expected_signup_deadline(self):
+        if self.auction_start_time and self.auction_signup_offset_minutes is not None:
+            return self.auction_start_time - timedelta(minutes=self.auction_signup_offset_minutes)
+        return None
+
+    def compute_effective_auction_status(self, now=None):
+        """
+        Side-effect free version of the auction state machine: returns the status this artwork
+        should have at `now` without touching the instance or the database.
+        Mirrors effective_auction_status_expression(), which does the same in SQL.
+        """
         if not self.is_for_auction:
-            if self.auction_status != 'not_configured':
-                self.auction_status = 'not_configured'
-                super(Artwork, self).save(update_fields=['auction_status']) 
-            return self.auction_status
+            return 'not_configured'
+
+        now = now or timezone.now()
+        status = self.auction_status
+        signup_deadline = self.get_expected_signup_deadline()
+
+        if self.auction_start_time and signup_deadline:
+            if status in ['configured', 'signup_open'] and now < signup_deadline:
+                return 'signup_open'
+            if status in ['configured', 'signup_open', 'awaiting_start']:
+                return 'awaiting_start' if now < self.auction_start_time else 'live'
+            return status
+
+        if status in ['configured', 'signup_open', 'awaiting_start'] and \
+           not (self.auction_start_time and self.auction_scheduled_end_time):
+            return 'draft' # Critical times missing
+        return status
+
+    def apply_effective_auction_status(self):
+        """
+        Brings auction_status up to date in memory only; nothing is saved.
+        Uses the `effective_auction_status` annotation when the instance came from
+        Artwork.objects.with_effective_status(), otherwise computes it.
+        """
+        self.auction_status = getattr(self, 'effective_auction_status', None) or self.compute_effective_auction_status()
+        return self.auction_status
 
-        now = timezone.now()
+    def get_effective_auction_status_display(self):
+        status = getattr(self, 'effective_auction_status', None) or self.compute_effective_auction_status()
+        return dict(self.AUCTION_STATUS_CHOICES).get(status, status)
+
+    def get_effective_auction_status_and_save(self):
         original_status = str(self.auction_status) # Make a copy for comparison
         changed_fields = [] 
 
-        expected_deadline = None
-        if self.auction_start_time and self.auction_signup_offset_minutes is not None:
-            expected_deadline = self.auction_start_time - timedelta(minutes=self.auction_signup_offset_minutes)
-        
-        if self.auction_signup_deadline != expected_deadline:
-            self.auction_signup_deadline = expected_deadline
-            if 'auction_signup_deadline' not in changed_fields: changed_fields.append('auction_signup_deadline')
-
-        current_status_before_change = str(self.auction_status) # For logging
-
-        if self.auction_start_time and self.auction_signup_deadline:
-            new_status = current_status_before_change
-
-            if current_status_before_change == 'configured':
-                if now < self.auction_signup_deadline: new_status = 'signup_open'
-                elif now < self.auction_start_time: new_status = 'awaiting_start'
-                else: new_status = 'live'
-            elif current_status_before_change == 'signup_open':
-                if now >= self.auction_signup_deadline:
-                    if now < self.auction_start_time: new_status = 'awaiting_start'
-                    else: new_status = 'live'
-            elif current_status_before_change == 'awaiting_start':
-                if now >= self.auction_start_time: new_status = 'live'
-            
-            if self.auction_status != new_status:
-                self.auction_status = new_status
-                if 'auction_status' not in changed_fields: changed_fields.append('auction_status')
-        
-        elif self.is_for_auction and self.auction_status not in ['not_configured', 'draft', 'live']:
-             if self.auction_status in ['configured', 'signup_open', 'awaiting_start'] and \
-                not (self.auction_start_time and self.auction_scheduled_end_time):
-                 print(f"[EFFECTIVE_STATUS WARNING] Artwork '{self.title}': Status '{self.auction_status}' "
-                       f"but critical times missing. Reverting to 'draft'.")
-                 self.auction_status = 'draft'
-                 if 'auction_status' not in changed_fields: changed_fields.append('auction_status')
+        if self.is_for_auction:
+            expected_deadline = self.get_expected_signup_deadline()
+            if self.auction_signup_deadline != expected_deadline:
+                self.auction_signup_deadline = expected_deadline
+                changed_fields.append('auction_signup_deadline')
+
+        new_status = self.compute_effective_auction_status()
+        if self.auction_status != new_status:
+            if new_status == 'draft':
+                print(f"[EFFECTIVE_STATUS WARNING] Artwork '{self.title}': Status '{self.auction_status}' "
+                      f"but critical times missing. Reverting to 'draft'.")
+            self.auction_status = new_status
+            changed_fields.append('auction_status')
 
         if changed_fields:
             # Important: Use super().save to avoid recursion if save() is overridden
@@ -204,17 +306,21 @@ class Artwork(models.Model):
         return self.auction_status
 
 
-    def can_user_register_for_auction(self, user):
+    # Both lookups accept the request's RequestRegistrationCache (artworks.registration_cache) as
+    # `registrations`, which answers them from memory instead of querying AuctionRegistration.
+    def can_user_register_for_auction(self, user, registrations=None):
         if not user or not user.is_authenticated: return False
         if self.auction_status != 'signup_open': return False
         if self.auction_signup_deadline and timezone.now() >= self.auction_signup_deadline: return False
-        if self.current_owner == user: return False
+        if self.current_owner_id == user.pk: return False # Compare ids; no need to load the owner
+        if registrations is not None: return registrations.get(self) is None
         from artworks.models import AuctionRegistration # Local import for model methods
         if AuctionRegistration.objects.filter(artwork=self, user=user).exists(): return False 
         return True
 
-    def get_user_auction_registration(self, user):
+    def get_user_auction_registration(self, user, registrations=None):
         if not user or not user.is_authenticated: return None
+        if registrations is not None: return registrations.get(self)
         from artworks.models import AuctionRegistration # Local import
         try: return AuctionRegistration.objects.get(artwork=self, user=user)
         except AuctionRegistration.DoesNotExist: return None
@@ -230,7 +336,9 @@ class Artwork(models.Model):
                  print(f"[finalize_auction] Non-live auction '{self.title}' (status {self.auction_status}) passed scheduled end. Resetting.")
                  self.is_for_auction = False 
                  self.save() # Triggers full reset via main save()
-                 return {'outcome': 'no_bids', 'message': 'Auction ended before going live or without bids.'}
+                 outcome_data = {'outcome': 'no_bids', 'message': 'Auction ended before going live or without bids.'}
+                 self._publish_auction_result(outcome_data)
+                 return outcome_data
             else:
                 print(f"[finalize_auction] Auction '{self.title}' (status {self.auction_status}) is not live and has not passed scheduled end.")
                 return {'outcome': 'not_live_or_not_ended', 'message': 'Auction not live or end time not reached.'}
@@ -270,15 +378,30 @@ class Artwork(models.Model):
 
         self.is_for_auction = False 
         self.save() # This will reset status to 'not_configured' and clear transient fields.
+        ProxyBid.objects.filter(artwork=self).delete() # Ceilings only apply to the auction they were set for
         print(f"[finalize_auction] Artwork '{self.title}' auction attempt concluded. is_for_auction: {self.is_for_auction}, new status: {self.auction_status}.")
+        self._publish_auction_result(outcome_data)
         return outcome_data
 
+    def _publish_auction_result(self, outcome_data):
+        from artworks.live_updates import publish_auction_event # Local import, live_updates is outside models
+        winner = outcome_data.get('winner')
+        price = outcome_data.get('price')
+        publish_auction_event(self.pk, 'result', {
+            'outcome': outcome_data.get('outcome'), 'message': outcome_data.get('message'),
+            'winner': winner.username if winner else None,
+            'price': f'{price:.2f}' if price is not None else None,
+        })
+
     def cancel_auction_by_owner(self):
         if self.is_for_auction and self.auction_status in ['configured', 'signup_open', 'awaiting_start', 'live']:
             print(f"Auction for '{self.title}' cancelled by owner. Was: {self.auction_status}")
             self.is_for_auction = False
             self.save() # Triggers full reset
             AuctionRegistration.objects.filter(artwork=self).update(status='cancelled_by_owner_auction_cancel')
+            from artworks.registration_cache import invalidate_registration_caches # Local import, avoids a cycle
+            invalidate_registration_caches() # update() sends no post_save
+            ProxyBid.objects.filter(artwork=self).delete()
             return True
         print(f"Cannot cancel auction for '{self.title}'. Status: {self.auction_status}, is_for_auction: {self.is_for_auction}")
         return False       
@@ -301,7 +424,7 @@ class Comment(models.Model):
     class Meta:
         ordering = ['created_at'] 
 
-class Transaction(models.Model):
+class Transaction(FieldTrackerMixin, models.Model):
     TRANSACTION_STATUS_CHOICES = [
         ('pending_payment', 'Pending Payment'), 
         ('pending_approval', 'Pending Approval'), 
@@ -322,6 +445,7 @@ class Transaction(models.Model):
     final_price = models.DecimalField(max_digits=10, decimal_places=2)
     
     dekont_image = models.FileField(upload_to='dekonts/', null=True, blank=True) 
+    dekont_thumbnail = models.ImageField(upload_to='dekonts/', null=True, blank=True, editable=False) # First-page preview, built in the background
     
     status = models.CharField(max_length=20, choices=TRANSACTION_STATUS_CHOICES, default='pending_payment')
     
@@ -330,6 +454,8 @@ class Transaction(models.Model):
     admin_action_at = models.DateTimeField(null=True, blank=True)
     admin_remarks = models.TextField(blank=True, null=True, help_text="Reason for rejection, or other notes.")
 
+    save_changed_fields_only = True
+
     def __str__(self):
         return f"Transaction for {self.artwork.title} by {self.buyer.username if self.buyer else 'N/A'} - Status: {self.get_status_display()}"
 
@@ -345,16 +471,39 @@ class GallerySetting(models.Model):
     def __str__(self):
         return "Gallery Payment Settings"
 
+    # load() keeps the row in this process and only re-reads it when the version key in the shared
+    # cache moves, which save() does on commit. The object itself is shared through the cache too,
+    # so a worker picking up a new version reads it from there rather than from the database.
+    VERSION_CACHE_KEY = 'gallery-settings-version'
+    _process_cache = (None, None) # (version, instance)
+
     def save(self, *args, **kwargs): 
         self.pk = 1
         super(GallerySetting, self).save(*args, **kwargs)
+        transaction.on_commit(self._publish)
+
+    def _publish(self):
+        version = time.time_ns()
+        cache.set_many({f'gallery-settings:{version}': self, GallerySetting.VERSION_CACHE_KEY: version}, None)
 
     def delete(self, *args, **kwargs): 
         pass
 
     @classmethod
     def load(cls): 
-        obj, created = cls.objects.get_or_create(pk=1)
+        """The settings row, normally without touching the database. Treat it as read-only."""
+        version = cache.get(cls.VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(cls.VERSION_CACHE_KEY, time.time_ns(), None)
+            version = cache.get(cls.VERSION_CACHE_KEY)
+        cached_version, obj = cls._process_cache
+        if cached_version == version and obj is not None:
+            return obj
+        obj = cache.get(f'gallery-settings:{version}')
+        if obj is None:
+            obj, created = cls.objects.get_or_create(pk=1)
+            cache.set(f'gallery-settings:{version}', obj, None)
+        cls._process_cache = (version, obj)
         return obj
     
 class UserProfile(models.Model):
@@ -406,9 +555,32 @@ class Bid(models.Model):
     timestamp = models.DateTimeField(default=timezone.now)
 
     class Meta:
-        ordering = ['-artwork', '-amount', '-timestamp'] # Show highest bids for an artwork first
+        # No default ordering: it was applied to every Bid query. Callers that want the highest bids
+        # order by ('-amount', '-timestamp') within one artwork, which this index serves directly.
+        indexes = [
+            models.Index(fields=['artwork', '-amount', '-timestamp'], name='bid_artwork_amount_ts'),
+        ]
         verbose_name = "Bid"
         verbose_name_plural = "Bids"
 
     def __str__(self):
-        return f"Bid of {self.amount} by {self.bidder.username} on {self.artwork.title}"
\ No newline at end of file
+        return f"Bid of {self.amount} by {self.bidder.username} on {self.artwork.title}"
+
+
+class ProxyBid(models.Model):
+    # A bidder's ceiling for one auction. The bidding engine bids on their behalf, one increment
+    # above the competition, up to max_amount.
+    artwork = models.ForeignKey(Artwork, on_delete=models.CASCADE, related_name='proxy_bids')
+    bidder = models.ForeignKey(User, on_delete=models.CASCADE, related_name='proxy_bids')
+    max_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('artwork', 'bidder') # One ceiling per bidder per auction; raising it updates the row
+        ordering = ['-max_amount', 'created_at'] # Highest ceiling first, earliest wins ties
+        verbose_name = "Proxy Bid"
+        verbose_name_plural = "Proxy Bids"
+
+    def __str__(self):
+        return f"Proxy bid up to {self.max_amount} by {self.bidder.username} on {self.artwork.title}"
@@ -0,0 +1,65 @@
+# artworks/pagination.py
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+# Keyset ("cursor") pagination on (created_at, id), newest first. Unlike OFFSET paging, each page
+# is an index range scan that starts right after the previous page, so page N costs the same as
+# page 1 however many artworks there are. Backed by the ('-created_at', '-id') index on Artwork.
+
+
+def encode_cursor(obj):
+    raw = f'{obj.created_at.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """Returns (created_at, pk), or None for a missing or tampered cursor."""
+    if not value:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        created_at = parse_datetime(created_at)
+        return (created_at, int(pk)) if created_at else None
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, after=None, before=None, page_size=24):
+    """
+    One page of `queryset`, newest first. `after` continues with older rows than that cursor,
+    `before` goes back to newer ones. Returns a dict with 'items' plus 'next_cursor' (older page)
+    and 'previous_cursor' (newer page), each None when there is no such page.
+    """
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    if before:
+        created_at, pk = before
+        rows = list(queryset.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk), created_at__gte=created_at,
+        ).order_by('created_at', 'pk')[:page_size + 1])
+        has_newer = len(rows) > page_size
+        items = rows[:page_size][::-1]
+        return {
+            'items': items,
+            'next_cursor': encode_cursor(items[-1]) if items else None, # We came from an older page
+            'previous_cursor': encode_cursor(items[0]) if has_newer else None,
+        }
+
+    if after:
+        created_at, pk = after
+        # The redundant created_at bound lets the database seek straight into the index instead of
+        # scanning it from the top and filtering (the OR alone is not sargable on SQLite).
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk), created_at__lte=created_at,
+        )
+    rows = list(queryset.order_by('-created_at', '-pk')[:page_size + 1])
+    items = rows[:page_size]
+    return {
+        'items': items,
+        'next_cursor': encode_cursor(items[-1]) if len(rows) > page_size else None,
+        'previous_cursor': encode_cursor(items[0]) if after and items else None,
+    }
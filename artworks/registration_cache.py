@@ -0,0 +1,54 @@
+# artworks/registration_cache.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import AuctionRegistration
+
+# Bumped on every AuctionRegistration write in this process. A cache built under an older
+# generation reloads on its next lookup, so a view that registers the user (or an owner approving
+# them) never reads its own stale answer back.
+_generation = 0
+
+
+@receiver(post_save, sender=AuctionRegistration)
+@receiver(post_delete, sender=AuctionRegistration)
+def _bump_registration_generation(sender, **kwargs):
+    invalidate_registration_caches()
+
+
+def invalidate_registration_caches():
+    """Call after bulk writes that bypass signals, e.g. AuctionRegistration.objects.update()."""
+    global _generation
+    _generation += 1
+
+
+class RequestRegistrationCache:
+    """
+    The request user's auction registrations, loaded with one query on first use and then
+    answered from memory for every artwork the request asks about.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._registrations = None
+        self._generation = None
+
+    def get(self, artwork):
+        """The user's AuctionRegistration for `artwork`, or None."""
+        if not self.user or not self.user.is_authenticated:
+            return None
+        if self._registrations is None or self._generation != _generation:
+            self._generation = _generation
+            self._registrations = {
+                registration.artwork_id: registration
+                for registration in AuctionRegistration.objects.filter(user=self.user)
+            }
+        return self._registrations.get(artwork.pk)
+
+
+def get_registration_cache(request):
+    """The registration cache bound to this request, created on first use."""
+    cache = getattr(request, '_auction_registration_cache', None)
+    if cache is None:
+        cache = request._auction_registration_cache = RequestRegistrationCache(request.user)
+    return cache
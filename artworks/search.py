@@ -0,0 +1,132 @@
+# artworks/search.py
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Artwork
+
+# Full-text search over artwork titles and descriptions, with the title weighted above the
+# description. The index lives outside the ORM and is created by migration 0013 per database:
+#   PostgreSQL - an artworks_artwork.search_vector tsvector column with a GIN index
+#                (setweight 'A' for the title, 'B' for the description);
+#   SQLite     - an FTS5 shadow table artworks_artwork_fts(title, description) keyed by rowid = artwork id.
+# Other databases fall back to unindexed icontains matching.
+# Rows are re-indexed one at a time from post_save, so writes that bypass signals
+# (queryset.update(), bulk_create()) must call update_search_index() or rebuild_search_index().
+
+FTS_TABLE = 'artworks_artwork_fts'
+# bm25() column weights, in the same 1 : 0.4 ratio ts_rank() gives 'A' and 'B' by default.
+FTS5_COLUMN_WEIGHTS = (1.0, 0.4)
+INDEXED_FIELDS = {'title', 'description'}
+
+_PG_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def _vendor():
+    return connection.vendor
+
+
+def _fts5_match(query):
+    """Turns free text into an FTS5 MATCH expression: every word must match, as a prefix."""
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def update_search_index(artwork_pks):
+    """Re-indexes the given artworks from their current title and description."""
+    artwork_pks = list(artwork_pks)
+    if not artwork_pks:
+        return
+    placeholders = ', '.join(['%s'] * len(artwork_pks))
+    with connection.cursor() as cursor:
+        if _vendor() == 'postgresql':
+            cursor.execute(
+                f"UPDATE artworks_artwork SET search_vector = {_PG_VECTOR_SQL} WHERE id IN ({placeholders})",
+                artwork_pks,
+            )
+        elif _vendor() == 'sqlite':
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", artwork_pks)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}(rowid, title, description) "
+                f"SELECT id, title, description FROM artworks_artwork WHERE id IN ({placeholders})",
+                artwork_pks,
+            )
+
+
+def remove_from_search_index(artwork_pk):
+    if _vendor() == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [artwork_pk])
+    # On PostgreSQL the vector is a column of the deleted row itself.
+
+
+def rebuild_search_index():
+    """Re-indexes every artwork, e.g. after a bulk import."""
+    with connection.cursor() as cursor:
+        if _vendor() == 'postgresql':
+            cursor.execute(f"UPDATE artworks_artwork SET search_vector = {_PG_VECTOR_SQL}")
+        elif _vendor() == 'sqlite':
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(f"INSERT INTO {FTS_TABLE}(rowid, title, description) SELECT id, title, description FROM artworks_artwork")
+
+
+@receiver(post_save, sender=Artwork)
+def _index_saved_artwork(sender, instance, update_fields=None, **kwargs):
+    # Auction bookkeeping saves pass update_fields without the text fields; nothing to re-index.
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    update_search_index([instance.pk])
+
+
+@receiver(post_delete, sender=Artwork)
+def _unindex_deleted_artwork(sender, instance, **kwargs):
+    remove_from_search_index(instance.pk)
+
+
+def search_artwork_ids(query, limit=24, offset=0):
+    """Primary keys of the artworks matching `query`, best match first."""
+    query = query.strip()
+    if not query:
+        return []
+    with connection.cursor() as cursor:
+        if _vendor() == 'postgresql':
+            cursor.execute(
+                "SELECT id FROM artworks_artwork, websearch_to_tsquery('english', %s) query "
+                "WHERE search_vector @@ query ORDER BY ts_rank(search_vector, query) DESC, id DESC LIMIT %s OFFSET %s",
+                [query, limit, offset],
+            )
+        elif _vendor() == 'sqlite':
+            match = _fts5_match(query)
+            if not match:
+                return []
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, %s, %s), rowid DESC LIMIT %s OFFSET %s",
+                [match, *FTS5_COLUMN_WEIGHTS, limit, offset],
+            )
+        else:
+            return list(filter_artworks(Artwork.objects.all(), query).order_by('-created_at', '-id')
+                        .values_list('pk', flat=True)[offset:offset + limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def filter_artworks(queryset, query):
+    """`queryset` narrowed to the artworks matching `query` (unranked; used by the admin)."""
+    query = query.strip()
+    if _vendor() == 'postgresql':
+        return queryset.filter(RawSQL(
+            "artworks_artwork.search_vector @@ websearch_to_tsquery('english', %s)", [query], output_field=BooleanField(),
+        ))
+    if _vendor() == 'sqlite':
+        match = _fts5_match(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match]))
+    return queryset.filter(Q(title__icontains=query) | Q(description__icontains=query))
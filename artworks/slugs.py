@@ -0,0 +1,77 @@
+# artworks/slugs.py
+from django.db import connection
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Unique artwork slugs: the slugified title, or "<base>-N" with the lowest free N when the title
+# is taken. Both Artwork.save() and bulk imports go through SlugAllocator; for a single artwork the
+# existing "<base>" / "<base>-..." slugs are read with one indexed query, so a popular title such
+# as "Untitled" costs one query, not one per suffix.
+
+SLUG_MAX_LENGTH = 255
+
+
+def slug_base(title):
+    return slugify(title)[:SLUG_MAX_LENGTH - 8] or 'artwork' # Leaves room for a "-NNNNNNN" suffix
+
+
+def _range_q(base):
+    if connection.vendor == 'sqlite':
+        # SQLite's LIKE cannot use the (BINARY) unique index, a range can: '.' sorts right after '-'.
+        return Q(slug=base) | Q(slug__gt=f'{base}-', slug__lt=f'{base}.')
+    # PostgreSQL serves LIKE 'base-%' from the varchar_pattern_ops index Django adds for slugs,
+    # while a range would follow the locale collation, which ignores punctuation.
+    return Q(slug=base) | Q(slug__startswith=f'{base}-')
+
+
+def allocate_slug(title, exclude_pk=None):
+    """A slug for `title` that no other artwork uses right now (one query)."""
+    return SlugAllocator.for_title(title, exclude_pk=exclude_pk).allocate(title)
+
+
+class SlugAllocator:
+    """
+    Allocates slugs in memory against one snapshot of the existing ones, for imports that create
+    many artworks without a query per row. Slugs created by others after the snapshot are not
+    seen; callers add them with claim() when an insert reports a conflict.
+    """
+
+    def __init__(self, existing_slugs):
+        self._slugs = set(existing_slugs)
+        self._next_suffix = {} # base -> first suffix worth trying next time
+
+    @classmethod
+    def for_title(cls, title, exclude_pk=None):
+        """Snapshot of only the slugs `title` can collide with, optionally ignoring one artwork's own."""
+        from .models import Artwork # Local import, models imports this module
+        existing = Artwork.objects.filter(_range_q(slug_base(title))).order_by() # Skip the default ordering, the rows are only collected
+        if exclude_pk is not None:
+            existing = existing.exclude(pk=exclude_pk)
+        return cls(existing.values_list('slug', flat=True))
+
+    @classmethod
+    def from_database(cls):
+        from .models import Artwork
+        return cls(Artwork.objects.order_by().values_list('slug', flat=True).iterator(chunk_size=10_000))
+
+    def __contains__(self, slug):
+        return slug in self._slugs
+
+    def __len__(self):
+        return len(self._slugs)
+
+    def claim(self, slug):
+        self._slugs.add(slug)
+
+    def allocate(self, title):
+        base = slug_base(title)
+        if base not in self._slugs:
+            self._slugs.add(base)
+            return base
+        suffix = self._next_suffix.get(base, 1)
+        while f'{base}-{suffix}' in self._slugs:
+            suffix += 1
+        self._next_suffix[base] = suffix + 1
+        slug = f'{base}-{suffix}'
+        self._slugs.add(slug)
+        return slug
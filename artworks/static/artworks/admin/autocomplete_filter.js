@@ -0,0 +1,16 @@
+// artworks/static/artworks/admin/autocomplete_filter.js
+// Reloads the changelist filtered by the object picked in an AutocompleteFilter search box.
+'use strict';
+{
+    const $ = django.jQuery;
+    // select2 reports selections through jQuery events, so listen with jQuery rather than addEventListener.
+    $(document).on('change', '.autocomplete-filter select', function() {
+        const wrapper = this.closest('.autocomplete-filter');
+        const params = new URLSearchParams(wrapper.dataset.baseQuery);
+        if (this.value) {
+            params.set(wrapper.dataset.lookupKwarg, this.value);
+        }
+        params.delete('p'); // Back to the first page
+        window.location.search = params.toString();
+    });
+}
@@ -2,6 +2,8 @@
 from django import template
 from django.utils.translation import ngettext_lazy, gettext_lazy as _
 
+from ..images import NO_IMAGE_DATA_URI, image_context
+
 register = template.Library()
 
 @register.filter
@@ -28,4 +30,23 @@ def humanize_timedelta(timedelta_obj):
         else: # If it's zero or negative, though our view logic should prevent negative.
             return _("now") 
     
-    return ", ".join(str(p) for p in parts) # Ensure parts are strings for join
\ No newline at end of file
+    return ", ".join(str(p) for p in parts) # Ensure parts are strings for join
+
+# `sizes` for the gallery cards: full width on phones, a ~300px column otherwise.
+CARD_IMAGE_SIZES = '(max-width: 640px) 100vw, 300px'
+
+@register.inclusion_tag('artworks/includes/artwork_image.html')
+def artwork_image(artwork, sizes=CARD_IMAGE_SIZES, eager=False, style=''):
+    """
+    <picture> for an artwork: WebP and JPEG srcsets of the generated variants, lazy-loaded over a
+    blurred placeholder. Pass eager=True for the main image above the fold. Artworks without an
+    upload fall back to image_placeholder_url, then to an inline "No Image" graphic.
+    """
+    return {
+        'artwork': artwork,
+        'image': image_context(artwork),
+        'sizes': sizes,
+        'eager': eager,
+        'style': style,
+        'no_image': NO_IMAGE_DATA_URI,
+    }
@@ -1,3 +1,416 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .bidding import MAX_RESOLVE_ATTEMPTS, _plan_proxy_resolution, place_bid, resolve_proxy_bids, set_proxy_bid
+from .slugs import SlugAllocator
+from .models import (Artwork, AuctionRegistration, Bid, Comment, GallerySetting, ProxyBid, Transaction,
+                     UserProfile)
+
+
+class AdminChangelistQueryCountTests(TestCase):
+    """
+    Every admin changelist must cost a fixed number of queries, however many rows the page shows:
+    a column or __str__ that follows a foreign key without list_select_related adds one query per row.
+    """
+    QUERY_BUDGET = 15
+    MODELS = (Artwork, Comment, Transaction, AuctionRegistration, Bid, ProxyBid, GallerySetting, UserProfile, User)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'admin-password')
+        GallerySetting.objects.create()
+        cls.seeded = 0
+
+    def seed(self, count):
+        """Adds `count` rows to every model, each with its own artwork and users so no FK repeats."""
+        for _ in range(count):
+            n = AdminChangelistQueryCountTests.seeded = AdminChangelistQueryCountTests.seeded + 1
+            owner = User.objects.create_user(f'owner{n}')
+            buyer = User.objects.create_user(f'buyer{n}')
+            artwork = Artwork.objects.create(title=f'Artwork {n}', description='Seeded', current_owner=owner,
+                                             is_for_sale_direct=True, direct_sale_price=Decimal('100'))
+            Comment.objects.create(artwork=artwork, user=buyer if n % 2 else None, guest_name=f'Guest {n}',
+                                   text_content='Seeded comment')
+            Transaction.objects.create(artwork=artwork, buyer=buyer, seller=owner, sale_type='direct_buy',
+                                       final_price=Decimal('100'), status='pending_approval')
+            AuctionRegistration.objects.create(artwork=artwork, user=buyer)
+            Bid.objects.create(artwork=artwork, bidder=buyer, amount=Decimal('150'))
+            ProxyBid.objects.create(artwork=artwork, bidder=buyer, max_amount=Decimal('300'))
+
+    def changelist_query_counts(self):
+        counts = {}
+        for model in self.MODELS:
+            url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            counts[model.__name__] = len(queries)
+        return counts
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.client.force_login(self.admin_user)
+        self.seed(2)
+        self.changelist_query_counts() # Warm per-process caches (content types, permissions)
+        few = self.changelist_query_counts()
+        self.seed(20)
+        many = self.changelist_query_counts()
+
+        for model in self.MODELS:
+            with self.subTest(model=model.__name__):
+                self.assertEqual(many[model.__name__], few[model.__name__])
+                self.assertLessEqual(many[model.__name__], self.QUERY_BUDGET)
+
+
+class TransactionAdminActionTests(TestCase):
+    """The approve/reject admin actions update transactions and artworks with set-based UPDATEs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'admin-password')
+        cls.owner = User.objects.create_user('owner')
+        cls.buyer = User.objects.create_user('buyer')
+        cls.other_buyer = User.objects.create_user('other-buyer')
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def direct_sale(self, buyer=None, artwork=None):
+        artwork = artwork or Artwork.objects.create(title='Direct', description='For sale', current_owner=self.owner,
+                                                    is_for_sale_direct=True, direct_sale_price=Decimal('100.00'))
+        return Transaction.objects.create(artwork=artwork, buyer=buyer or self.buyer, seller=self.owner,
+                                          sale_type='direct_buy', final_price=Decimal('100.00'), status='pending_approval')
+
+    def auction_win(self):
+        now = timezone.now()
+        artwork = Artwork.objects.create(
+            title='Auctioned', description='Won', current_owner=self.owner, is_for_auction=True,
+            auction_minimum_bid=Decimal('10.00'), auction_start_time=now - timedelta(hours=2),
+            auction_scheduled_end_time=now - timedelta(hours=1),
+        )
+        # State as the winner's transaction can find it: the auction columns still filled in.
+        Artwork.objects.filter(pk=artwork.pk).update(
+            auction_status='live', auction_current_highest_bid=Decimal('50.00'),
+            auction_current_highest_bidder=self.buyer, last_bid_time=now - timedelta(hours=1),
+            auction_bid_ladder=[{'bidder': 'buyer', 'amount': '50.00', 'timestamp': now.isoformat()}],
+        )
+        return Transaction.objects.create(artwork=artwork, buyer=self.buyer, seller=self.owner,
+                                          sale_type='auction_win', final_price=Decimal('50.00'), status='pending_approval')
+
+    def run_action(self, action, *transactions):
+        return self.client.post(reverse('admin:artworks_transaction_changelist'), {
+            'action': action, '_selected_action': [txn.pk for txn in transactions],
+        })
+
+    def test_approve_direct_sale_transfers_ownership(self):
+        txn = self.direct_sale()
+        self.run_action('approve_transactions', txn)
+
+        txn.refresh_from_db()
+        artwork = Artwork.objects.get(pk=txn.artwork_id)
+        self.assertEqual(txn.status, 'approved')
+        self.assertIsNotNone(txn.admin_action_at)
+        self.assertEqual(artwork.current_owner, self.buyer)
+        self.assertFalse(artwork.is_for_sale_direct)
+        self.assertIsNone(artwork.direct_sale_price)
+        self.assertEqual(LogEntry.objects.filter(user=self.admin_user).count(), 2) # The transaction and the artwork
+
+    def test_approve_auction_win_resets_the_auction(self):
+        txn = self.auction_win()
+        self.run_action('approve_transactions', txn)
+
+        artwork = Artwork.objects.get(pk=txn.artwork_id)
+        self.assertEqual(artwork.current_owner, self.buyer)
+        self.assertFalse(artwork.is_for_auction)
+        self.assertEqual(artwork.auction_status, 'not_configured')
+        self.assertIsNone(artwork.auction_start_time)
+        self.assertIsNone(artwork.auction_scheduled_end_time)
+        self.assertIsNone(artwork.auction_effective_end_time)
+        self.assertIsNone(artwork.auction_minimum_bid)
+        self.assertIsNone(artwork.auction_current_highest_bid)
+        self.assertIsNone(artwork.auction_current_highest_bidder)
+        self.assertIsNone(artwork.last_bid_time)
+        self.assertEqual(artwork.auction_bid_ladder, [])
+
+    def test_latest_buyer_wins_when_two_transactions_share_an_artwork(self):
+        first = self.direct_sale(buyer=self.buyer)
+        latest = self.direct_sale(buyer=self.other_buyer, artwork=first.artwork)
+        Transaction.objects.filter(pk=first.pk).update(initiated_at=timezone.now() - timedelta(hours=1))
+        self.run_action('approve_transactions', latest, first)
+
+        self.assertEqual(Artwork.objects.get(pk=first.artwork_id).current_owner, self.other_buyer)
+        self.assertEqual(Transaction.objects.filter(pk__in=[first.pk, latest.pk], status='approved').count(), 2)
+
+    def test_reject_auction_win_leaves_no_auction(self):
+        txn = self.auction_win()
+        Artwork.objects.filter(pk=txn.artwork_id).update(is_for_auction=False) # As finalize_auction() leaves it
+        self.run_action('reject_transactions', txn)
+
+        txn.refresh_from_db()
+        artwork = Artwork.objects.get(pk=txn.artwork_id)
+        self.assertEqual(txn.status, 'rejected')
+        self.assertEqual(artwork.current_owner, self.owner)
+        self.assertEqual(artwork.auction_status, 'not_configured')
+        self.assertIn(artwork.auction_status, dict(Artwork.AUCTION_STATUS_CHOICES))
+        self.assertIsNone(artwork.auction_current_highest_bidder)
+
+    def test_failed_log_write_rolls_back_both_updates(self):
+        txn = self.direct_sale()
+        with mock.patch.object(LogEntry.objects, 'log_actions', side_effect=RuntimeError('log write failed')):
+            with self.assertRaises(RuntimeError):
+                self.run_action('approve_transactions', txn)
+
+        txn.refresh_from_db()
+        self.assertEqual(txn.status, 'pending_approval')
+        self.assertIsNone(txn.admin_action_at)
+        self.assertEqual(Artwork.objects.get(pk=txn.artwork_id).current_owner, self.owner)
+
+
+class ImportArtworksInsertErrorTests(TestCase):
+    """import_artworks re-allocates slugs taken after its snapshot; other insert errors stop it with the lines."""
+
+    def setUp(self):
+        Artwork.objects.create(title='Existing Title', description='Already there') # slug 'existing-title'
+        handle, self.path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', newline='') as f:
+            f.write('title,description\nExisting Title,Imported\nAnother Title,Imported\n')
+        self.addCleanup(os.remove, self.path)
+        # An empty snapshot stands in for a slug created by someone else after the import read it.
+        patcher = mock.patch.object(SlugAllocator, 'from_database', classmethod(lambda cls: cls([])))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def import_file(self):
+        call_command('import_artworks', self.path, stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_slug_taken_after_the_snapshot_is_reallocated(self):
+        self.import_file()
+        self.assertEqual(sorted(Artwork.objects.filter(description='Imported').values_list('slug', flat=True)),
+                         ['another-title', 'existing-title-1'])
+
+    def test_other_integrity_error_reports_the_lines(self):
+        Artwork.objects.all().delete() # Nothing taken, so the slug race cannot explain the error
+        with mock.patch.object(Artwork.objects, 'bulk_create', side_effect=IntegrityError('FOREIGN KEY constraint failed')):
+            with self.assertRaisesMessage(CommandError, 'Inserting lines 2-3 failed: FOREIGN KEY constraint failed'):
+                self.import_file()
+
+    def test_second_collision_reports_the_lines(self):
+        errors = [IntegrityError('UNIQUE constraint failed'), IntegrityError('UNIQUE constraint failed')]
+        with mock.patch.object(Artwork.objects, 'bulk_create', side_effect=errors):
+            with self.assertRaisesMessage(CommandError, 'Inserting lines 2-3 failed again'):
+                self.import_file()
+
+
+class ProxyResolutionPlanTests(SimpleTestCase):
+    """_plan_proxy_resolution() is pure: (leader_id, price, bid rows) from the auction and the ceilings."""
+
+    def auction(self, current_bid=None, holder_id=None, minimum_bid=Decimal('5.00')):
+        return {
+            'auction_current_highest_bid': current_bid,
+            'auction_current_highest_bidder_id': holder_id,
+            'auction_minimum_bid': minimum_bid,
+        }
+
+    def test_tied_ceilings_go_to_the_leader(self):
+        plan = _plan_proxy_resolution(self.auction(Decimal('10.00'), holder_id=1),
+                                      [(1, Decimal('20.00')), (2, Decimal('20.00'))])
+        self.assertEqual(plan, (1, Decimal('20.00'), [(1, Decimal('20.00'))]))
+
+    def test_tied_challengers_go_to_the_earliest(self):
+        plan = _plan_proxy_resolution(self.auction(), [(2, Decimal('50.00')), (3, Decimal('50.00'))])
+        self.assertEqual(plan, (2, Decimal('50.00'), [(2, Decimal('50.00'))]))
+
+    def test_challenger_leads_one_increment_above_the_runner_up(self):
+        plan = _plan_proxy_resolution(self.auction(Decimal('10.00'), holder_id=1),
+                                      [(2, Decimal('30.00')), (1, Decimal('15.00'))])
+        self.assertEqual(plan, (2, Decimal('16.00'), [(1, Decimal('15.00')), (2, Decimal('16.00'))]))
+
+    def test_increment_is_capped_at_the_challengers_ceiling(self):
+        plan = _plan_proxy_resolution(self.auction(Decimal('10.00'), holder_id=1),
+                                      [(2, Decimal('30.00')), (1, Decimal('29.50'))])
+        self.assertEqual(plan, (2, Decimal('30.00'), [(1, Decimal('29.50')), (2, Decimal('30.00'))]))
+
+    def test_increment_is_capped_at_the_leaders_ceiling(self):
+        plan = _plan_proxy_resolution(self.auction(Decimal('10.00'), holder_id=1),
+                                      [(1, Decimal('20.00')), (2, Decimal('19.50'))])
+        self.assertEqual(plan, (1, Decimal('20.00'), [(2, Decimal('19.50')), (1, Decimal('20.00'))]))
+
+    def test_ceiling_below_the_reserve_changes_nothing(self):
+        self.assertIsNone(_plan_proxy_resolution(self.auction(minimum_bid=Decimal('100.00')), [(2, Decimal('99.00'))]))
+
+    def test_first_bid_opens_at_the_reserve(self):
+        plan = _plan_proxy_resolution(self.auction(minimum_bid=Decimal('100.00')), [(2, Decimal('150.00'))])
+        self.assertEqual(plan, (2, Decimal('100.00'), [(2, Decimal('100.00'))]))
+
+    def test_competing_first_bids_clear_the_reserve(self):
+        plan = _plan_proxy_resolution(self.auction(minimum_bid=Decimal('100.00')),
+                                      [(2, Decimal('150.00')), (3, Decimal('120.00'))])
+        self.assertEqual(plan, (2, Decimal('121.00'), [(3, Decimal('120.00')), (2, Decimal('121.00'))]))
+
+
+def create_live_auction(owner, minimum_bid=Decimal('10.00')):
+    """A live auction that started an hour ago and ends in an hour, as the scheduler would leave it."""
+    now = timezone.now()
+    artwork = Artwork.objects.create(
+        title='Live Auction', description='Bidding test', current_owner=owner, is_for_auction=True,
+        auction_minimum_bid=minimum_bid, auction_start_time=now - timedelta(hours=1),
+        auction_scheduled_end_time=now + timedelta(hours=1),
+    )
+    Artwork.objects.filter(pk=artwork.pk).update(auction_status='live')
+    artwork.refresh_from_db()
+    return artwork
+
+
+class PlaceBidCompareAndSwapTests(TestCase):
+    """place_bid() only changes the artwork if its conditional UPDATE still matches the row."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner')
+        cls.first = User.objects.create_user('first')
+        cls.second = User.objects.create_user('second')
+
+    def setUp(self):
+        self.artwork = create_live_auction(self.owner)
+
+    def test_stale_bid_is_rejected_after_a_concurrent_higher_bid(self):
+        stale = Artwork.objects.get(pk=self.artwork.pk) # Read before the other bid landed
+        self.assertEqual(place_bid(self.artwork, self.first, Decimal('20.00'))['outcome'], 'accepted')
+
+        result = place_bid(stale, self.second, Decimal('15.00'))
+
+        self.assertEqual(result['outcome'], 'outbid')
+        self.assertEqual(result['current_highest_bid'], Decimal('20.00'))
+        self.artwork.refresh_from_db()
+        self.assertEqual(self.artwork.auction_current_highest_bid, Decimal('20.00'))
+        self.assertEqual(self.artwork.auction_current_highest_bidder, self.first)
+        self.assertEqual(Bid.objects.filter(artwork=self.artwork).count(), 1)
+
+    def test_equal_bid_does_not_replace_the_leader(self):
+        place_bid(self.artwork, self.first, Decimal('20.00'))
+        self.assertEqual(place_bid(self.artwork, self.second, Decimal('20.00'))['outcome'], 'outbid')
+        self.artwork.refresh_from_db()
+        self.assertEqual(self.artwork.auction_current_highest_bidder, self.first)
+
+    def test_first_bid_below_the_minimum_is_rejected(self):
+        result = place_bid(self.artwork, self.first, Decimal('9.99'))
+        self.assertEqual(result['outcome'], 'outbid')
+        self.assertEqual(result['minimum_bid'], Decimal('10.00'))
+        self.assertFalse(Bid.objects.filter(artwork=self.artwork).exists())
+
+    def test_bid_after_the_end_is_rejected(self):
+        result = place_bid(self.artwork, self.first, Decimal('20.00'), now=timezone.now() + timedelta(hours=2))
+        self.assertEqual(result['outcome'], 'closed')
+        self.assertFalse(Bid.objects.filter(artwork=self.artwork).exists())
+
+
+class ProxyBiddingTests(TestCase):
+    """Stored ceilings resolved against the database: guarded UPDATE, Bid rows, ladder and validation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner')
+        cls.alice = User.objects.create_user('alice')
+        cls.bob = User.objects.create_user('bob')
+        cls.carol = User.objects.create_user('carol')
+
+    def setUp(self):
+        self.artwork = create_live_auction(self.owner)
+        self.initial_version = self.artwork.auction_state_version
+
+    def bids(self):
+        return list(Bid.objects.filter(artwork=self.artwork).order_by('amount').values_list('bidder__username', 'amount'))
+
+    def test_two_proxies_and_a_manual_bid(self):
+        self.assertTrue(set_proxy_bid(self.artwork, self.alice, Decimal('50.00'))['leading']) # Opens at the minimum
+        self.assertFalse(set_proxy_bid(self.artwork, self.bob, Decimal('30.00'))['leading']) # Alice answers with 31
+
+        result = place_bid(self.artwork, self.carol, Decimal('40.00'))
+
+        self.assertEqual(result['outcome'], 'accepted')
+        self.assertTrue(result['outbid_by_proxy'])
+        self.artwork.refresh_from_db()
+        self.assertEqual(self.artwork.auction_current_highest_bid, Decimal('41.00'))
+        self.assertEqual(self.artwork.auction_current_highest_bidder, self.alice)
+        self.assertEqual(self.bids(), [
+            ('alice', Decimal('10.00')), ('bob', Decimal('30.00')), ('alice', Decimal('31.00')),
+            ('carol', Decimal('40.00')), ('alice', Decimal('41.00')),
+        ])
+        # One bump per accepted change: two proxy resolutions, the manual bid and the proxy answering it.
+        self.assertEqual(self.artwork.auction_state_version, self.initial_version + 4)
+        self.assertEqual([(entry['bidder'], entry['amount']) for entry in self.artwork.auction_bid_ladder], [
+            ('alice', '41.00'), ('carol', '40.00'), ('alice', '31.00'), ('bob', '30.00'), ('alice', '10.00'),
+        ])
+
+    def test_concurrent_change_replans_from_fresh_state(self):
+        ProxyBid.objects.create(artwork=self.artwork, bidder=self.alice, max_amount=Decimal('50.00'))
+        plans = []
+
+        def plan_after_a_concurrent_bid(auction, proxies):
+            plans.append(auction['auction_state_version'])
+            if len(plans) == 1: # Another bid lands between the read and the guarded UPDATE
+                Artwork.objects.filter(pk=self.artwork.pk).update(auction_state_version=F('auction_state_version') + 1)
+            return _plan_proxy_resolution(auction, proxies)
+
+        with mock.patch('artworks.bidding._plan_proxy_resolution', side_effect=plan_after_a_concurrent_bid):
+            result = resolve_proxy_bids(self.artwork.pk)
+
+        self.assertEqual(result, {'outcome': 'resolved', 'leader_id': self.alice.pk, 'amount': Decimal('10.00'), 'bids': 1})
+        self.assertEqual(plans, [self.initial_version, self.initial_version + 1])
+        self.assertEqual(self.bids(), [('alice', Decimal('10.00'))])
+
+    def test_gives_up_after_repeated_conflicts(self):
+        ProxyBid.objects.create(artwork=self.artwork, bidder=self.alice, max_amount=Decimal('50.00'))
+
+        def plan_and_lose_the_race(auction, proxies):
+            Artwork.objects.filter(pk=self.artwork.pk).update(auction_state_version=F('auction_state_version') + 1)
+            return _plan_proxy_resolution(auction, proxies)
+
+        with mock.patch('artworks.bidding._plan_proxy_resolution', side_effect=plan_and_lose_the_race) as planner:
+            self.assertEqual(resolve_proxy_bids(self.artwork.pk), {'outcome': 'conflict'})
+
+        self.assertEqual(planner.call_count, MAX_RESOLVE_ATTEMPTS)
+        self.assertEqual(self.bids(), [])
+        self.artwork.refresh_from_db()
+        self.assertIsNone(self.artwork.auction_current_highest_bid)
+
+    def test_ceiling_below_the_next_bid_is_refused(self):
+        place_bid(self.artwork, self.carol, Decimal('20.00'))
+        result = set_proxy_bid(self.artwork, self.bob, Decimal('20.50'))
+        self.assertEqual(result['outcome'], 'too_low')
+        self.assertEqual(result['minimum_bid'], Decimal('21.00'))
+        self.assertFalse(ProxyBid.objects.filter(artwork=self.artwork, bidder=self.bob).exists())
+
+    def test_leader_cannot_go_below_their_own_bid(self):
+        place_bid(self.artwork, self.carol, Decimal('20.00'))
+        result = set_proxy_bid(self.artwork, self.carol, Decimal('19.00'))
+        self.assertEqual(result['outcome'], 'too_low')
+        self.assertEqual(result['minimum_bid'], Decimal('20.00'))
+
+    def test_auction_that_is_not_live_is_closed(self):
+        result = set_proxy_bid(self.artwork, self.bob, Decimal('30.00'), now=timezone.now() + timedelta(hours=2))
+        self.assertEqual(result['outcome'], 'closed')
+        self.assertFalse(ProxyBid.objects.filter(artwork=self.artwork).exists())
+
+    def test_unregistered_bidder_cannot_set_a_ceiling(self):
+        self.client.force_login(self.bob)
+        url = reverse('artworks:set_proxy_bid', args=[self.artwork.slug])
+        self.client.post(url, {'max_amount': '30.00'})
+        self.assertFalse(ProxyBid.objects.filter(artwork=self.artwork).exists())
+
+        AuctionRegistration.objects.create(artwork=self.artwork, user=self.bob, status='approved')
+        self.client.post(url, {'max_amount': '30.00'})
+        self.assertTrue(ProxyBid.objects.filter(artwork=self.artwork, bidder=self.bob).exists())
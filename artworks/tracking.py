@@ -0,0 +1,72 @@
+# artworks/tracking.py
+import copy
+
+# Dirty-field tracking for models. Instances loaded from the database remember the values they
+# were loaded with, so save() logic can ask what changed instead of re-reading the row first.
+
+
+class FieldTrackerMixin:
+    """
+    Mix into a models.Model subclass (before models.Model). Loaded instances answer
+    has_changed(field), changed_fields() and original_value(field); deferred fields that were
+    never loaded or assigned count as unchanged.
+
+    With save_changed_fields_only = True, save() on a loaded instance writes only the changed
+    columns (plus auto_now fields) unless update_fields is given. Besides saving bytes, this stops
+    a stale instance from overwriting columns another request updated in the meantime.
+    """
+    save_changed_fields_only = False
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_loaded_values()
+        return instance
+
+    def _snapshot_loaded_values(self, fields=None):
+        loaded = getattr(self, '_loaded_values', None) or {}
+        for field in self._meta.concrete_fields:
+            if field.attname in self.__dict__ and (fields is None or field.attname in fields):
+                value = self.__dict__[field.attname]
+                # Copy mutable values (JSONField lists/dicts) so in-place edits show up as changes.
+                loaded[field.attname] = copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+        self._loaded_values = loaded
+
+    def _tracked_attname(self, field):
+        return self._meta.get_field(field).attname
+
+    def was_loaded(self, field):
+        """Whether `field` was loaded from (or last saved to) the database, i.e. has an original value."""
+        return self._tracked_attname(field) in (getattr(self, '_loaded_values', None) or {})
+
+    def original_value(self, field):
+        """The value `field` had when loaded (or last saved); None if the instance was never loaded."""
+        return (getattr(self, '_loaded_values', None) or {}).get(self._tracked_attname(field))
+
+    def has_changed(self, field):
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return True # Never loaded: everything is new
+        attname = self._tracked_attname(field)
+        if attname not in self.__dict__:
+            return False # Deferred and never touched
+        return attname not in loaded or self.__dict__[attname] != loaded[attname]
+
+    def changed_fields(self):
+        """Names of the concrete fields that differ from the loaded values."""
+        return {field.name for field in self._meta.concrete_fields if self.has_changed(field.name)}
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._snapshot_loaded_values({self._tracked_attname(field) for field in fields} if fields else None)
+
+    def save(self, *args, **kwargs):
+        if (self.save_changed_fields_only and not self._state.adding and kwargs.get('update_fields') is None
+                and not kwargs.get('force_insert') and getattr(self, '_loaded_values', None) is not None):
+            auto_now = {field.name for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)}
+            kwargs['update_fields'] = (self.changed_fields() | auto_now) - {self._meta.pk.name}
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self._snapshot_loaded_values(
+            {self._tracked_attname(field) for field in update_fields} if update_fields is not None else None
+        )
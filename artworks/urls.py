@@ -6,11 +6,16 @@ app_name = 'artworks' # Namespace for URLs in this app
 
 urlpatterns = [
     path('', views.artwork_list_view, name='artwork_list'), # Matches the root of the included path (e.g., /gallery/)
+    path('facets.json', views.artwork_facets_view, name='artwork_facets'),
+    path('search/', views.artwork_search_view, name='artwork_search'),
     path('art/<slug:slug>/', views.artwork_detail_view, name='artwork_detail'), # Matches /gallery/art/ANY_SLUG/
     path('art/<slug:artwork_slug>/register/', views.auction_register_view, name='auction_register'),
     path('art/<slug:artwork_slug>/manage-registrations/', views.manage_auction_registrations_view, name='manage_auction_registrations'),
     path('art/<slug:artwork_slug>/bidding/', views.auction_bidding_page_view, name='auction_bidding_page'),
     path('art/<slug:artwork_slug>/place-bid/', views.place_bid_view, name='place_bid'),
+    path('art/<slug:artwork_slug>/proxy-bid/', views.set_proxy_bid_view, name='set_proxy_bid'),
+    path('art/<slug:artwork_slug>/state.json', views.auction_state_view, name='auction_state'),
+    path('art/<slug:artwork_slug>/events/', views.auction_events_view, name='auction_events'),
     path('auctions/', views.available_auctions_view, name='available_auctions'),
     path('my-art/', views.my_art_view, name='my_art'),
     path('buy/initiate/<slug:artwork_slug>/', views.initiate_buy_view, name='initiate_buy'),
@@ -3,26 +3,106 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
-from .models import Artwork, Comment, Transaction, GallerySetting, UserProfile, AuctionRegistration, Bid # AuctionRegistration Added
+from .models import Artwork, Comment, Transaction, GallerySetting, UserProfile, AuctionRegistration, Bid, ProxyBid # AuctionRegistration Added
 from .forms import (CommentForm, GuestCommentForm, ArtworkDirectSaleForm, 
                     DekontUploadForm, UserProfileForm,
-                    ArtworkAuctionSettingsForm, PlaceBidForm)
+                    ArtworkAuctionSettingsForm, PlaceBidForm, ProxyBidForm)
+from .auction_lifecycle import INLINE_FINALIZE_GRACE, SCHEDULED_AUCTION_STATUSES, finalize_if_due
+from .conditional import conditional_page
+from .bidding import get_auction_state, place_bid, set_proxy_bid
+from .live_updates import auction_event_stream
+from .facets import apply_facet_filters, facet_groups, facet_query_string, get_facet_counts, parse_facet_filters
+from .fragment_cache import FRAGMENT_CACHE_TIMEOUT, get_fragment_generation, render_artwork_cards
+from .pagination import keyset_page
+from .search import search_artwork_ids
+from .registration_cache import get_registration_cache
 from django.contrib import messages
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Q
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from django.utils.cache import get_conditional_response
 from django.db import transaction as db_transaction
 from decimal import Decimal
 
 
+ARTWORK_LIST_PAGE_SIZE = 24
+# Statuses whose detail page shows a "starts in N minutes" countdown.
+COUNTDOWN_AUCTION_STATUSES = ('configured', 'signup_open', 'awaiting_start')
+
+def _artwork_list_page(request):
+    # Shared by the conditional-GET validators and the view, so a full render reuses the query.
+    page = getattr(request, '_artwork_list_page', None)
+    if page is None:
+        # Only the id/version list comes from the database; the cards themselves are rendered once per
+        # artwork version and served from the fragment cache (see fragment_cache.py).
+        versions = apply_facet_filters(
+            Artwork.objects.with_effective_status().only('created_at', 'updated_at'), parse_facet_filters(request.GET),
+        )
+        page = request._artwork_list_page = keyset_page(
+            versions, after=request.GET.get('after'), before=request.GET.get('before'),
+            page_size=ARTWORK_LIST_PAGE_SIZE,
+        )
+    return page
+
+def _artwork_list_validators(request):
+    page = _artwork_list_page(request)
+    versions = [(art.pk, art.updated_at, art.effective_auction_status) for art in page['items']]
+    last_modified = max((art.updated_at for art in page['items']), default=None)
+    # The facet counts are a cache read and change with artworks on other pages.
+    return (versions, page['next_cursor'], page['previous_cursor'], get_facet_counts()), last_modified
+
+@conditional_page(_artwork_list_validators)
 def artwork_list_view(request):
-    artworks = Artwork.objects.all().order_by('-created_at')
+    page = _artwork_list_page(request)
+    filters = parse_facet_filters(request.GET)
     context = {
-        'artworks': artworks,
+        'artwork_cards': render_artwork_cards(page['items']),
+        'next_cursor': page['next_cursor'],
+        'previous_cursor': page['previous_cursor'],
+        'facet_groups': facet_groups(filters, get_facet_counts()),
+        'filter_query': facet_query_string(filters),
         'page_title': 'Art Gallery'
     }
     return render(request, 'artworks/artwork_list.html', context)
 
+def artwork_facets_view(request):
+    # Catalog-wide facet counts for API clients; the same numbers the gallery list shows.
+    counts = get_facet_counts()
+    return JsonResponse({
+        'sale': counts['sale'],
+        'status': counts['status'],
+        'owner': [
+            {'id': owner_id, 'username': username, 'count': n}
+            for owner_id, (username, n) in sorted(counts['owner'].items(), key=lambda item: -item[1][1]) if n > 0
+        ],
+        'price': counts['price'],
+    })
+
+def artwork_search_view(request):
+    query = request.GET.get('q', '').strip()
+    try:
+        page_number = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page_number = 1
+    # Ranked ids come straight from the full-text index (one extra row tells whether there is a
+    # next page); the cards are rendered from the fragment cache like the gallery list.
+    offset = (page_number - 1) * ARTWORK_LIST_PAGE_SIZE
+    ids = search_artwork_ids(query, limit=ARTWORK_LIST_PAGE_SIZE + 1, offset=offset) if query else []
+    has_next = len(ids) > ARTWORK_LIST_PAGE_SIZE
+    ids = ids[:ARTWORK_LIST_PAGE_SIZE]
+    versions = Artwork.objects.with_effective_status().only('created_at', 'updated_at').in_bulk(ids)
+    context = {
+        'query': query,
+        'artwork_cards': render_artwork_cards([versions[pk] for pk in ids if pk in versions]),
+        'page_number': page_number,
+        'next_page': page_number + 1 if has_next else None,
+        'previous_page': page_number - 1 if page_number > 1 else None,
+        'page_title': f'Search: {query}' if query else 'Search',
+    }
+    return render(request, 'artworks/artwork_search.html', context)
+
 def signup_view(request):
     if request.method == 'POST':
         form = UserCreationForm(request.POST)
@@ -43,18 +123,42 @@ def my_art_view(request):
     }
     return render(request, 'artworks/my_art.html', context)
 
+def _artwork_detail_validators(request, slug):
+    now = timezone.now()
+    artworks = Artwork.objects.with_effective_status(now).filter(slug=slug)
+    if request.user.is_authenticated:
+        artworks = artworks.annotate(
+            user_registration_status=Subquery(
+                AuctionRegistration.objects.filter(artwork=OuterRef('pk'), user=request.user).values('status')[:1]
+            ),
+            registration_count=Subquery(
+                AuctionRegistration.objects.filter(artwork=OuterRef('pk')).values('artwork')
+                .annotate(count=Count('pk')).values('count')
+            ),
+        )
+    row = artworks.values(
+        'pk', 'updated_at', 'effective_auction_status', 'auction_state_version', 'last_bid_time',
+        *(('user_registration_status', 'registration_count') if request.user.is_authenticated else ()),
+    ).annotate(comment_count=Count('comments'), last_comment_at=Max('comments__created_at')).first()
+    if row is None:
+        return None # Let the view raise its 404
+    if row['effective_auction_status'] in COUNTDOWN_AUCTION_STATUSES:
+        row['countdown_minute'] = now.replace(second=0, microsecond=0) # The countdowns tick per minute
+    last_modified = max(t for t in (row['updated_at'], row['last_bid_time'], row['last_comment_at']) if t)
+    return sorted(row.items()), last_modified
+
+@conditional_page(_artwork_detail_validators)
 def artwork_detail_view(request, slug):
-    artwork_obj = get_object_or_404(Artwork, slug=slug) # Use a distinct name
-
-    # Always ensure status is up-to-date before any logic or rendering
-    artwork_obj.get_effective_auction_status_and_save()
-    # Re-fetch because get_effective_auction_status_and_save might have saved changes
-    artwork = get_object_or_404(Artwork, pk=artwork_obj.pk)
+    # Time-based status transitions are applied by the run_auction_scheduler worker,
+    # so viewing an artwork never writes to it; the effective status is only applied in memory.
+    artwork = get_object_or_404(Artwork.objects.with_effective_status().select_related('current_owner'), slug=slug)
+    artwork.apply_effective_auction_status()
 
-    comments = artwork.comments.all().order_by('-created_at')
+    # Lazy: only evaluated when the cached comments fragment has to be rendered again.
+    comments = artwork.comments.select_related('user').order_by('-created_at')
 
     print(f"--- artwork_detail_view for slug: {slug}, Method: {request.method} ---")
-    print(f"Artwork current auction status (after effective check): {artwork.auction_status}")
+    print(f"Artwork current auction status: {artwork.auction_status}")
 
     comment_form_initial = CommentForm() if request.user.is_authenticated else None
     guest_comment_form_initial = GuestCommentForm()
@@ -134,13 +238,20 @@ def artwork_detail_view(request, slug):
             print("POST request, but no recognized submit button or user not owner/authenticated.")
 
     # For GET request or if POST didn't redirect, prepare context with fresh data
-    # (artwork was already re-fetched at the beginning of the view after the initial effective status check)
-    user_can_register_for_this_auction = artwork.can_user_register_for_auction(request.user) if request.user.is_authenticated else False
-    user_auction_registration_on_this_artwork = artwork.get_user_auction_registration(request.user) if request.user.is_authenticated else None
+    registrations = get_registration_cache(request)
+    user_can_register_for_this_auction = artwork.can_user_register_for_auction(request.user, registrations) if request.user.is_authenticated else False
+    user_auction_registration_on_this_artwork = artwork.get_user_auction_registration(request.user, registrations) if request.user.is_authenticated else None
+
+    # Part of the comment fragments' cache keys: read from the database, so a comment posted through
+    # another worker is shown even if that worker's generation bump never reached this process.
+    comment_stats = artwork.comments.aggregate(count=Count('pk'), last_created_at=Max('created_at'))
 
     context = {
         'artwork': artwork,
         'comments': comments,
+        'comment_stats': comment_stats,
+        'fragment_generation': get_fragment_generation(artwork.pk),
+        'fragment_cache_timeout': FRAGMENT_CACHE_TIMEOUT,
         'comment_form': comment_form_to_render,
         'guest_comment_form': guest_comment_form_to_render,
         'direct_sale_form': direct_sale_form_to_render,
@@ -201,7 +312,17 @@ def payment_and_dekont_upload_view(request, transaction_id):
     }
     return render(request, 'artworks/payment_dekont_upload.html', context)
 
+def _transaction_status_validators(request, transaction_id):
+    row = Transaction.objects.filter(id=transaction_id, buyer=request.user).values(
+        'status', 'initiated_at', 'dekont_uploaded_at', 'admin_action_at', 'artwork__updated_at',
+    ).first()
+    if row is None:
+        return None
+    last_modified = max(t for t in (row['initiated_at'], row['dekont_uploaded_at'], row['admin_action_at']) if t)
+    return sorted(row.items()), last_modified
+
 @login_required
+@conditional_page(_transaction_status_validators)
 def transaction_status_view(request, transaction_id):
     transaction = get_object_or_404(Transaction, id=transaction_id, buyer=request.user)
     context = {
@@ -231,40 +352,47 @@ def edit_profile_view(request):
 
 @login_required
 def available_auctions_view(request):
+    # One query for the whole page: the effective status and the current user's registration
+    # status are annotated onto each row, and the owner comes along via select_related.
     now = timezone.now()
-    potential_auctions_qs = Artwork.objects.filter(
+    potential_auctions_qs = Artwork.objects.with_effective_status(now).select_related('current_owner').filter(
         is_for_auction=True
     ).exclude(
-        auction_status__in=['draft', 'completed', 'failed_no_bids', 'failed_payment', 'cancelled_by_owner']
+        effective_auction_status__in=['draft', 'completed', 'failed_no_bids', 'failed_payment', 'cancelled_by_owner']
     ).order_by('auction_start_time')
+    if request.user.is_authenticated:
+        potential_auctions_qs = potential_auctions_qs.annotate(
+            user_registration_status=Subquery(
+                AuctionRegistration.objects.filter(artwork=OuterRef('pk'), user=request.user).values('status')[:1]
+            )
+        )
 
+    registration_status_labels = dict(AuctionRegistration.STATUS_CHOICES)
     auctions_data = []
     for artwork_item in potential_auctions_qs: # Renamed artwork to artwork_item to avoid conflict
-        current_status = artwork_item.get_effective_auction_status_and_save()
-        if current_status in ['draft', 'completed', 'failed_no_bids', 'failed_payment', 'cancelled_by_owner']:
-            continue
-
+        artwork_item.apply_effective_auction_status() # In memory only, no per-row save
         user_registration_status_text = None # Renamed for clarity
         can_register = False
-        registration_obj = None
+        registration_status = getattr(artwork_item, 'user_registration_status', None)
 
         if request.user.is_authenticated:
-            registration_obj = artwork_item.get_user_auction_registration(request.user)
-            if registration_obj:
-                user_registration_status_text = registration_obj.get_status_display()
-            else:
-                if artwork_item.can_user_register_for_auction(request.user):
-                    can_register = True
-                    user_registration_status_text = "Available to Register" 
-                elif artwork_item.auction_status == 'signup_open' and artwork_item.current_owner == request.user:
-                    user_registration_status_text = "You are the owner"
+            is_owner = artwork_item.current_owner_id == request.user.id
+            if registration_status:
+                user_registration_status_text = registration_status_labels.get(registration_status, registration_status)
+            elif artwork_item.auction_status == 'signup_open' and not is_owner and \
+                 not (artwork_item.auction_signup_deadline and now >= artwork_item.auction_signup_deadline):
+                # Same rules as Artwork.can_user_register_for_auction(), minus its per-row queries
+                can_register = True
+                user_registration_status_text = "Available to Register" 
+            elif artwork_item.auction_status == 'signup_open' and is_owner:
+                user_registration_status_text = "You are the owner"
         
         auctions_data.append({
             'artwork': artwork_item, # Use artwork_item here
             'current_status_display': artwork_item.get_auction_status_display(),
             'user_registration_status': user_registration_status_text, 
             'can_register_now': can_register,
-            'registration': registration_obj,
+            'registration_status': registration_status,
             'time_until_start': artwork_item.time_until_auction_starts,
             'time_until_signup_deadline': artwork_item.time_until_signup_deadline,
         })
@@ -277,21 +405,22 @@ def available_auctions_view(request):
 @login_required
 def auction_register_view(request, artwork_slug): # artwork_slug matches the URL pattern
     artwork = get_object_or_404(Artwork, slug=artwork_slug)
-    
-    # Ensure status is up-to-date before processing registration
-    artwork.get_effective_auction_status_and_save()
 
     if request.method == 'POST':
+        # Ensure status is up-to-date before processing registration
+        artwork.get_effective_auction_status_and_save()
+
         print(f"Attempting registration for artwork: {artwork.title}, user: {request.user.username}") # DEBUG
 
-        if artwork.current_owner == request.user:
+        if artwork.current_owner_id == request.user.id:
             messages.error(request, "You cannot register for an auction on your own artwork.")
             return redirect('artworks:artwork_detail', slug=artwork.slug)
 
-        if not artwork.can_user_register_for_auction(request.user):
+        registrations = get_registration_cache(request) # One query serves both checks below
+        if not artwork.can_user_register_for_auction(request.user, registrations):
             # can_user_register_for_auction already checks if signup is active and if user is already registered.
             # Provide a more specific message if possible based on why they can't register.
-            existing_registration = artwork.get_user_auction_registration(request.user)
+            existing_registration = artwork.get_user_auction_registration(request.user, registrations)
             if existing_registration:
                 messages.warning(request, f"You are already registered for this auction with status: {existing_registration.get_status_display()}.")
             elif artwork.auction_status != 'signup_open':
@@ -327,10 +456,8 @@ def auction_register_view(request, artwork_slug): # artwork_slug matches the URL
     
 @login_required
 def manage_auction_registrations_view(request, artwork_slug):
-    artwork = get_object_or_404(Artwork, slug=artwork_slug, current_owner=request.user) # Ensure owner
-    
-    # It's good practice to update the status in case time-based transitions occurred
-    artwork.get_effective_auction_status_and_save()
+    artwork = get_object_or_404(Artwork.objects.with_effective_status(), slug=artwork_slug, current_owner=request.user) # Ensure owner
+    artwork.apply_effective_auction_status()
 
     # Only allow management if auction is in a state where approvals make sense
     # (e.g., after signup closes and before auction starts, or even during signup_open if owner wants to pre-approve)
@@ -370,7 +497,7 @@ def manage_auction_registrations_view(request, artwork_slug):
             
             # Check if all pending registrations are reviewed, if so, owner might want to "finalize"
             # or system could auto-move to 'ready_to_start' if conditions met.
-            # For now, status change to 'ready_to_start' is manual or via get_effective_auction_status_and_save
+            # For now, status change to 'ready_to_start' is manual or via the auction scheduler
             # if start time is very near.
 
         except AuctionRegistration.DoesNotExist:
@@ -388,357 +515,44 @@ def manage_auction_registrations_view(request, artwork_slug):
     }
     return render(request, 'artworks/manage_auction_registrations.html', context)
 
-@login_required
-def auction_bidding_page_view(request, artwork_slug):
-    print("!!!!!!!!!! SERVER IS RUNNING THE ABSOLUTELY LATEST auction_bidding_page_view VERSION !!!!!!!!!!")
-    artwork_obj = get_object_or_404(Artwork, slug=artwork_slug)
-    
-    # Initial status update
-    artwork_obj.get_effective_auction_status_and_save()
-    artwork = get_object_or_404(Artwork, pk=artwork_obj.pk) # Re-fetch
-    current_artwork_status_at_load = str(artwork.auction_status) # Save for logging
-    
-    print(f"\n[VIEW DEBUG {request.user.username} @ {timezone.now()}] ===== BIDDING PAGE LOAD =====")
-    print(f"[VIEW DEBUG] Artwork: '{artwork.title}', Initial Effective Status: '{current_artwork_status_at_load}'")
-
-    now = timezone.now()
-    effective_end_time = artwork.auction_scheduled_end_time
-    print(f"[VIEW DEBUG] Server Time (now): {now}, Effective End Time: {effective_end_time}")
-
-    if not artwork.is_for_auction:
-        messages.info(request, f"The auction for '{artwork.title}' is no longer active.")
-        print(f"[VIEW DEBUG] Redirecting: Auction '{artwork.title}' is_for_auction=False.")
-        return redirect('artworks:artwork_detail', slug=artwork.slug)
-    
-    if not effective_end_time and current_artwork_status_at_load == 'live':
-        messages.error(request, f"Configuration Error: Auction '{artwork.title}' is live but has no scheduled end time.")
-        print(f"[VIEW DEBUG] Redirecting: Auction '{artwork.title}' live but no effective_end_time.")
-        return redirect('artworks:artwork_detail', slug=artwork.slug)
-
-    # --- Attempt to finalize if time has passed and auction was live ---
-    if current_artwork_status_at_load == 'live' and effective_end_time and now >= effective_end_time:
-        print(f"[VIEW DEBUG] Auction Time UP for '{artwork.title}'. Entering FINALIZE BLOCK.")
-        print(f"[VIEW DEBUG]   User: {request.user.username}, Request Path: {request.path}")
-        
-        finalization_details = None # Initialize
-        with db_transaction.atomic():
-            artwork_to_finalize = Artwork.objects.select_for_update().get(pk=artwork.pk)
-            print(f"[VIEW DEBUG]   Locked Artwork '{artwork_to_finalize.title}'. Status before re-check: '{artwork_to_finalize.auction_status}'")
-
-            if artwork_to_finalize.auction_status == 'live' and \
-               artwork_to_finalize.auction_scheduled_end_time and \
-               timezone.now() >= artwork_to_finalize.auction_scheduled_end_time:
-                
-                print(f"[VIEW DEBUG]   Conditions MET for finalization inside lock. Calling finalize_auction().")
-                finalization_details = artwork_to_finalize.finalize_auction()
-                artwork = artwork_to_finalize 
-                print(f"[VIEW DEBUG]   finalize_auction() COMPLETED. Outcome: {finalization_details.get('outcome')}, "
-                      f"New Artwork Status: '{artwork.auction_status}', is_for_auction: {artwork.is_for_auction}")
-            else:
-                artwork = artwork_to_finalize 
-                print(f"[VIEW DEBUG]   Conditions for finalization NOT MET inside lock or already finalized by another process.")
-                print(f"[VIEW DEBUG]     Locked Artwork Status: '{artwork.auction_status}', Scheduled End: '{artwork.auction_scheduled_end_time}', Now: '{timezone.now()}'")
-                if artwork.auction_status != 'live':
-                    finalization_details = {'outcome': 'already_concluded_by_another_process'}
-
-        if finalization_details:
-            outcome = finalization_details.get('outcome')
-            print(f"[VIEW DEBUG] Processing finalize_auction outcome: '{outcome}' for user '{request.user.username}'")
-            
-            # THIS IS THE BLOCK WITH THE NEW DEBUG LINES
-            if outcome == 'winner_found':
-                transaction_obj = finalization_details.get('transaction')
-                winner_from_details = finalization_details.get('winner') 
-                price = finalization_details.get('price')
-                
-                print(f"[VIEW DEBUG WINNER CHECK] Outcome is 'winner_found'.") # <<< NEW
-                print(f"[VIEW DEBUG WINNER CHECK]   finalization_details winner: {winner_from_details} (type: {type(winner_from_details)})") # <<< NEW
-                if winner_from_details:
-                    print(f"[VIEW DEBUG WINNER CHECK]   finalization_details winner ID: {winner_from_details.id}") # <<< NEW
-                print(f"[VIEW DEBUG WINNER CHECK]   request.user: {request.user} (type: {type(request.user)})") # <<< NEW
-                if request.user.is_authenticated:
-                    print(f"[VIEW DEBUG WINNER CHECK]   request.user ID: {request.user.id}") # <<< NEW
-                print(f"[VIEW DEBUG WINNER CHECK]   request.user.is_authenticated: {request.user.is_authenticated}") # <<< NEW
-
-                msg_for_redirect = f"Auction for '{artwork.title}' ended! Winner: {winner_from_details.username if winner_from_details else 'N/A'}."
-                
-                if request.user.is_authenticated and winner_from_details and winner_from_details.id == request.user.id:
-                    print(f"[VIEW DEBUG WINNER CHECK]   User IS winner. Preparing redirect to payment.") # <<< NEW
-                    msg_for_redirect += " Congratulations! Please proceed to payment."
-                    messages.success(request, msg_for_redirect)
-                    if transaction_obj:
-                        print(f"[VIEW DEBUG WINNER CHECK]   REDIRECTING WINNER '{request.user.username}' to payment page for TxID: {transaction_obj.id}.") # <<< NEW
-                        return redirect('artworks:payment_and_dekont_upload', transaction_id=transaction_obj.id)
-                    else:
-                         print(f"[VIEW DEBUG WINNER CHECK ERROR]   Winner path, but transaction_obj is None! Redirecting to artwork detail.") # <<< NEW
-                         messages.error(request, "Error in auction finalization (tx missing for winner). Contact support.")
-                         return redirect('artworks:artwork_detail', slug=artwork.slug)
-                else:
-                    print(f"[VIEW DEBUG WINNER CHECK]   User IS NOT winner (or issue with objects). Redirecting non-winner/observer.") # <<< NEW
-                    msg_for_redirect += " Awaiting payment from winner."
-                    messages.success(request, msg_for_redirect)
-                    return redirect('artworks:artwork_detail', slug=artwork.slug)
-            
-            elif outcome == 'no_bids':
-                messages.info(request, f"Auction for '{artwork.title}' ended: {finalization_details.get('message', 'No valid bids.')}")
-                print(f"[VIEW DEBUG]   NO_BIDS block. Redirecting to artwork detail.")
-                return redirect('artworks:artwork_detail', slug=artwork.slug)
-
-            elif outcome == 'transaction_error':
-                messages.error(request, f"Auction for '{artwork.title}' ended with an issue: {finalization_details.get('message', 'Please contact support.')}")
-                print(f"[VIEW DEBUG]   TRANSACTION_ERROR block. Redirecting to artwork detail.")
-                return redirect('artworks:artwork_detail', slug=artwork.slug)
-            
-            elif outcome == 'already_concluded_by_another_process':
-                print(f"[VIEW DEBUG]   ALREADY_CONCLUDED_BY_ANOTHER_PROCESS. Will proceed to post-finalization checks.")
-            
-            else: 
-                print(f"[VIEW DEBUG]   UNHANDLED finalize_auction outcome: '{outcome}'. Message: {finalization_details.get('message')}")
-        else: 
-            print(f"[VIEW DEBUG]   Finalize_auction was effectively SKIPPED inside lock (e.g. status was not live when checked with lock).")
-
-    current_artwork_status_for_render = str(artwork.auction_status)
-    print(f"[VIEW DEBUG] POST-FINALIZE BLOCK / PRE-RENDER for user '{request.user.username}'. Artwork Status: '{current_artwork_status_for_render}'")
-
-    if current_artwork_status_for_render == 'not_configured' and artwork.is_for_auction is False:
-        print(f"[VIEW DEBUG]   Artwork is 'not_configured' and not for auction (auction concluded).")
-        
-        if request.user.is_authenticated:
-            print(f"[VIEW DEBUG]   Checking for winning transaction for user '{request.user.username}'...")
-            last_win_transaction = Transaction.objects.filter(
-                artwork=artwork, buyer=request.user, sale_type='auction_win', status='pending_payment'
-            ).order_by('-initiated_at').first()
-
-            if last_win_transaction:
-                print(f"[VIEW DEBUG]   WINNING TRANSACTION FOUND (TxID: {last_win_transaction.id}) for user '{request.user.username}'.")
-                has_proceed_to_payment_msg = any("Proceed to payment" in m.message for m in messages.get_messages(request))
-                if not has_proceed_to_payment_msg:
-                     messages.success(request, f"Congratulations! You won the auction for '{artwork.title}'. Please complete your payment.")
-                print(f"[VIEW DEBUG]   REDIRECTING WINNER (post-finalize check) '{request.user.username}' to payment page.")
-                return redirect('artworks:payment_and_dekont_upload', transaction_id=last_win_transaction.id)
-            else:
-                print(f"[VIEW DEBUG]   No PENDING winning transaction found for user '{request.user.username}'.")
-        
-        has_any_end_message = any(m.level >= messages.INFO for m in messages.get_messages(request)) 
-        if not has_any_end_message:
-            generic_concluded_msg = f"The auction for '{artwork.title}' has concluded (Status: {artwork.get_auction_status_display()})."
-            messages.info(request, generic_concluded_msg)
-            print(f"[VIEW DEBUG]   Added generic concluded message: \"{generic_concluded_msg}\"")
-        else:
-            print(f"[VIEW DEBUG]   Skipping generic concluded message as other messages exist.")
-            
-        print(f"[VIEW DEBUG]   Redirecting to artwork detail page (auction concluded).")
-        return redirect('artworks:artwork_detail', slug=artwork.slug)
-
-    if current_artwork_status_for_render != 'live':
-        print(f"[VIEW DEBUG]   Artwork status is '{current_artwork_status_for_render}' (not 'live'). Redirecting to artwork detail.")
-        if not messages.get_messages(request):
-            messages.info(request, f"The auction for '{artwork.title}' is not currently live (Status: {artwork.get_auction_status_display()}).")
-        return redirect('artworks:artwork_detail', slug=artwork.slug)
-
-    print(f"[VIEW DEBUG] Auction '{artwork.title}' is LIVE. Preparing rendering context.")
-    user_registration = artwork.get_user_auction_registration(request.user)
-    is_approved_attendee = user_registration and user_registration.status == 'approved'
-    is_owner = artwork.current_owner == request.user
-    print(f"[VIEW DEBUG]   Permissions: approved_attendee={is_approved_attendee}, is_owner={is_owner}")
-
-    if not is_approved_attendee and not is_owner:
-        messages.error(request, "You are not an approved attendee for this auction.")
-        print(f"[VIEW DEBUG]   User not approved and not owner. Redirecting to artwork detail.")
-        return redirect('artworks:artwork_detail', slug=artwork.slug)
-
-    current_highest_bid = artwork.auction_current_highest_bid
-    highest_bidder_username = artwork.auction_current_highest_bidder.username if artwork.auction_current_highest_bidder else None
-    min_next_bid = current_highest_bid + Decimal('1.00') if current_highest_bid else artwork.auction_minimum_bid
-    if min_next_bid is None: min_next_bid = Decimal('0.01')
-
-    bid_form = None
-    if is_approved_attendee and not is_owner:
-        bid_form = PlaceBidForm(initial={'bid_amount': min_next_bid.quantize(Decimal('0.01'))})
-        
-    time_remaining_seconds = max(0, int((effective_end_time - now).total_seconds())) if effective_end_time and now < effective_end_time else 0
-    is_soft_close_active = False 
-    if artwork.last_bid_time and effective_end_time:
-        soft_close_extension_seconds = 3 * 60
-        if (effective_end_time - artwork.last_bid_time).total_seconds() < soft_close_extension_seconds + 5 :
-             is_soft_close_active = True if (now < effective_end_time) else False
-    
-    quick_bids = []
-    if is_approved_attendee and not is_owner and min_next_bid:
-        base = min_next_bid
-        increments = [Decimal('0'), Decimal('10'), Decimal('50'), Decimal('100')]
-        temp_bids_list = [] 
-        for inc in increments:
-            potential_bid = (base + inc).quantize(Decimal('0.01'))
-            if current_highest_bid and potential_bid <= current_highest_bid:
-                if inc == Decimal('0'): 
-                    potential_bid = (current_highest_bid + Decimal('10')).quantize(Decimal('0.01'))
-                else: continue 
-            if potential_bid not in temp_bids_list : temp_bids_list.append(potential_bid)
-        quick_bids = sorted(list(set(temp_bids_list)))[:4]
-
-    context = {
-        'artwork': artwork, 'bid_form': bid_form,
-        'current_highest_bid': current_highest_bid,
-        'current_highest_bidder_username': highest_bidder_username,
-        'min_next_bid': min_next_bid,
-        'is_approved_attendee': is_approved_attendee, 'is_owner': is_owner,
-        'time_remaining_seconds': time_remaining_seconds,
-        'auction_end_message': None, 
-        'is_soft_close_active': is_soft_close_active,
-        'effective_end_time_for_display': effective_end_time,
-        'quick_bid_amounts': quick_bids,
-        'page_title': f"Live Bidding: {artwork.title}"
-    }
-    print(f"[VIEW DEBUG] Rendering bidding page for '{artwork.title}'. Time Rem: {time_remaining_seconds}s")
-    print(f"[VIEW DEBUG] ===== BIDDING PAGE RENDER END =====\n")
-    return render(request, 'artworks/auction_bidding_page.html', context)
-
-@login_required
-@db_transaction.atomic # Ensures all database operations in this view are one transaction
-def place_bid_view(request, artwork_slug):
-    artwork = get_object_or_404(Artwork, slug=artwork_slug)
-    
-    # Re-check and update status
-    current_artwork_status = artwork.get_effective_auction_status_and_save()
-
-    if current_artwork_status != 'live':
-        messages.error(request, "This auction is not currently live or has just ended.")
-        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug) # Or artwork_detail
-
-    user_registration = artwork.get_user_auction_registration(request.user)
-    if not user_registration or user_registration.status != 'approved':
-        messages.error(request, "You are not an approved attendee for this auction.")
-        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug) # Or artwork_detail
-    
-    if artwork.current_owner == request.user:
-        messages.error(request, "As the owner, you cannot bid on your own artwork.")
-        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
-
-    if request.method == 'POST':
-        form = PlaceBidForm(request.POST)
-        if form.is_valid():
-            bid_amount = form.cleaned_data['bid_amount']
-            now = timezone.now()
-            
-            print(f"User {request.user.username} attempting to bid {bid_amount} on {artwork.title}") # DEBUG
-
-            # --- Critical Section: Determine current highest bid and validate new bid ---
-            # Lock the artwork row for update to prevent race conditions when getting highest bid and placing new one.
-            # artwork_locked = Artwork.objects.select_for_update().get(pk=artwork.pk) # Use this if high concurrency is expected
-            # For now, we rely on the @db_transaction.atomic and careful ordering.
-
-            highest_bid_obj = Bid.objects.filter(artwork=artwork).order_by('-amount', '-timestamp').first()
-            current_highest_bid_val = artwork.auction_minimum_bid # Start with minimum if no bids
-            if highest_bid_obj:
-                current_highest_bid_val = highest_bid_obj.amount
-            
-            # Ensure the bid is higher than the current highest (or minimum if no bids)
-            # And also strictly greater than any existing bid (or equal to minimum if it's the first bid)
-            required_min_bid = artwork.auction_minimum_bid
-            if highest_bid_obj:
-                 # A common rule: bid must be at least current_highest + a minimum increment (e.g. $1)
-                 # For simplicity now, just greater than current_highest_bid_val
-                if bid_amount <= current_highest_bid_val:
-                    messages.error(request, f"Your bid must be higher than the current highest bid of ${current_highest_bid_val:.2f}.")
-                    return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
-            elif bid_amount < artwork.auction_minimum_bid: # First bid must meet minimum
-                 messages.error(request, f"Your first bid must be at least the minimum bid of ${artwork.auction_minimum_bid:.2f}.")
-                 return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
-
-
-            # --- All checks passed, create the bid and update artwork ---
-            Bid.objects.create(
-                artwork=artwork,
-                bidder=request.user,
-                amount=bid_amount,
-                timestamp=now 
-            )
-            
-            artwork.auction_current_highest_bid = bid_amount
-            artwork.auction_current_highest_bidder = request.user
-            artwork.last_bid_time = now
-            
-            # Soft close: if the bid is within X minutes of scheduled end, or after, extend the scheduled end time
-            soft_close_extension = timedelta(seconds=3 * 60) # 3 minutes
-            # Check if the current scheduled end time needs extension
-            if artwork.auction_scheduled_end_time: # Ensure it's set
-                if (now + soft_close_extension) > artwork.auction_scheduled_end_time and \
-                   (artwork.auction_scheduled_end_time - now) < soft_close_extension :
-                    new_scheduled_end_time = now + soft_close_extension
-                    artwork.auction_scheduled_end_time = new_scheduled_end_time
-                    print(f"Soft close triggered by bid. New scheduled end for {artwork.title}: {new_scheduled_end_time}") #DEBUG
-                    messages.info(request, f"Auction extended! New end time: {new_scheduled_end_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-
-
-            artwork.save(update_fields=[
-                'auction_current_highest_bid', 
-                'auction_current_highest_bidder', 
-                'last_bid_time',
-                'auction_scheduled_end_time' # If soft close extended it
-            ])
-            messages.success(request, f"Your bid of ${bid_amount:.2f} has been placed successfully!")
-            print(f"Bid of {bid_amount} by {request.user.username} PLACED on {artwork.title}") # DEBUG
-
-            # --- Check if auction should end NOW (after this bid) ---
-            # This is a simplified check. A more robust system might have a separate finalization mechanism.
-            effective_end_time = artwork.auction_scheduled_end_time # The potentially extended time
-            if artwork.last_bid_time: # Should always be true here
-                 # The auction ends if current time is past (last_bid_time + soft_close_extension)
-                 # OR if current time is past scheduled_end_time (if no bids extended it)
-                 # This condition is tricky, as the bid itself sets last_bid_time to 'now'
-                 # The check in auction_bidding_page_view is more for display timeout.
-                 # True finalization will be more explicit in Phase 6.
-                 # For now, the auction continues until no bids for `soft_close_extension` period AFTER scheduled end.
-                 pass
-
-
-        else: # Form is not valid (e.g., non-decimal input)
-            # errors = form.errors.as_json() # For debugging
-            messages.error(request, "Invalid bid amount submitted. Please enter a valid number.")
-            print(f"Invalid bid form submission: {form.errors.as_json()}") # DEBUG
-        
-        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
-    else:
-        # Should not be accessed via GET
-        return redirect('artworks:artwork_detail', slug=artwork.slug)
-    
 @login_required
 def auction_bidding_page_view(request, artwork_slug): # MODIFIED FOR FIX
     print(f"[DEBUG] 0. Entered auction_bidding_page_view for slug: {artwork_slug}")
-    artwork = get_object_or_404(Artwork, slug=artwork_slug)
-    
-    artwork.get_effective_auction_status_and_save() # Update status first
-    artwork = Artwork.objects.get(pk=artwork.pk) # Re-fetch for freshest data
-    current_artwork_status = artwork.auction_status # This is the status from DB after effective check
+    artwork = get_object_or_404(Artwork.objects.with_effective_status(), slug=artwork_slug)
+    current_artwork_status = artwork.apply_effective_auction_status() # In memory; the scheduler persists it
     print(f"[DEBUG] 1. Initial status for '{artwork.title}': {current_artwork_status}")
 
     now = timezone.now()
     print(f"[DEBUG] Server 'now': {now}")
 
-    effective_end_time = artwork.auction_scheduled_end_time
+    effective_end_time = artwork.get_effective_end_time() # Scheduled end, extended by soft close
     if not effective_end_time and current_artwork_status == 'live': # Check if live AND missing end time
         messages.error(request, f"Configuration Error for '{artwork.title}': Live auction is missing its scheduled end time.")
         print(f"[DEBUG] Config Error: Live auction '{artwork.title}' missing scheduled_end_time.")
         return redirect('artworks:artwork_detail', slug=artwork.slug)
 
-    # Calculate soft close only if effective_end_time is set
-    is_soft_close_active = False 
-    if effective_end_time and artwork.last_bid_time:
-        soft_close_extension_seconds = 3 * 60 
-        potential_soft_close_end = artwork.last_bid_time + timedelta(seconds=soft_close_extension_seconds)
-        if potential_soft_close_end > effective_end_time:
-            effective_end_time = potential_soft_close_end # Update effective_end_time for this request
-            is_soft_close_active = True
+    is_soft_close_active = artwork.is_in_soft_close()
     print(f"[DEBUG] Calculated effective_end_time for '{artwork.title}': {effective_end_time}")
 
 
-    # --- Attempt to finalize if time has passed and auction was live ---
-    if current_artwork_status == 'live' and effective_end_time and now >= effective_end_time:
+    # --- Finalization belongs to the finalize_due_auctions sweeper; only step in if it is overdue ---
+    is_awaiting_result = current_artwork_status == 'live' and effective_end_time and now >= effective_end_time
+    if is_awaiting_result and now >= effective_end_time + INLINE_FINALIZE_GRACE:
         print(f"[DEBUG] 5. ENTERED FINALIZE BLOCK for '{artwork.title}': now ({now}) >= effective_end_time ({effective_end_time}) is TRUE.")
         
-        finalization_details = artwork.finalize_auction() 
-        # `artwork` instance is modified by finalize_auction (is_for_auction=False, status='not_configured')
+        # Under the row lock, like the sweeper, so only one of them finalizes and creates the winner's transaction.
+        with db_transaction.atomic():
+            locked_artwork = Artwork.objects.select_for_update().filter(pk=artwork.pk).first()
+            if locked_artwork is None:
+                raise Http404("Artwork not found.")
+            locked_artwork.apply_effective_auction_status() # Without a worker the row may still say 'awaiting_start'
+            finalization_details = finalize_if_due(locked_artwork, now)
+        if finalization_details is None:
+            if locked_artwork.is_for_auction and locked_artwork.auction_status in SCHEDULED_AUCTION_STATUSES:
+                return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug) # A late bid moved the end
+            finalization_details = {'outcome': 'already_concluded'} # The sweeper got there first
+        artwork = locked_artwork
+        # `artwork` is now the row finalize_auction modified (is_for_auction=False, status='not_configured')
         # `finalization_details` is the dictionary returned by finalize_auction.
 
         print(f"[DEBUG] 6. Status of artwork object after finalize_auction call: '{artwork.auction_status}'") 
@@ -834,9 +648,9 @@ def auction_bidding_page_view(request, artwork_slug): # MODIFIED FOR FIX
     is_owner = False 
 
     if request.user.is_authenticated: 
-        user_registration = artwork.get_user_auction_registration(request.user)
+        user_registration = artwork.get_user_auction_registration(request.user, get_registration_cache(request))
         is_approved_attendee = user_registration and user_registration.status == 'approved'
-        is_owner = artwork.current_owner == request.user
+        is_owner = artwork.current_owner_id == request.user.id
     
     print(f"[DEBUG] 9. Permissions for '{artwork.title}': approved_attendee={is_approved_attendee}, is_owner={is_owner}, user_authenticated={request.user.is_authenticated}")
 
@@ -864,9 +678,13 @@ def auction_bidding_page_view(request, artwork_slug): # MODIFIED FOR FIX
     auction_end_message = None 
     time_remaining_seconds = 0 
 
+    proxy_bid_form = None
+    user_proxy_bid = None
     if is_approved_attendee and not is_owner: # Bid form only for approved, non-owner bidders on a live auction
         form_initial_bid = min_next_bid.quantize(Decimal('0.01'))
         bid_form = PlaceBidForm(initial={'bid_amount': form_initial_bid })
+        user_proxy_bid = ProxyBid.objects.filter(artwork=artwork, bidder=request.user).first()
+        proxy_bid_form = ProxyBidForm(initial={'max_amount': user_proxy_bid.max_amount if user_proxy_bid else form_initial_bid})
     
     if effective_end_time and now < effective_end_time: 
          current_time_remaining_delta = effective_end_time - now
@@ -894,7 +712,9 @@ def auction_bidding_page_view(request, artwork_slug): # MODIFIED FOR FIX
     
     context = {
         'artwork': artwork, 
-        'bid_form': bid_form, 
+        'bid_form': bid_form if not is_awaiting_result else None, 
+        'proxy_bid_form': proxy_bid_form if not is_awaiting_result else None,
+        'user_proxy_bid': user_proxy_bid,
         'current_highest_bid': current_highest_bid_amount, 
         'current_highest_bidder_username': current_highest_bidder_user_obj.username if current_highest_bidder_user_obj else None,
         'min_next_bid': min_next_bid, 
@@ -902,6 +722,9 @@ def auction_bidding_page_view(request, artwork_slug): # MODIFIED FOR FIX
         'is_owner': is_owner,
         'time_remaining_seconds': time_remaining_seconds, 
         'auction_end_message': auction_end_message,
+        'is_awaiting_result': is_awaiting_result,
+        'finalize_grace_seconds': int(INLINE_FINALIZE_GRACE.total_seconds()),
+        'seconds_past_end': max(0, int((now - effective_end_time).total_seconds())) if is_awaiting_result else 0,
         'is_soft_close_active': is_soft_close_active, 
         'effective_end_time_for_display': effective_end_time, 
         'quick_bid_amounts': quick_bid_amounts, 
@@ -909,102 +732,116 @@ def auction_bidding_page_view(request, artwork_slug): # MODIFIED FOR FIX
     }
     return render(request, 'artworks/auction_bidding_page.html', context)
 @login_required
-@db_transaction.atomic
-def place_bid_view(request, artwork_slug): # MODIFIED
-    artwork = get_object_or_404(Artwork, slug=artwork_slug)
-    
-    # Lock the artwork row for this transaction to prevent race conditions on bid placement
-    # This ensures that checking current highest bid and placing a new one is atomic.
-    artwork_locked = Artwork.objects.select_for_update().get(pk=artwork.pk)
-    
-    # Use the locked instance for all checks and updates within this transaction
-    current_artwork_status = artwork_locked.get_effective_auction_status_and_save()
+def place_bid_view(request, artwork_slug):
+    artwork = get_object_or_404(Artwork.objects.with_effective_status(), slug=artwork_slug)
+    if request.method != 'POST':
+        return redirect('artworks:artwork_detail', slug=artwork.slug)
 
-    if current_artwork_status != 'live':
+    if artwork.effective_auction_status != 'live':
         messages.error(request, "This auction is not currently live or has just ended.")
-        # Redirect to bidding page to show current state, or detail page if preferred
-        return redirect('artworks:auction_bidding_page', artwork_slug=artwork_locked.slug)
+        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
 
-    user_registration = artwork_locked.get_user_auction_registration(request.user)
+    user_registration = artwork.get_user_auction_registration(request.user, get_registration_cache(request))
     if not user_registration or user_registration.status != 'approved':
         messages.error(request, "You are not an approved attendee for this auction.")
-        return redirect('artworks:auction_bidding_page', artwork_slug=artwork_locked.slug)
-    
-    if artwork_locked.current_owner == request.user:
+        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
+
+    if artwork.current_owner_id == request.user.id:
         messages.error(request, "As the owner, you cannot bid on your own artwork.")
-        return redirect('artworks:auction_bidding_page', artwork_slug=artwork_locked.slug)
+        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
 
-    if request.method == 'POST':
-        form = PlaceBidForm(request.POST)
-        if form.is_valid():
-            bid_amount = form.cleaned_data['bid_amount']
-            now = timezone.now()
-            print(f"User {request.user.username} attempting to bid {bid_amount} on {artwork_locked.title}")
-
-            # --- Determine current highest bid using the locked artwork instance ---
-            highest_bid_obj = Bid.objects.filter(artwork=artwork_locked).order_by('-amount', '-timestamp').first()
-            current_highest_bid_val = artwork_locked.auction_minimum_bid 
-            if highest_bid_obj:
-                current_highest_bid_val = highest_bid_obj.amount
-            
-            if current_highest_bid_val is None: # Should not happen if auction_minimum_bid is required
-                messages.error(request, "Auction configuration error: Cannot determine current bid baseline.")
-                return redirect('artworks:auction_bidding_page', artwork_slug=artwork_locked.slug)
-
-            if bid_amount <= current_highest_bid_val:
-                messages.error(request, f"Your bid of ${bid_amount:.2f} must be higher than the current bid of ${current_highest_bid_val:.2f}.")
-                return redirect('artworks:auction_bidding_page', artwork_slug=artwork_locked.slug)
-            # No need for artwork_locked.auction_minimum_bid check here if current_highest_bid_val already considers it.
-
-            # --- All checks passed, create the bid and update artwork ---
-            Bid.objects.create(
-                artwork=artwork_locked, bidder=request.user, amount=bid_amount, timestamp=now 
-            )
-            
-            artwork_locked.auction_current_highest_bid = bid_amount
-            artwork_locked.auction_current_highest_bidder = request.user
-            artwork_locked.last_bid_time = now
-            
-            updated_fields_for_artwork = ['auction_current_highest_bid', 'auction_current_highest_bidder', 'last_bid_time']
-
-            # Soft close logic: If the bid extends the auction
-            soft_close_extension = timedelta(seconds=3 * 60) # 3 minutes
-            new_potential_end_time = now + soft_close_extension
-
-            if artwork_locked.auction_scheduled_end_time is None or new_potential_end_time > artwork_locked.auction_scheduled_end_time :
-                 # This condition means: either the auction was about to end (now is close to scheduled_end_time)
-                 # OR this bid is creating a new, later end time due to soft close.
-                 artwork_locked.auction_scheduled_end_time = new_potential_end_time
-                 updated_fields_for_artwork.append('auction_scheduled_end_time')
-                 messages.info(request, f"Auction extended due to your bid! New end time: {artwork_locked.auction_scheduled_end_time.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-                 print(f"Soft close triggered by bid. New scheduled end for {artwork_locked.title}: {artwork_locked.auction_scheduled_end_time}")
-            
-            artwork_locked.save(update_fields=updated_fields_for_artwork)
-            messages.success(request, f"Your bid of ${bid_amount:.2f} has been placed successfully!")
-            print(f"Bid of {bid_amount} by {request.user.username} PLACED on {artwork_locked.title}")
-
-            # --- Check if auction should end NOW (after this bid made it the LATEST action) ---
-            # The auction effectively ends if `now` (the time of this bid) is >= the `artwork_locked.auction_scheduled_end_time`
-            # that was in place *before* this bid potentially extended it.
-            # However, the critical check is: if (now >= effective_end_time as determined by this bid's last_bid_time)
-            
-            # The auction ends if current time `now` is >= `artwork_locked.last_bid_time + soft_close_extension`
-            # No, this is not right. The auction ends if no new bid arrives before artwork_locked.last_bid_time + soft_close_extension
-            # This view has just PLACED a bid. So the auction is, by definition, NOT ending with THIS action alone
-            # unless this bid was placed EXACTLY at the `effective_end_time` and somehow that time didn't get extended.
-            # The `auction_bidding_page_view` upon next load, or a background task, is better for timed-out finalization.
+    form = PlaceBidForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, "Invalid bid amount submitted. Please enter a valid number.")
+        print(f"Invalid bid form submission: {form.errors.as_json()}")
+        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
 
-            # For now, we don't call finalize_auction() here directly after placing a bid.
-            # The next time auction_bidding_page_view loads, it will check if effective_end_time has passed.
-            # Or, a winning bid might be determined if this bid was placed *after* the previously calculated effective_end_time
-            # (meaning the auction should have already closed but this bid is coming in late - which should be prevented by status check).
+    bid_amount = form.cleaned_data['bid_amount']
+    print(f"User {request.user.username} attempting to bid {bid_amount} on {artwork.title}")
 
-        else: 
-            messages.error(request, "Invalid bid amount submitted. Please enter a valid number.")
-            print(f"Invalid bid form submission: {form.errors.as_json()}")
-        
-        return redirect('artworks:auction_bidding_page', artwork_slug=artwork_locked.slug)
+    # No row lock here: the bid engine accepts or rejects the bid with a single conditional UPDATE.
+    result = place_bid(artwork, request.user, bid_amount)
+    if result['outcome'] == 'accepted':
+        if result['extended']:
+            messages.info(request, f"Auction extended due to your bid! New end time: {result['auction_end_time'].strftime('%Y-%m-%d %H:%M:%S %Z')}")
+        if result['outbid_by_proxy']:
+            messages.warning(request, result['message'])
+        else:
+            messages.success(request, result['message'])
+        print(f"Bid of {bid_amount} by {request.user.username} PLACED on {artwork.title}")
     else:
-        return redirect('artworks:artwork_detail', slug=artwork.slug)
-    
-    
\ No newline at end of file
+        messages.error(request, result['message'])
+        print(f"Bid of {bid_amount} by {request.user.username} REJECTED on {artwork.title}: {result['outcome']}")
+
+    return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
+
+
+@login_required
+def set_proxy_bid_view(request, artwork_slug):
+    artwork = get_object_or_404(Artwork.objects.with_effective_status(), slug=artwork_slug)
+    if request.method != 'POST':
+        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
+
+    if artwork.effective_auction_status != 'live':
+        messages.error(request, "This auction is not currently live or has just ended.")
+        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
+
+    user_registration = artwork.get_user_auction_registration(request.user, get_registration_cache(request))
+    if not user_registration or user_registration.status != 'approved':
+        messages.error(request, "You are not an approved attendee for this auction.")
+        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
+
+    if artwork.current_owner_id == request.user.id:
+        messages.error(request, "As the owner, you cannot bid on your own artwork.")
+        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
+
+    form = ProxyBidForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, "Invalid maximum bid submitted. Please enter a valid number.")
+        return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
+
+    max_amount = form.cleaned_data['max_amount']
+    result = set_proxy_bid(artwork, request.user, max_amount)
+    if result['outcome'] == 'accepted':
+        if result['leading']:
+            messages.success(request, result['message'])
+        else:
+            messages.warning(request, result['message'])
+        print(f"Proxy bid up to {max_amount} by {request.user.username} SAVED on {artwork.title}")
+    else:
+        messages.error(request, result['message'])
+        print(f"Proxy bid up to {max_amount} by {request.user.username} REJECTED on {artwork.title}: {result['outcome']}")
+
+    return redirect('artworks:auction_bidding_page', artwork_slug=artwork.slug)
+
+
+@login_required
+def auction_state_view(request, artwork_slug):
+    # Polled by the bidding page instead of reloading it; answers 304 while nothing has changed.
+    state, etag = get_auction_state(slug=artwork_slug)
+    if state is None:
+        raise Http404("No artwork matches the given query.")
+
+    response = get_conditional_response(request, etag=etag) or JsonResponse(state)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@login_required
+async def auction_events_view(request, artwork_slug):
+    # Server-Sent Events stream of bids, soft-close extensions and the final result.
+    # Needs an ASGI server (uvicorn/daphne); under WSGI the stream would pin a worker, so answer
+    # 204 and let the bidding page fall back to polling state.json.
+    if not hasattr(request, 'scope'):
+        return HttpResponse(status=204)
+
+    artwork_pk = await Artwork.objects.filter(slug=artwork_slug).values_list('pk', flat=True).afirst()
+    if artwork_pk is None:
+        raise Http404("No artwork matches the given query.")
+    state, _ = await sync_to_async(get_auction_state)(pk=artwork_pk)
+
+    response = StreamingHttpResponse(auction_event_stream(artwork_pk, state), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no' # Don't let a reverse proxy buffer the stream
+    return response
@@ -2,6 +2,8 @@
 ASGI config for gallery_config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with ``uvicorn gallery_config.asgi:application`` (or daphne) to enable the
+live auction event stream at /gallery/art/<slug>/events/.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
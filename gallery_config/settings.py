@@ -137,6 +137,22 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# --- Cache ---
+# Holds rendered artwork card, description and comment fragments (see artworks/fragment_cache.py).
+# Local memory is per process; with several gunicorn workers set DJANGO_CACHE_DIR so they share a
+# file-based cache and an edit (gallery settings, fragment invalidations) reaches all of them.
+# render.yaml sets it for the web service.
+DJANGO_CACHE_DIR = os.environ.get('DJANGO_CACHE_DIR')
+if DJANGO_CACHE_DIR:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': DJANGO_CACHE_DIR}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'art-gallery'}}
+
+# --- Live auction updates ---
+# Fan-out hub behind the SSE endpoint. The in-memory default only reaches watchers served by the
+# same process; run the ASGI app (uvicorn gallery_config.asgi:application) to serve the stream.
+AUCTION_BROADCAST_BACKEND = 'artworks.live_updates.InMemoryBroadcastBackend'
+
 LOGIN_REDIRECT_URL = '/gallery/'
 LOGOUT_REDIRECT_URL = '/gallery/'
 # LOGIN_URL = '/accounts/login/' # Default, but can be explicit
\ No newline at end of file